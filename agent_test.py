@@ -4,6 +4,7 @@ cases used by the project assistant are not public.
 """
 
 import unittest
+import random
 import timeit
 
 import isolation
@@ -87,6 +88,65 @@ class IsolationTest(unittest.TestCase):
         best_move = player.get_move(self.board, self.create_clock())
         self.assertTrue(best_move in [(2, 3), (3, 2), (2, 5), (3, 6), (5, 2), (5, 6), (6, 5), (6, 3)], 'best move: ' + str(best_move))          
 
+    def test_pvs_same_score_as_alphabeta(self):
+        alphabeta = game_agent.AlphaBetaPlayer()
+        pvs = game_agent.PVSPlayer()
+        for player in [alphabeta, pvs]:
+            player.time_left = self.create_clock(10000)
+            player.clock.start(player.time_left, player.TIMER_THRESHOLD)
+        for depth in range(1, 6):
+            score, _ = alphabeta.max_value(self.board.copy(), depth, float("-inf"), float("inf"))
+            self.assertEqual(score, pvs.max_value(self.board.copy(), depth, float("-inf"), float("inf"))[0])
+            self.assertEqual(score, pvs.aspiration_search(self.board, depth, score + 5.)[0])
+            self.assertEqual(score, pvs.aspiration_search(self.board, depth, score - 5.)[0])
+
+    def test_pvs_iterative_deepening(self):
+        player = game_agent.PVSPlayer()
+        best_move = player.get_move(self.board, self.create_clock())
+        self.assertTrue(best_move in [(2, 3), (2, 5), (3, 6), (5, 2), (6, 3)], 'best move: ' + str(best_move))
+
+    def test_search_clock(self):
+        now = [0.]
+        polls = [0]
+        def time_left():
+            polls[0] += 1
+            return 150. - now[0]
+
+        clock = game_agent.SearchClock()
+        clock.start(time_left, 10.)
+        nodes = 0
+        with self.assertRaises(game_agent.SearchTimeout):
+            while True:
+                now[0] += 0.01
+                clock.check()
+                nodes += 1
+        self.assertTrue(139.99 < now[0] < 140.02, 'stopped at ' + str(now[0]))
+        self.assertLess(polls[0], nodes / 10)
+
+    def test_search_clock_expired(self):
+        clock = game_agent.SearchClock()
+        self.assertRaises(game_agent.SearchTimeout, clock.start, lambda: 5., 10.)
+
+    def test_predict_iteration_time(self):
+        self.assertEqual(0., game_agent.predict_iteration_time([]))
+        self.assertEqual(0., game_agent.predict_iteration_time([1.]))
+        self.assertEqual(4., game_agent.predict_iteration_time([1., 2.]))
+        self.assertEqual(54., game_agent.predict_iteration_time([2., 8., 18.]))
+        self.assertEqual(6.25, game_agent.predict_iteration_time([4., 5.]))
+        self.assertEqual(4., game_agent.predict_iteration_time([5., 4.]))
+
+    def test_iterative_deepening_skips_iteration(self):
+        player = game_agent.AlphaBetaPlayer()
+        clock = self.create_clock()
+        best_move = player.get_move(self.board, clock)
+        self.assertTrue(best_move in self.board.get_legal_moves(), 'best move: ' + str(best_move))
+        self.assertTrue(player.iteration_times)
+        if clock() > player.TIMER_THRESHOLD:
+            # the search stopped early because the next iteration was predicted
+            # to take longer than the time left
+            self.assertGreater(game_agent.predict_iteration_time(player.iteration_times),
+                               clock() - player.TIMER_THRESHOLD)
+
     def test_minimax_udacity(self):
         player = game_agent.MinimaxPlayer(score_fn=sample_players.center_score)
         player.time_left = self.create_clock()
@@ -114,6 +174,61 @@ class IsolationTest(unittest.TestCase):
         self.assertTrue(game_agent.is_attacker(self.board, self.player1))
         self.assertFalse(game_agent.is_attacker(self.board, self.player2))
 
+    def test_squares_2_moves(self):
+        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+        def expected(board, square):
+            moves1 = set((square[0] + dr, square[1] + dc) for dr, dc in directions
+                         if board.move_is_legal((square[0] + dr, square[1] + dc)))
+            moves2 = set((r + dr, c + dc) for dr, dc in directions for r, c in moves1
+                         if board.move_is_legal((r + dr, c + dc)))
+            return moves1 | moves2
+
+        rng = random.Random(0)
+        for board_class, width, height in [(isolation.Board, 7, 7), (isolation.BitBoard, 7, 7),
+                                           (isolation.Board, 5, 9), (isolation.BitBoard, 9, 5)]:
+            board = board_class(self.player1, self.player2, width, height)
+            while True:
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                board.apply_move(rng.choice(moves))
+                for player in [self.player1, self.player2]:
+                    square = board.get_player_location(player)
+                    if square is not None:
+                        self.assertEqual(expected(board, square), game_agent.squares_2_moves(board, square))
+                        self.assertEqual(len(expected(board, square)),
+                                         bin(competition_agent.reach_2_moves(board, square)).count('1'))
+
+    def test_feature_heuristics(self):
+        heuristics = [
+            (game_agent.open_move_heuristic, sample_players.open_move_score),
+            (game_agent.improved_heuristic, sample_players.improved_score),
+            (game_agent.center_heuristic, sample_players.center_score),
+            (game_agent.custom_heuristic, competition_agent.custom_score),
+        ]
+        rng = random.Random(0)
+        for board_class in [isolation.Board, isolation.BitBoard]:
+            board = board_class(self.player1, self.player2)
+            board.apply_move((3, 3))
+            board.apply_move((2, 4))
+            while True:
+                for player in [self.player1, self.player2]:
+                    for heuristic, score_fn in heuristics:
+                        score = game_agent.feature_score(heuristic)
+                        self.assertEqual(score_fn(board, player), score(board, player))
+
+                    opponent = board.get_opponent(player)
+                    features = game_agent.extract_features(board, player)
+                    common = set(board.get_legal_moves(player)) & set(board.get_legal_moves(opponent))
+                    self.assertEqual(len(common), features.common_moves)
+                    self.assertEqual(game_agent.is_attacker(board, player), features.attacker)
+                    self.assertEqual(board.is_winner(player), features.won)
+                    self.assertEqual(board.is_loser(player), features.lost)
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                board.apply_move(rng.choice(moves))
+
     def test_score_competition_agent(self):
         self.assertEquals(14.5, competition_agent.custom_score(self.board, self.player1))
         self.assertEquals(-14.5, competition_agent.custom_score(self.board, self.player2))
@@ -0,0 +1,61 @@
+"""Compare the time per position of the scalar score functions with the
+batched NumPy versions in `board_batch`.
+
+The batched times include the conversion of the boards into a
+`BoardBatch`, which is listed separately.
+
+Usage:
+
+    python batch_benchmark.py
+"""
+import random
+import timeit
+
+import game_agent
+import board_batch
+from isolation import Board
+
+BATCH_SIZES = [100, 1000, 10000]
+SCORE_FUNCTIONS = [
+    ("custom_score", game_agent.custom_score, board_batch.custom_score),
+    ("custom_score_2", game_agent.custom_score_2, board_batch.custom_score_2),
+    ("custom_score_3", game_agent.custom_score_3, board_batch.custom_score_3),
+]
+
+
+def random_boards(count, seed=0):
+    """Return positions of random games after a random number of moves."""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = Board("Player1", "Player2", shuffle_moves=False)
+        for _ in range(rng.randint(2, 30)):
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            board.apply_move(rng.choice(moves))
+        boards.append(board)
+    return boards
+
+
+def micros_per_position(function, count):
+    start = timeit.default_timer()
+    function()
+    return 1e6 * (timeit.default_timer() - start) / count
+
+
+def main():
+    print("{:<16}{:>8}{:>12}{:>12}{:>12}".format("Function", "N", "scalar us", "convert us", "batch us"))
+    for count in BATCH_SIZES:
+        boards = random_boards(count)
+        convert = micros_per_position(lambda: board_batch.BoardBatch.from_boards(boards), count)
+        batch = board_batch.BoardBatch.from_boards(boards)
+        for name, score_fn, batch_fn in SCORE_FUNCTIONS:
+            scalar = micros_per_position(
+                lambda: [score_fn(board, board.active_player) for board in boards], count)
+            batched = micros_per_position(lambda: batch_fn(batch, batch.initiative), count)
+            print("{:<16}{:>8}{:>12.2f}{:>12.2f}{:>12.2f}".format(name, count, scalar, convert, batched))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Unit tests for the `isolation.BitBoard` engine. The bitboard must behave
+exactly like `isolation.Board`, so most tests play the same games on both
+boards and compare the results.
+"""
+
+import unittest
+import pickle
+import random
+import timeit
+
+import isolation
+import game_agent
+
+
+class BitBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def create_boards(self, width=7, height=7):
+        board = isolation.Board(self.player1, self.player2, width, height)
+        bitboard = isolation.BitBoard(self.player1, self.player2, width, height)
+        return board, bitboard
+
+    def assert_same_state(self, board, bitboard):
+        self.assertEqual(board._board_state, bitboard._board_state)
+        self.assertEqual(board.move_count, bitboard.move_count)
+        self.assertEqual(board.active_player, bitboard.active_player)
+        self.assertEqual(board.get_blank_spaces(), bitboard.get_blank_spaces())
+        self.assertEqual(len(board.get_blank_spaces()), board.count_blank_spaces())
+        self.assertEqual(len(board.get_blank_spaces()), bitboard.count_blank_spaces())
+        for player in [self.player1, self.player2]:
+            self.assertEqual(board.get_player_location(player), bitboard.get_player_location(player))
+            self.assertEqual(sorted(board.get_legal_moves(player)), sorted(bitboard.get_legal_moves(player)))
+            self.assertEqual(len(board.get_legal_moves(player)), bitboard.count_legal_moves(player))
+            self.assertEqual(board.is_winner(player), bitboard.is_winner(player))
+            self.assertEqual(board.is_loser(player), bitboard.is_loser(player))
+            self.assertEqual(board.utility(player), bitboard.utility(player))
+        self.assertEqual(board.to_string(), bitboard.to_string())
+        self.assertEqual(board.hash(), bitboard.hash())
+        self.assertEqual(board._zobrist.hash_state(board._board_state), board.hash())
+
+    def test_random_games(self):
+        for width, height in [(7, 7), (5, 8), (9, 6)]:
+            for _ in range(10):
+                board, bitboard = self.create_boards(width, height)
+                self.assert_same_state(board, bitboard)
+                while True:
+                    moves = board.get_legal_moves()
+                    if not moves:
+                        break
+                    move = random.choice(moves)
+                    self.assertTrue(bitboard.move_is_legal(move))
+                    board.apply_move(move)
+                    bitboard.apply_move(move)
+                    self.assert_same_state(board, bitboard)
+
+    def test_undo_move(self):
+        for board in self.create_boards():
+            states = []
+            while True:
+                states.append((list(board._board_state), board.move_count, board.active_player))
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                board.apply_move(random.choice(moves))
+
+            copied = board.copy()
+            for state in reversed(states[:-1]):
+                board.undo_move()
+                self.assertEqual(state, (board._board_state, board.move_count, board.active_player))
+            self.assertEqual(0, board.hash())
+            self.assertRaises(IndexError, board.undo_move)
+
+            copied.undo_move()
+            self.assertEqual(states[-2], (copied._board_state, copied.move_count, copied.active_player))
+
+    def test_legal_moves_cache(self):
+        board = isolation.Board(self.player1, self.player2)
+        board.apply_move((3, 3))
+        board.apply_move((2, 4))
+        moves = board.get_legal_moves()
+        opponent_moves = board.get_legal_moves(self.player2)
+        moves.append((-1, -1))
+        self.assertEqual(sorted(moves[:-1]), sorted(board.get_legal_moves()))
+
+        copied = board.copy()
+        board.apply_move(moves[0])
+        self.assertEqual(sorted(moves[:-1]), sorted(copied.get_legal_moves()))
+        self.assertTrue(moves[0] not in board.get_legal_moves(self.player2))
+        board.undo_move()
+        self.assertEqual(sorted(moves[:-1]), sorted(board.get_legal_moves()))
+        self.assertEqual(sorted(opponent_moves), sorted(board.get_legal_moves(self.player2)))
+        self.assertRaises(RuntimeError, board.get_legal_moves, "Player3")
+
+    def test_deterministic_move_order(self):
+        for board_class in [isolation.Board, isolation.BitBoard]:
+            orders = []
+            for _ in range(2):
+                board = board_class(self.player1, self.player2, shuffle_moves=False)
+                order = []
+                while True:
+                    moves = board.get_legal_moves()
+                    if not moves:
+                        break
+                    order.append(moves)
+                    self.assertEqual(moves, board.copy().get_legal_moves())
+                    board = board.forecast_move(moves[len(moves) // 2])
+                orders.append(order)
+            self.assertEqual(orders[0], orders[1])
+
+    def test_slots_and_player_identity(self):
+        for board in self.create_boards():
+            self.assertFalse(hasattr(board, '__dict__'))
+            board.apply_move((3, 3))
+            restored = pickle.loads(pickle.dumps(board))
+            self.assertEqual(board.hash(), restored.hash())
+            self.assertEqual(self.player2, restored.active_player)
+            self.assertEqual(self.player1, board.get_opponent(self.player2))
+            self.assertRaises(RuntimeError, board.get_opponent, "Player3")
+            self.assertFalse(board.is_winner("Player3"))
+
+    def test_serialization_round_trip(self):
+        for width, height in [(7, 7), (5, 8), (9, 6)]:
+            board, bitboard = self.create_boards(width, height)
+            keys = set()
+            while True:
+                packed = board.to_packed()
+                self.assertEqual(packed, bitboard.to_packed())
+                self.assertEqual(board.to_bytes(), bitboard.to_bytes())
+                self.assertNotIn(packed, keys)
+                keys.add(packed)
+                restored = isolation.Board.from_bytes(board.to_bytes(), self.player1, self.player2, width, height)
+                self.assert_same_state(restored, bitboard)
+                restored = isolation.BitBoard.from_packed(packed, self.player1, self.player2, width, height)
+                self.assert_same_state(board, restored)
+
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                move = random.choice(moves)
+                board.apply_move(move)
+                bitboard.apply_move(move)
+        self.assertEqual(9, len(isolation.Board(self.player1, self.player2).to_bytes()))
+
+    def test_hash_independent_of_history(self):
+        for board in self.create_boards():
+            board.apply_move((4, 4))
+            board.apply_move((0, 2))
+            board.apply_move((2, 3))
+            rebuilt = type(board)(self.player1, self.player2)
+            rebuilt._board_state = list(board._board_state)
+            self.assertEqual(board.hash(), rebuilt.hash())
+            self.assertNotEqual(board.hash(), board.forecast_move((1, 4)).hash())
+            self.assertNotEqual(board.hash(), board.forecast_move((2, 1)).hash())
+
+    def test_copy_and_forecast(self):
+        bitboard = isolation.BitBoard(self.player1, self.player2)
+        bitboard.apply_move((4, 4))
+        bitboard.apply_move((0, 2))
+        forecast = bitboard.forecast_move((2, 3))
+        self.assertEqual((4, 4), bitboard.get_player_location(self.player1))
+        self.assertEqual((2, 3), forecast.get_player_location(self.player1))
+        self.assertTrue(bitboard.move_is_legal((2, 3)))
+        self.assertFalse(forecast.move_is_legal((2, 3)))
+        self.assertEqual(self.player2, forecast.active_player)
+        self.assertNotEqual(bitboard.hash(), forecast.hash())
+
+    def test_board_state_assignment(self):
+        board, bitboard = self.create_boards()
+        board.apply_move((4, 4))
+        board.apply_move((0, 2))
+        board.apply_move((2, 3))
+        bitboard._board_state = board._board_state
+        bitboard.move_count = board.move_count
+        bitboard._active_player, bitboard._inactive_player = board.active_player, board.inactive_player
+        self.assert_same_state(board, bitboard)
+
+    def test_alphabeta_on_bitboard(self):
+        player = game_agent.AlphaBetaPlayer()
+        bitboard = isolation.BitBoard(player, self.player2)
+        bitboard.apply_move((4, 4))
+        bitboard.apply_move((0, 2))
+        self.assertTrue(game_agent.is_attacker(bitboard, player))
+        move = player.get_move(bitboard, self.create_clock())
+        self.assertTrue(move in bitboard.get_legal_moves(), 'best move: ' + str(move))
+
+
+if __name__ == '__main__':
+    unittest.main()
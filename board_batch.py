@@ -0,0 +1,219 @@
+"""Evaluate many Isolation positions at once with NumPy.
+
+A `BoardBatch` stores N positions of the same board size as arrays (struct
+of arrays): an N x cells array of blocked cells, an N x 2 array of player
+locations and vectors of the initiative and move count. The features and
+heuristics of `game_agent` are computed for the whole batch with a few array
+operations instead of one Python call per position, e.g. to score the
+positions of self-play games or all leaves of a search tree.
+
+Cells are indexed like `isolation.Board._board_state`: `row + column * height`.
+Players are referred to by index, 0 for player 1 and 1 for player 2. A
+location of -1 means that the player has not moved yet.
+"""
+import numpy as np
+
+from isolation import Board
+from isolation.bitboard import BoardGeometry
+from game_agent import Features, knight_degree_map
+
+
+class BoardBatch():
+    """A batch of positions of boards of the same size.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the boards.
+
+    height : int
+        The number of rows of the boards.
+
+    blocked : numpy.ndarray
+        A boolean array of shape (N, width * height); True marks a blocked
+        cell.
+
+    locations : numpy.ndarray
+        An integer array of shape (N, 2) with the cell index of player 1 and
+        player 2, or -1 if the player has not moved yet.
+
+    initiative : numpy.ndarray
+        An integer array of shape (N,), 0 if player 1 is to move and 1 if
+        player 2 is to move.
+
+    move_count : numpy.ndarray (optional)
+        An integer array of shape (N,) with the number of moves applied to
+        the boards.
+    """
+    def __init__(self, width, height, blocked, locations, initiative, move_count=None):
+        self.width = width
+        self.height = height
+        self.blocked = np.asarray(blocked, dtype=bool)
+        self.locations = np.asarray(locations, dtype=np.int64)
+        self.initiative = np.asarray(initiative, dtype=np.int64)
+        if move_count is None:
+            move_count = self.blocked.sum(axis=1)
+        self.move_count = np.asarray(move_count, dtype=np.int64)
+
+        # adjacency[i, j] is True if cell j is one knight move away from i
+        geometry = BoardGeometry.get(width, height)
+        self.adjacency = np.zeros((geometry.size, geometry.size), dtype=bool)
+        for idx, targets in enumerate(geometry.knight_targets):
+            self.adjacency[idx, targets] = True
+        self.adjacency_matrix = self.adjacency.astype(np.float32)
+
+    @classmethod
+    def from_boards(cls, boards):
+        """Create a batch from a sequence of `isolation.Board` (or
+        `isolation.BitBoard`) objects of the same size.
+        """
+        width, height = boards[0].width, boards[0].height
+        size = width * height
+        states = [board._board_state for board in boards]
+        blocked = np.array([state[:size] for state in states], dtype=bool).reshape(len(boards), size)
+        locations = np.array([[-1 if state[-1] is None else state[-1],
+                               -1 if state[-2] is None else state[-2]] for state in states],
+                             dtype=np.int64).reshape(len(boards), 2)
+        initiative = np.array([state[-3] for state in states], dtype=np.int64)
+        move_count = np.array([board.move_count for board in boards], dtype=np.int64)
+        return cls(width, height, blocked, locations, initiative, move_count)
+
+    def to_boards(self, player_1, player_2, board_class=Board):
+        """Create a board of class `board_class` for every position of the
+        batch, with `player_1` and `player_2` as the players.
+        """
+        boards = []
+        for blocked, locations, initiative, move_count in zip(
+                self.blocked, self.locations, self.initiative, self.move_count):
+            board = board_class(player_1, player_2, self.width, self.height)
+            state = [int(cell) for cell in blocked]
+            state.extend([int(initiative),
+                          None if locations[1] < 0 else int(locations[1]),
+                          None if locations[0] < 0 else int(locations[0])])
+            board._board_state = state
+            board.move_count = int(move_count)
+            if initiative:
+                board._active_player, board._inactive_player = player_2, player_1
+            boards.append(board)
+        return boards
+
+    def __len__(self):
+        return len(self.blocked)
+
+    def moves(self, player):
+        """Return the legal moves of a player as a boolean array of shape
+        (N, cells). A player who has not moved yet can move to every blank
+        cell.
+
+        Parameters
+        ----------
+        player : int or numpy.ndarray
+            The index of the player (0 or 1), or an array with one index per
+            position (e.g. `batch.initiative` for the active player)
+        """
+        blank = ~self.blocked
+        location = self.locations[np.arange(len(self)), player]
+        neighbours = self.adjacency[np.maximum(location, 0)]
+        return np.where((location >= 0)[:, None], neighbours & blank, blank)
+
+    def blank_grid(self):
+        """Return the blank cells as a boolean array of shape
+        (N, height, width), indexed by (position, row, column).
+        """
+        blank = ~self.blocked.reshape(len(self), self.width, self.height)
+        return blank.transpose(0, 2, 1)
+
+    def knight_degrees(self):
+        """Return the knight degree map (see `game_agent.knight_degree_map`)
+        of every position as an array of shape (N, height, width).
+        """
+        return knight_degree_map(self.blank_grid())
+
+    def reach(self, moves):
+        """Return the cells that can be reached in one or two moves from the
+        legal moves `moves` (as returned by `moves()`).
+        """
+        blank = ~self.blocked
+        # float matrix products use BLAS, which is much faster than integers
+        two_moves = moves.astype(np.float32) @ self.adjacency_matrix > 0
+        return (moves | two_moves) & blank
+
+    def features(self, player):
+        """Compute the features of all positions from the point of view of a
+        player.
+
+        Parameters
+        ----------
+        player : int or numpy.ndarray
+            The index of the player (0 or 1), or an array with one index per
+            position
+
+        Returns
+        -------
+        `game_agent.Features`
+            The features with an array of shape (N,) for every field
+        """
+        player = np.broadcast_to(np.asarray(player, dtype=np.int64), (len(self),))
+        opponent = 1 - player
+        own_moves = self.moves(player)
+        opp_moves = self.moves(opponent)
+        own_reach = self.reach(own_moves)
+        opp_reach = self.reach(opp_moves)
+
+        active_stuck = ~np.where(player == self.initiative, own_moves.any(axis=1), opp_moves.any(axis=1))
+        active = player == self.initiative
+
+        own_location = self.locations[np.arange(len(self)), player]
+        placed = (self.locations >= 0).all(axis=1)
+        parity = (self.locations.sum(axis=1) + self.initiative) % 2 == 1
+        attacker = placed & (parity == (player == 1))
+        row = own_location % self.height
+        column = own_location // self.height
+        centre_distance = np.where(
+            placed, (self.height / 2. - row)**2 + (self.width / 2. - column)**2, 0.)
+
+        return Features(won=active_stuck & ~active, lost=active_stuck & active,
+                        own_moves=own_moves.sum(axis=1), opp_moves=opp_moves.sum(axis=1),
+                        common_moves=(own_moves & opp_moves).sum(axis=1),
+                        own_reach=own_reach.sum(axis=1), opp_reach=opp_reach.sum(axis=1),
+                        common_reach=(own_reach & opp_reach).sum(axis=1),
+                        attacker=attacker, centre_distance=centre_distance)
+
+
+def evaluate_features(features, scores):
+    """Return `scores` with +/-infinity for the positions where the game is
+    over, like `game_agent.evaluate_features`.
+    """
+    scores = np.where(features.won, float('inf'), scores)
+    return np.where(features.lost, float('-inf'), scores)
+
+
+def custom_score(batch, player):
+    """`game_agent.custom_score` for all positions of `batch`."""
+    features = batch.features(player)
+    common_square_factor = np.where(features.attacker, 0.5, -0.5)
+    scores = (features.own_reach - features.opp_reach
+              + common_square_factor * features.common_reach)
+    return evaluate_features(features, scores)
+
+
+def custom_score_2(batch, player):
+    """`game_agent.custom_score_2` for all positions of `batch`."""
+    features = batch.features(player)
+    bonus = np.where(features.attacker, 3., -3.) * (features.common_moves > 0)
+    scores = (features.own_moves - features.opp_moves) + bonus
+    return evaluate_features(features, scores.astype(float))
+
+
+def custom_score_3(batch, player):
+    """`game_agent.custom_score_3` for all positions of `batch`."""
+    features = batch.features(player)
+    scores = (features.own_reach - features.opp_reach).astype(float)
+    return evaluate_features(features, scores)
+
+
+def improved_score(batch, player):
+    """`sample_players.improved_score` for all positions of `batch`."""
+    features = batch.features(player)
+    scores = (features.own_moves - features.opp_moves).astype(float)
+    return evaluate_features(features, scores)
@@ -0,0 +1,102 @@
+"""Unit tests for the batched NumPy evaluation."""
+
+import unittest
+import random
+
+import isolation
+import game_agent
+import sample_players
+
+try:
+    import numpy
+    import board_batch
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class BoardBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def random_boards(self, count, width=7, height=7, seed=0):
+        rng = random.Random(seed)
+        boards = []
+        while len(boards) < count:
+            board = isolation.Board(self.player1, self.player2, width, height, shuffle_moves=False)
+            for _ in range(rng.randint(0, width * height)):
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                board.apply_move(rng.choice(moves))
+            boards.append(board)
+        return boards
+
+    def test_round_trip(self):
+        boards = self.random_boards(20, 5, 6)
+        batch = board_batch.BoardBatch.from_boards(boards)
+        self.assertEqual(20, len(batch))
+        for board_class in [isolation.Board, isolation.BitBoard]:
+            for board, restored in zip(boards, batch.to_boards(self.player1, self.player2, board_class)):
+                self.assertEqual(board.hash(), restored.hash())
+                self.assertEqual(board.move_count, restored.move_count)
+                self.assertEqual(board.active_player, restored.active_player)
+
+    def test_same_scores_as_scalar_functions(self):
+        score_functions = [
+            (board_batch.custom_score, game_agent.custom_score),
+            (board_batch.custom_score_2, game_agent.custom_score_2),
+            (board_batch.custom_score_3, game_agent.custom_score_3),
+            (board_batch.improved_score, sample_players.improved_score),
+        ]
+        for width, height in [(7, 7), (6, 8)]:
+            boards = self.random_boards(100, width, height)
+            batch = board_batch.BoardBatch.from_boards(boards)
+            for batch_fn, score_fn in score_functions:
+                for index, player in enumerate([self.player1, self.player2]):
+                    expected = [score_fn(board, player) for board in boards]
+                    self.assertEqual(expected, list(batch_fn(batch, index)))
+                active = [score_fn(board, board.active_player) for board in boards]
+                self.assertEqual(active, list(batch_fn(batch, batch.initiative)))
+
+    def test_features(self):
+        boards = self.random_boards(50)
+        batch = board_batch.BoardBatch.from_boards(boards)
+        features = batch.features(0)
+        for idx, board in enumerate(boards):
+            expected = game_agent.extract_features(board, self.player1)
+            self.assertEqual(expected, game_agent.Features(*[field[idx] for field in features]))
+
+    def test_knight_degrees(self):
+        directions = isolation.bitboard.BoardGeometry.DIRECTIONS
+        boards = self.random_boards(30, 6, 8)
+        batch_degrees = board_batch.BoardBatch.from_boards(boards).knight_degrees()
+        for board, batch_map in zip(boards, batch_degrees):
+            degrees = game_agent.knight_degree_map(game_agent.blank_grid(board))
+            self.assertEqual((8, 6), degrees.shape)
+            self.assertTrue((degrees == batch_map).all())
+            for row in range(board.height):
+                for column in range(board.width):
+                    expected = sum(1 for dr, dc in directions
+                                   if board.move_is_legal((row + dr, column + dc)))
+                    self.assertEqual(expected, degrees[row, column])
+
+            for player in [self.player1, self.player2]:
+                location = board.get_player_location(player)
+                if location is not None:
+                    self.assertEqual(len(board.get_legal_moves(player)), degrees[location])
+
+    def test_weighted_mobility_score(self):
+        board = isolation.Board(self.player1, self.player2)
+        board.apply_move((3, 3))
+        board.apply_move((0, 0))
+        score = game_agent.weighted_mobility_score(board, self.player1)
+        self.assertEqual(-score, game_agent.weighted_mobility_score(board, self.player2))
+        # 8 moves into the open centre against 2 moves from the corner
+        self.assertEqual(38. - 8., score)
+
+
+if __name__ == '__main__':
+    unittest.main()
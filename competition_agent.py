@@ -2,6 +2,140 @@ class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
     pass
 
+class SearchClock():
+    """Copied from game_agent.py."""
+    MAX_INTERVAL = 128
+
+    def __init__(self):
+        self.time_left = None
+        self.threshold = 0.
+        self.nodes = 0
+        self.next_poll = 0
+        self.ms_per_node = None
+        self.last_poll = (0, 0.)
+
+    def start(self, time_left, threshold):
+        self.time_left = time_left
+        self.threshold = threshold
+        self.last_poll = (self.nodes, time_left())
+        self.schedule(self.last_poll[1])
+
+    def check(self):
+        self.nodes += 1
+        if self.nodes >= self.next_poll:
+            self.poll()
+
+    def poll(self):
+        left = self.time_left()
+        last_nodes, last_left = self.last_poll
+        nodes = self.nodes - last_nodes
+        elapsed = last_left - left
+        if nodes > 0 and 0. <= elapsed < float("inf"):
+            sample = elapsed / nodes
+            if self.ms_per_node is None:
+                self.ms_per_node = sample
+            else:
+                # adapt quickly to slower nodes and slowly to faster nodes
+                self.ms_per_node = max(sample, (self.ms_per_node + sample) / 2)
+        self.last_poll = (self.nodes, left)
+        self.schedule(left)
+
+    def schedule(self, left):
+        if left < self.threshold:
+            raise SearchTimeout()
+        if self.ms_per_node is None:
+            interval = 1
+        elif self.ms_per_node <= 0.:
+            interval = self.MAX_INTERVAL
+        else:
+            interval = (left - self.threshold) / (2 * self.ms_per_node)
+            interval = max(1, min(self.MAX_INTERVAL, int(interval)))
+        self.next_poll = self.nodes + interval
+
+def predict_iteration_time(iteration_times):
+    """Copied from game_agent.py."""
+    if len(iteration_times) < 2 or iteration_times[-2] <= 0:
+        return 0.
+    if len(iteration_times) >= 3 and iteration_times[-3] > 0:
+        branching_factor = (iteration_times[-1] / iteration_times[-3]) ** 0.5
+    else:
+        branching_factor = iteration_times[-1] / iteration_times[-2]
+    return iteration_times[-1] * max(1., branching_factor)
+
+def popcount(mask):
+    """Copied from isolation/bitboard.py."""
+    return bin(mask).count('1')
+
+class BoardGeometry(object):
+    """Copied from isolation/bitboard.py, only the tables used here."""
+    DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                  (1, -2), (1, 2), (2, -1), (2, 1)]
+
+    _instances = {}
+
+    @classmethod
+    def get(cls, width, height):
+        key = (width, height)
+        geometry = cls._instances.get(key)
+        if geometry is None:
+            geometry = cls(width, height)
+            cls._instances[key] = geometry
+        return geometry
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.squares = [(idx % height, idx // height) for idx in range(self.size)]
+        self.knight_targets = []
+        self.knight_masks = []
+        for r, c in self.squares:
+            targets = [(r + dr) + (c + dc) * height for dr, dc in self.DIRECTIONS
+                       if 0 <= r + dr < height and 0 <= c + dc < width]
+            mask = 0
+            for target in targets:
+                mask |= 1 << target
+            self.knight_targets.append(targets)
+            self.knight_masks.append(mask)
+        self.two_move_masks = []
+        for idx in range(self.size):
+            mask = self.knight_masks[idx]
+            for target in self.knight_targets[idx]:
+                mask |= self.knight_masks[target]
+            self.two_move_masks.append(mask & ~(1 << idx))
+
+    def index(self, move):
+        return move[0] + move[1] * self.height
+
+def blank_mask(game):
+    """Copied from game_agent.py."""
+    board_mask = getattr(game, 'blank_mask', None)
+    if board_mask is not None:
+        return board_mask()
+    mask = 0
+    for row, column in game.get_blank_spaces():
+        mask |= 1 << (row + column * game.height)
+    return mask
+
+def count_blank_spaces(game):
+    """Copied from game_agent.py."""
+    count = getattr(game, 'count_blank_spaces', None)
+    if count is not None:
+        return count()
+    return len(game.get_blank_spaces())
+
+def make_move(game, move):
+    """Copied from game_agent.py."""
+    if hasattr(game, 'undo_move'):
+        game.apply_move(move)
+        return game
+    return game.forecast_move(move)
+
+def take_back(game, child):
+    """Copied from game_agent.py."""
+    if child is game:
+        game.undo_move()
+
 def custom_score(game, player):
     """Copied from game_agent.py."""
     if game.is_winner(player):
@@ -9,11 +143,12 @@ def custom_score(game, player):
     if game.is_loser(player):
         return float('-inf')
     
+    blank = blank_mask(game)
     player_square = game.get_player_location(player)
-    player_squares = squares_2_moves(game, player_square)
+    player_squares = reach_2_moves(game, player_square, blank)
     
     opp_square = game.get_player_location(game.get_opponent(player))
-    opp_squares = squares_2_moves(game, opp_square)
+    opp_squares = reach_2_moves(game, opp_square, blank)
     
     # player is the attacker if:
     # 1) the players are on squares of different color and player is inactive or
@@ -21,20 +156,27 @@ def custom_score(game, player):
     is_attacker = bool((player_square[0] + player_square[1] + opp_square[0] + opp_square[1]) % 2) == (player == game.inactive_player)
     common_square_factor = 0.5 if is_attacker else -0.5
     
-    return len(player_squares) - len(opp_squares) + common_square_factor * len(player_squares & opp_squares)
+    return (popcount(player_squares) - popcount(opp_squares)
+            + common_square_factor * popcount(player_squares & opp_squares))
 
-MOVE_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
-
-def squares_2_moves(board, square):
+def reach_2_moves(board, square, blank=None):
     """Copied from game_agent.py."""
-    r, c = square
-    
-    moves1 = set((r + dr, c + dc) for dr, dc in MOVE_DIRECTIONS if board.move_is_legal((r + dr, c + dc)))
+    geometry = BoardGeometry.get(board.width, board.height)
+    if blank is None:
+        blank = blank_mask(board)
+    idx = geometry.index(square)
+    knight_masks = geometry.knight_masks
     
-    moves2 = set((r1 + dr, c1 + dc) for dr, dc in MOVE_DIRECTIONS for (r1, c1) in moves1
-                   if board.move_is_legal((r1 + dr, c1 + dc)))
+    moves1 = knight_masks[idx] & blank
+    if moves1 == knight_masks[idx]:
+        return geometry.two_move_masks[idx] & blank
     
-    return moves1 | moves2
+    reach = moves1
+    while moves1:
+        low_bit = moves1 & -moves1
+        reach |= knight_masks[low_bit.bit_length() - 1]
+        moves1 ^= low_bit
+    return reach & blank
 
 
 class CustomPlayer():
@@ -47,6 +189,8 @@ class CustomPlayer():
         self.score = score_fn
         self.time_left = None
         self.TIMER_THRESHOLD = timeout    
+        self.clock = SearchClock()
+        self.iteration_times = []
     
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -72,11 +216,17 @@ class CustomPlayer():
         self.time_left = time_left
         
         best_path = []
-        max_depth = len(game.get_blank_spaces())
+        max_depth = count_blank_spaces(game)
 
+        # skip iterations that are predicted to time out
+        self.iteration_times = []
         try:
             for depth in range(1, max_depth):
+                start = time_left()
+                if predict_iteration_time(self.iteration_times) > start - self.TIMER_THRESHOLD:
+                    break
                 better_path = self.alphabeta(game, depth, best_path)
+                self.iteration_times.append(start - time_left())
                 if better_path:
                     best_path = better_path
                 else:
@@ -112,10 +262,11 @@ class CustomPlayer():
             moves that seem most promising in this search. If there
             are no more legal moves, an empty list is returned.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.start(self.time_left, self.TIMER_THRESHOLD)
 
-        score, path = self.max_value(game, depth, preferred_path, alpha, beta)
+        # the search applies and takes back moves on a single copy of the
+        # board, so the position passed by the caller is never modified
+        score, path = self.max_value(game.copy(), depth, preferred_path, alpha, beta)
         return path
         
     def max_value(self, game, depth, preferred_path, alpha, beta):
@@ -124,7 +275,7 @@ class CustomPlayer():
         Parameters
         ----------
         game : isolation.Board
-            a game position
+            a game position; moves are applied to it and taken back again
         depth : int
             Depth is an integer representing the maximum number of plies to
             search in the game tree before aborting
@@ -135,8 +286,7 @@ class CustomPlayer():
             of the max player) found in the current search and the list of
             moves that lead to this score.
         """          
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.check()
         
         player = game.active_player
         if depth == 0 or game.is_loser(player):
@@ -152,8 +302,9 @@ class CustomPlayer():
         count = 0
         for move in moves:
             count += 1
-            after_move = game.forecast_move(move)
-            (score, path) = self.min_value(after_move, depth - 1, preferred_path[1:], alpha, beta)
+            child = make_move(game, move)
+            (score, path) = self.min_value(child, depth - 1, preferred_path[1:], alpha, beta)
+            take_back(game, child)
             if score > best_score:
                 best_score = score
                 best_path = [move] + path
@@ -174,7 +325,7 @@ class CustomPlayer():
         Parameters
         ----------
         game : isolation.Board
-            a game position
+            a game position; moves are applied to it and taken back again
         depth : int
             Depth is an integer representing the maximum number of plies to
             search in the game tree before aborting
@@ -185,8 +336,7 @@ class CustomPlayer():
             of the min player) found in the current search and the list of
             moves that lead to this score.
         """             
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.check()
         
         player = game.inactive_player
         if depth == 0 or game.is_winner(player):
@@ -202,8 +352,9 @@ class CustomPlayer():
         count = 0
         for move in moves:
             count += 1
-            after_move = game.forecast_move(move)
-            (score, path) = self.max_value(after_move, depth - 1, preferred_path[1:], alpha, beta)
+            child = make_move(game, move)
+            (score, path) = self.max_value(child, depth - 1, preferred_path[1:], alpha, beta)
+            take_back(game, child)
             if score < best_score:
                 best_score = score
                 best_path = [move] + path
@@ -0,0 +1,181 @@
+"""An exact win/loss solver for positions with few reachable blank cells.
+
+Near the end of a game the remaining game tree is small enough to be solved
+outright. `EndgameSolver` searches it with a boolean alpha-beta search (a
+position is won if some move leads to a position that is lost for the
+opponent) directly on bitmasks, with a memo table of proven results. Cells
+that neither player can reach any more are removed before the search, as
+they cannot influence the result, so positions that only differ in such
+cells share their memo entries.
+
+The solver has the same interface as `partition.PartitionSolver`, so it can
+be passed as `endgame_solver` to the search players.
+"""
+from isolation.bitboard import BoardGeometry, popcount
+
+
+class EndgameSolver():
+    """Solves positions with at most `max_blank` blank cells that can still be
+    reached by one of the players.
+
+    Parameters
+    ----------
+    max_blank : int (optional)
+        The largest number of reachable blank cells of a position that is
+        solved. The cost of the search grows exponentially with this number.
+
+    memo_size : int (optional)
+        The number of proven results kept; the memo is cleared when it grows
+        beyond this size.
+
+    Attributes
+    ----------
+    proofs, wins, losses : int
+        The number of positions proven, and how many of them are won or lost
+        for the player to move
+    nodes : int
+        The number of positions visited by the search
+    memo_hits : int
+        The number of positions whose result was found in the memo
+    """
+    def __init__(self, max_blank=24, memo_size=2**20):
+        self.max_blank = max_blank
+        self.memo_size = memo_size
+        self.memo = {}
+        self.geometry = None
+        self.proofs = 0
+        self.wins = 0
+        self.losses = 0
+        self.nodes = 0
+        self.memo_hits = 0
+
+    def stats(self):
+        """Return the proof statistics as a dictionary."""
+        return {'proofs': self.proofs, 'wins': self.wins, 'losses': self.losses,
+                'nodes': self.nodes, 'memo_hits': self.memo_hits,
+                'memo_entries': len(self.memo)}
+
+    def reachable_position(self, game):
+        """Return the geometry, the reachable blank cells and the locations of
+        the active and the inactive player, or None if a player has not moved
+        yet or too many blank cells are reachable.
+
+        Positions with more than `max_blank` blank cells are rejected before
+        the reachable cells are flood filled, so that the search nodes of
+        open positions do not pay for the fill; they are not solved even if
+        fewer of their blank cells are reachable.
+        """
+        if game.count_blank_spaces() > self.max_blank:
+            return None
+        own_location = game.get_player_location(game.active_player)
+        opp_location = game.get_player_location(game.inactive_player)
+        if own_location is None or opp_location is None:
+            return None
+        geometry = BoardGeometry.get(game.width, game.height)
+        if geometry is not self.geometry:
+            # the keys of the memo are only meaningful for one board size
+            self.memo.clear()
+            self.geometry = geometry
+        own = geometry.index(own_location)
+        opp = geometry.index(opp_location)
+        blank = game.blank_mask()
+        reachable = geometry.flood_fill(own, blank) | geometry.flood_fill(opp, blank)
+        if popcount(reachable) > self.max_blank:
+            return None
+        return geometry, reachable, own, opp
+
+    def ordered_moves(self, geometry, blank, own, opp):
+        """Return the moves of the player at `own` as (cell index, bit) pairs,
+        the moves that leave the opponent the fewest replies first.
+        """
+        knight_masks = geometry.knight_masks
+        opp_moves = knight_masks[opp] & blank
+        moves = knight_masks[own] & blank
+        ordered = []
+        while moves:
+            low_bit = moves & -moves
+            moves ^= low_bit
+            ordered.append((popcount(opp_moves & ~low_bit), low_bit.bit_length() - 1, low_bit))
+        ordered.sort()
+        return [(idx, bit) for _, idx, bit in ordered]
+
+    def is_won(self, geometry, blank, own, opp, clock=None):
+        """Return True if the player at cell `own` to move wins against the
+        player at cell `opp` on the blank cells `blank`.
+        """
+        if clock is not None:
+            clock.check()
+        self.nodes += 1
+        key = (blank, own, opp)
+        result = self.memo.get(key)
+        if result is not None:
+            self.memo_hits += 1
+            return result
+
+        result = False
+        for idx, bit in self.ordered_moves(geometry, blank, own, opp):
+            if not self.is_won(geometry, blank ^ bit, opp, idx, clock):
+                result = True
+                break
+
+        if len(self.memo) >= self.memo_size:
+            self.memo.clear()
+        self.memo[key] = result
+        return result
+
+    def active_player_wins(self, game, clock=None):
+        """Return True if the active player wins, False if it loses and None
+        if the position has too many reachable blank cells.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            the position to solve
+        clock : `game_agent.SearchClock` (optional)
+            checked at every node of the search, so that it can be stopped
+            by a `SearchTimeout`
+        """
+        position = self.reachable_position(game)
+        if position is None:
+            return None
+        result = self.is_won(*position, clock=clock)
+        self.proofs += 1
+        if result:
+            self.wins += 1
+        else:
+            self.losses += 1
+        return result
+
+    def solve(self, game, player, clock=None):
+        """Return float("inf") if `player` wins the position, float("-inf")
+        if it loses, or None if the position is not solved.
+        """
+        active_wins = self.active_player_wins(game, clock)
+        if active_wins is None:
+            return None
+        if active_wins == (player == game.active_player):
+            return float("inf")
+        return float("-inf")
+
+    def best_move(self, game, clock=None):
+        """Return a proven winning move of the active player, or, if the
+        position is lost, the move that keeps the most moves for the next
+        turn. Returns None if the position is not solved or there are no
+        legal moves.
+        """
+        position = self.reachable_position(game)
+        if position is None:
+            return None
+        geometry, blank, own, opp = position
+        moves = self.ordered_moves(geometry, blank, own, opp)
+        if not moves:
+            return None
+        self.proofs += 1
+        for idx, bit in moves:
+            if not self.is_won(geometry, blank ^ bit, opp, idx, clock):
+                self.wins += 1
+                return geometry.squares[idx]
+        self.losses += 1
+        knight_masks = geometry.knight_masks
+        idx, _ = max(moves, key=lambda move: popcount(knight_masks[move[0]] & blank & ~move[1]))
+        return geometry.squares[idx]
@@ -0,0 +1,81 @@
+"""Compare the time needed to prove the result of endgame positions with a
+full-depth alpha-beta search and with the exact endgame solver.
+
+The positions are taken from random games once few blank cells are left.
+Both searches return the exact result; the solver searches bitmasks instead
+of boards and shares proven results between the positions of a game.
+
+Usage:
+
+    python endgame_benchmark.py
+"""
+import random
+import timeit
+
+from isolation import Board
+from game_agent import AlphaBetaPlayer
+from endgame import EndgameSolver
+
+NUM_POSITIONS = 20
+BLANK_SPACES = [20, 24, 28, 32]
+
+
+def random_positions(count, blank, seed=0):
+    """Return positions of random games with at most `blank` blank cells
+    that are not decided yet.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = Board("Player1", "Player2", shuffle_moves=False)
+        while game.get_legal_moves() and game.count_blank_spaces() > blank:
+            game.apply_move(rng.choice(game.get_legal_moves()))
+        if game.get_legal_moves():
+            positions.append(game)
+    return positions
+
+
+def alphabeta_proof(game):
+    """Return the result for the active player and the number of nodes of a
+    full-depth alpha-beta search.
+    """
+    agent = AlphaBetaPlayer()
+    agent.time_left = lambda: 1e9
+    agent.clock.start(agent.time_left, agent.TIMER_THRESHOLD)
+    player = Board(agent, "Opponent", game.width, game.height, shuffle_moves=False)
+    player._board_state = list(game._board_state)
+    player.move_count = game.move_count
+    if game.active_player != game._player_1:
+        player._active_player, player._inactive_player = "Opponent", agent
+    score, _ = agent.max_value(player, game.count_blank_spaces(), float("-inf"), float("inf"))
+    return score, agent.clock.nodes
+
+
+def main():
+    print("{:>6}{:>16}{:>12}{:>16}{:>12}{:>12}".format(
+        "blank", "alphabeta ms", "nodes", "solver ms", "nodes", "memo hits"))
+    for blank in BLANK_SPACES:
+        positions = random_positions(NUM_POSITIONS, blank)
+
+        start = timeit.default_timer()
+        alphabeta_nodes = 0
+        for game in positions:
+            _, nodes = alphabeta_proof(game)
+            alphabeta_nodes += nodes
+        alphabeta_millis = 1000 * (timeit.default_timer() - start)
+
+        solver = EndgameSolver(max_blank=blank)
+        start = timeit.default_timer()
+        for game in positions:
+            solver.active_player_wins(game)
+        solver_millis = 1000 * (timeit.default_timer() - start)
+
+        stats = solver.stats()
+        print("{:>6}{:>16.1f}{:>12}{:>16.1f}{:>12}{:>12}".format(
+            blank, alphabeta_millis / NUM_POSITIONS, alphabeta_nodes // NUM_POSITIONS,
+            solver_millis / NUM_POSITIONS, stats['nodes'] // NUM_POSITIONS,
+            stats['memo_hits'] // NUM_POSITIONS))
+
+
+if __name__ == "__main__":
+    main()
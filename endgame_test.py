@@ -0,0 +1,144 @@
+"""Unit tests for the exact endgame solver `endgame.EndgameSolver`."""
+
+import unittest
+import random
+import timeit
+
+import isolation
+import game_agent
+from endgame import EndgameSolver
+
+
+class EndgameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def active_player_wins(self, board):
+        """Solve the position by searching the whole game tree."""
+        for move in board.get_legal_moves():
+            board.apply_move(move)
+            opponent_wins = self.active_player_wins(board)
+            board.undo_move()
+            if not opponent_wins:
+                return True
+        return False
+
+    def random_positions(self, count, blank, width=5, height=5, seed=0):
+        """Play random games until `count` positions with at most `blank`
+        blank cells are found.
+        """
+        rng = random.Random(seed)
+        positions = []
+        while len(positions) < count:
+            board = isolation.Board(self.player1, self.player2, width, height)
+            while board.get_legal_moves():
+                board.apply_move(rng.choice(board.get_legal_moves()))
+                if board.count_blank_spaces() <= blank:
+                    positions.append(board)
+                    break
+        return positions
+
+    def test_solve_matches_full_search(self):
+        solver = EndgameSolver(max_blank=12)
+        decided = 0
+        for board in self.random_positions(60, 12):
+            active_wins = solver.active_player_wins(board)
+            if active_wins is None:
+                continue
+            decided += 1
+            self.assertEqual(self.active_player_wins(board), active_wins, board.to_string())
+            expected = float("inf") if active_wins else float("-inf")
+            self.assertEqual(expected, solver.solve(board, board.active_player))
+            self.assertEqual(-expected, solver.solve(board, board.inactive_player))
+
+            move = solver.best_move(board)
+            if move is not None:
+                self.assertIn(move, board.get_legal_moves())
+            if active_wins:
+                board.apply_move(move)
+                self.assertFalse(self.active_player_wins(board))
+        self.assertEqual(60, decided)
+
+        stats = solver.stats()
+        self.assertEqual(stats['wins'] + stats['losses'], stats['proofs'])
+        self.assertGreater(stats['memo_hits'], 0)
+        self.assertGreater(stats['nodes'], stats['memo_entries'])
+
+    def test_threshold(self):
+        board = isolation.Board(self.player1, self.player2)
+        solver = EndgameSolver(max_blank=20)
+        self.assertIsNone(solver.best_move(board))
+        board.apply_move((3, 3))
+        board.apply_move((0, 0))
+        self.assertIsNone(solver.solve(board, self.player1))
+        self.assertEqual(0, solver.proofs)
+
+    def test_alphabeta_plays_proven_move(self):
+        solver = EndgameSolver(max_blank=14)
+        for board in self.random_positions(20, 14, 7, 7, seed=1):
+            if not board.get_legal_moves():
+                continue
+            move = game_agent.AlphaBetaPlayer(endgame_solver=solver).get_move(
+                board.copy(), self.create_clock())
+            self.assertIn(move, board.get_legal_moves())
+            if solver.active_player_wins(board):
+                self.assertFalse(solver.active_player_wins(board.forecast_move(move)))
+        self.assertGreater(solver.proofs, 0)
+
+    def test_iterative_deepening_stops_at_forced_result(self):
+        for board in self.random_positions(20, 14, 7, 7, seed=2):
+            if not board.get_legal_moves():
+                continue
+            for player in [game_agent.AlphaBetaPlayer(), game_agent.PVSPlayer()]:
+                player.get_move(board.copy(), self.create_clock(1000))
+                # the last iteration proved the result of the position
+                self.assertLess(len(player.iteration_times), board.count_blank_spaces() - 1)
+
+    def test_search_returns_move_at_solved_root(self):
+        solver = EndgameSolver(max_blank=20)
+        solved = 0
+        for board in self.random_positions(30, 20, 7, 7, seed=4):
+            if not board.get_legal_moves() or solver.active_player_wins(board) is None:
+                continue
+            solved += 1
+            for player in [game_agent.AlphaBetaPlayer(endgame_solver=solver),
+                           game_agent.PVSPlayer(endgame_solver=solver)]:
+                player.time_left = self.create_clock(10000)
+                player.start_search(board)
+                if isinstance(player, game_agent.PVSPlayer):
+                    _, move = player.aspiration_search(board, 1)
+                else:
+                    move = player.alphabeta(board, 1)
+                self.assertIn(move, board.get_legal_moves())
+        self.assertGreater(solved, 0)
+
+    def test_slow_solver_falls_back_to_search(self):
+        class SlowSolver():
+            """A solver that never decides a position at the root."""
+            def best_move(self, game, clock=None):
+                while True:
+                    clock.check()
+
+            def solve(self, game, player, clock=None):
+                return None
+
+        board = self.random_positions(1, 40, 7, 7, seed=3)[0]
+        for player_class in [game_agent.AlphaBetaPlayer, game_agent.PVSPlayer]:
+            player = player_class(endgame_solver=SlowSolver())
+            time_left = self.create_clock()
+            move = player.get_move(board.copy(), time_left)
+            self.assertIn(move, board.get_legal_moves())
+            # the heuristic search still ran after the solver gave up
+            self.assertGreater(len(player.iteration_times), 0)
+            self.assertGreater(time_left(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
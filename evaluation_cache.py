@@ -0,0 +1,69 @@
+"""A cache for the values of heuristic score functions.
+
+Score functions like `game_agent.custom_score` are the most expensive part
+of a leaf of the search tree. The same position is evaluated repeatedly:
+within a search when it is reached by different move orders (the players
+can swap the intermediate cells of their paths, e.g. 17 of the positions
+6 plies after (3, 3)/(2, 3) are reached twice), in the search of the next
+move (two plies closer to the root) and in the re-searches of
+`game_agent.PVSPlayer`. Wrapping a
+score function in an `EvaluationCache` returns the stored value for a
+position that was already evaluated:
+
+    player = AlphaBetaPlayer(score_fn=EvaluationCache(custom_score))
+
+Values are keyed by the Zobrist hash of the position (`isolation.Board.hash()`)
+and the side of the player whose point of view is evaluated, so the same
+cache is valid in every game and for both players.
+"""
+from collections import OrderedDict
+
+
+class EvaluationCache():
+    """A score function that caches the values of another score function
+    with least recently used (LRU) eviction.
+
+    Parameters
+    ----------
+    score_fn : callable
+        The score function whose values are cached. It must only depend on
+        the position and the side of the player, not on the player object.
+
+    size : int (optional)
+        The maximum number of cached values. When the cache is full, the
+        value that was used least recently is removed.
+    """
+    def __init__(self, score_fn, size=2**16):
+        self.score_fn = score_fn
+        self.size = size
+        self.__name__ = score_fn.__name__
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, game, player):
+        """Return the value of `score_fn(game, player)`, from the cache if
+        possible.
+        """
+        key = (game.hash(), player == game._player_1)
+        value = self.values.get(key)
+        if value is not None:
+            self.hits += 1
+            self.values.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = self.score_fn(game, player)
+        self.values[key] = value
+        if len(self.values) > self.size:
+            self.values.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Remove all cached values and reset the counters."""
+        self.values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.values)
@@ -0,0 +1,78 @@
+"""Unit tests for the evaluation cache."""
+
+import unittest
+import timeit
+
+import isolation
+import game_agent
+from evaluation_cache import EvaluationCache
+
+
+class EvaluationCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+        self.board = isolation.Board(self.player1, self.player2)
+        self.board.apply_move((4, 4))
+        self.board.apply_move((0, 2))
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def test_hits_and_misses(self):
+        cache = EvaluationCache(game_agent.custom_score)
+        self.assertEqual(14.5, cache(self.board, self.player1))
+        self.assertEqual(-14.5, cache(self.board, self.player2))
+        self.assertEqual(14.5, cache(self.board.copy(), self.player1))
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        self.assertEqual(2, len(cache))
+
+    def test_same_values_as_score_function(self):
+        cache = EvaluationCache(game_agent.custom_score)
+        for move in self.board.get_legal_moves():
+            position = self.board.forecast_move(move)
+            for player in [self.player1, self.player2]:
+                for _ in range(2):
+                    self.assertEqual(game_agent.custom_score(position, player), cache(position, player))
+
+    def test_lru_eviction(self):
+        cache = EvaluationCache(game_agent.custom_score, size=2)
+        positions = [self.board.forecast_move(move) for move in self.board.get_legal_moves()[:3]]
+        cache(positions[0], self.player1)
+        cache(positions[1], self.player1)
+        cache(positions[0], self.player1)
+        cache(positions[2], self.player1)
+        self.assertEqual(2, len(cache))
+        cache(positions[0], self.player1)
+        self.assertEqual(2, cache.hits)
+        cache(positions[1], self.player1)
+        self.assertEqual(4, cache.misses)
+
+    def test_alphabeta_with_cache(self):
+        cache = EvaluationCache(game_agent.custom_score)
+        player = game_agent.AlphaBetaPlayer(score_fn=cache)
+        uncached = game_agent.AlphaBetaPlayer()
+        for agent in [player, uncached]:
+            agent.time_left = self.create_clock(10000)
+            agent.clock.start(agent.time_left, agent.TIMER_THRESHOLD)
+        score, _ = uncached.max_value(self.board.copy(), 4, float("-inf"), float("inf"))
+        self.assertEqual(score, player.max_value(self.board.copy(), 4, float("-inf"), float("inf"))[0])
+        self.assertEqual(0, cache.hits)
+
+        # all replies to the best move were evaluated, so the search of the
+        # next move finds their values in the cache
+        score, move = player.max_value(self.board.copy(), 2, float("-inf"), float("inf"))
+        hits = cache.hits
+        after_move = self.board.forecast_move(move)
+        for reply in after_move.get_legal_moves():
+            leaf = after_move.forecast_move(reply)
+            cache(leaf, leaf.active_player)
+        self.assertEqual(hits + len(after_move.get_legal_moves()), cache.hits)
+        self.assertEqual('AlphaBetaPlayer|custom_score', str(player))
+
+
+if __name__ == '__main__':
+    unittest.main()
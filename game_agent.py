@@ -1,8 +1,393 @@
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    # only the heuristics based on `knight_degree_map` need NumPy
+    np = None
+
+try:
+    from isolation.bitboard import BoardGeometry, popcount
+except ImportError:
+    # game_agent.py is also submitted on its own, without the bitboard
+    # module; these copies provide the tables used by the score functions
+    def popcount(mask):
+        """Copied from isolation/bitboard.py."""
+        return bin(mask).count('1')
+
+    class BoardGeometry(object):
+        """Copied from isolation/bitboard.py, only the tables and methods
+        used here.
+        """
+        DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                      (1, -2), (1, 2), (2, -1), (2, 1)]
+
+        _instances = {}
+
+        @classmethod
+        def get(cls, width, height):
+            key = (width, height)
+            geometry = cls._instances.get(key)
+            if geometry is None:
+                geometry = cls(width, height)
+                cls._instances[key] = geometry
+            return geometry
+
+        def __init__(self, width, height):
+            self.width = width
+            self.height = height
+            self.size = width * height
+            self.squares = [(idx % height, idx // height) for idx in range(self.size)]
+            self.knight_targets = []
+            self.knight_masks = []
+            for r, c in self.squares:
+                targets = [(r + dr) + (c + dc) * height for dr, dc in self.DIRECTIONS
+                           if 0 <= r + dr < height and 0 <= c + dc < width]
+                mask = 0
+                for target in targets:
+                    mask |= 1 << target
+                self.knight_targets.append(targets)
+                self.knight_masks.append(mask)
+            self.two_move_masks = []
+            for idx in range(self.size):
+                mask = self.knight_masks[idx]
+                for target in self.knight_targets[idx]:
+                    mask |= self.knight_masks[target]
+                self.two_move_masks.append(mask & ~(1 << idx))
+
+        def flood_fill(self, start, blank):
+            region = 0
+            frontier = self.knight_masks[start] & blank
+            while frontier:
+                region |= frontier
+                reached = 0
+                while frontier:
+                    low_bit = frontier & -frontier
+                    reached |= self.knight_masks[low_bit.bit_length() - 1]
+                    frontier ^= low_bit
+                frontier = reached & blank & ~region
+            return region
+
+        def index(self, move):
+            return move[0] + move[1] * self.height
+
+        def squares_of(self, mask):
+            return [self.squares[idx] for idx in range(self.size) if mask >> idx & 1]
+
+try:
+    from transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND
+except ImportError:
+    # game_agent.py is also submitted on its own; the flags are only used
+    # with a table passed to the players, which then provides the module
+    EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+def blank_mask(game):
+    """Return the blank cells of `game` as an integer bitmask (bit
+    `row + column * height` is set when the cell is blank).
+
+    The boards of this repo build the mask themselves; the stock
+    `isolation.Board`, which this module is also run with when it is
+    submitted on its own, only lists its blank spaces.
+    """
+    board_mask = getattr(game, 'blank_mask', None)
+    if board_mask is not None:
+        return board_mask()
+    mask = 0
+    for row, column in game.get_blank_spaces():
+        mask |= 1 << (row + column * game.height)
+    return mask
+
+
+def count_blank_spaces(game):
+    """Return the number of blank cells of `game`, which the boards of this
+    repo count as they go and the stock `isolation.Board` has to list.
+    """
+    count = getattr(game, 'count_blank_spaces', None)
+    if count is not None:
+        return count()
+    return len(game.get_blank_spaces())
+
+
+def make_move(game, move):
+    """Apply `move` to `game` and return the resulting position. Boards with
+    `undo_move()` are changed in place and restored by `take_back()`; the
+    stock `isolation.Board` returns a forecast copy and `game` is unchanged.
+    """
+    if hasattr(game, 'undo_move'):
+        game.apply_move(move)
+        return game
+    return game.forecast_move(move)
+
+
+def take_back(game, child):
+    """Restore `game` after searching the position `child` returned by
+    `make_move(game, move)`.
+    """
+    if child is game:
+        game.undo_move()
+
+
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
     pass
 
 
+class SearchClock():
+    """Raises a `SearchTimeout` when the time for the current move is about to
+    expire, but only reads the clock every few nodes.
+
+    Reading the clock costs about as much as a cheap search node, so the
+    clock is polled every N nodes. N is calibrated from the time per node
+    measured so far: after each poll, N is chosen so that the next poll is
+    expected to happen after at most half of the time left before the
+    threshold. Close to the threshold, N shrinks to a single node, so the
+    search stops as early as with a check in every node.
+    """
+    MAX_INTERVAL = 128
+
+    def __init__(self):
+        self.time_left = None
+        self.threshold = 0.
+        self.nodes = 0
+        self.next_poll = 0
+        self.ms_per_node = None
+        self.last_poll = (0, 0.)
+
+    def start(self, time_left, threshold):
+        """Start checking the time with the given clock function, e.g. at the
+        root of each search. Raises `SearchTimeout` if the time has already
+        expired.
+
+        Parameters
+        ----------
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn.
+        threshold : float
+            Time remaining (in milliseconds) when search is aborted.
+        """
+        self.time_left = time_left
+        self.threshold = threshold
+        self.last_poll = (self.nodes, time_left())
+        self.schedule(self.last_poll[1])
+
+    def check(self):
+        """Count a search node and raise `SearchTimeout` if the time is
+        about to expire.
+        """
+        self.nodes += 1
+        if self.nodes >= self.next_poll:
+            self.poll()
+
+    def poll(self):
+        """Read the clock, update the time per node and schedule the next
+        poll.
+        """
+        left = self.time_left()
+        last_nodes, last_left = self.last_poll
+        nodes = self.nodes - last_nodes
+        elapsed = last_left - left
+        if nodes > 0 and 0. <= elapsed < float("inf"):
+            sample = elapsed / nodes
+            if self.ms_per_node is None:
+                self.ms_per_node = sample
+            else:
+                # adapt quickly to slower nodes and slowly to faster nodes
+                self.ms_per_node = max(sample, (self.ms_per_node + sample) / 2)
+        self.last_poll = (self.nodes, left)
+        self.schedule(left)
+
+    def schedule(self, left):
+        """Raise `SearchTimeout` if `left` is below the threshold, otherwise
+        set the node count of the next poll.
+        """
+        if left < self.threshold:
+            raise SearchTimeout()
+        if self.ms_per_node is None:
+            interval = 1
+        elif self.ms_per_node <= 0.:
+            interval = self.MAX_INTERVAL
+        else:
+            interval = (left - self.threshold) / (2 * self.ms_per_node)
+            interval = max(1, min(self.MAX_INTERVAL, int(interval)))
+        self.next_poll = self.nodes + interval
+
+
+def predict_iteration_time(iteration_times):
+    """Predict how long the next iteration of iterative deepening will take.
+
+    The prediction multiplies the time of the last iteration with the
+    effective branching factor, i.e. the factor by which the time grew per
+    iteration. The factor is measured over the last two iterations because
+    the trees of odd and even depths grow differently.
+
+    Parameters
+    ----------
+    iteration_times : list<float>
+        The times (in milliseconds) of the completed iterations, starting
+        with depth 1.
+
+    Returns
+    -------
+    float
+        The predicted time in milliseconds, or 0 if there are not enough
+        iterations to predict the time
+    """
+    if len(iteration_times) < 2 or iteration_times[-2] <= 0:
+        return 0.
+    if len(iteration_times) >= 3 and iteration_times[-3] > 0:
+        branching_factor = (iteration_times[-1] / iteration_times[-3]) ** 0.5
+    else:
+        branching_factor = iteration_times[-1] / iteration_times[-2]
+    return iteration_times[-1] * max(1., branching_factor)
+
+
+Features = namedtuple('Features', [
+    'won', 'lost', 'own_moves', 'opp_moves', 'common_moves',
+    'own_reach', 'opp_reach', 'common_reach', 'attacker', 'centre_distance'])
+Features.__doc__ = """The features of a game position from the point of view of one player,
+as computed by `extract_features`.
+
+won, lost : bool
+    whether the player has won or lost the game
+own_moves, opp_moves : int
+    the number of legal moves of the player and of the opponent
+common_moves : int
+    the number of squares that both players can move to
+own_reach, opp_reach : int
+    the number of squares that the player and the opponent can reach in one
+    or two moves (see `reach_2_moves`)
+common_reach : int
+    the number of squares that both players can reach in one or two moves
+attacker : bool
+    whether the player is the attacker (see `is_attacker`)
+centre_distance : float
+    the squared distance of the player from the centre of the board
+"""
+
+
+def extract_features(game, player):
+    """Compute all features that the heuristics of this module use in one
+    pass over the position.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        a game position
+    player : object
+        one of the player objects of this board
+
+    Returns
+    -------
+    `Features`
+        the features of the position from the point of view of `player`
+    """
+    geometry = BoardGeometry.get(game.width, game.height)
+    blank = blank_mask(game)
+    opponent = game.get_opponent(player)
+    own_square = game.get_player_location(player)
+    opp_square = game.get_player_location(opponent)
+
+    # like get_legal_moves, a player who has not moved yet can move to every
+    # blank square
+    if own_square is None:
+        own_moves = own_reach = blank
+    else:
+        own_moves = geometry.knight_masks[geometry.index(own_square)] & blank
+        own_reach = reach_2_moves(game, own_square, blank)
+    if opp_square is None:
+        opp_moves = opp_reach = blank
+    else:
+        opp_moves = geometry.knight_masks[geometry.index(opp_square)] & blank
+        opp_reach = reach_2_moves(game, opp_square, blank)
+
+    active = player == game.active_player
+    stuck = not (own_moves if active else opp_moves)
+
+    if own_square is None or opp_square is None:
+        attacker = False
+        centre_distance = 0.
+    else:
+        attacker = is_attacker(game, player)
+        row, column = own_square
+        centre_distance = float((game.height / 2. - row)**2 + (game.width / 2. - column)**2)
+
+    return Features(won=stuck and not active, lost=stuck and active,
+                    own_moves=popcount(own_moves), opp_moves=popcount(opp_moves),
+                    common_moves=popcount(own_moves & opp_moves),
+                    own_reach=popcount(own_reach), opp_reach=popcount(opp_reach),
+                    common_reach=popcount(own_reach & opp_reach),
+                    attacker=attacker, centre_distance=centre_distance)
+
+
+def evaluate_features(features, heuristic):
+    """Return the value of `heuristic` for the features of a position, or
+    +/-infinity if the game is over.
+    """
+    if features.won:
+        return float('inf')
+    if features.lost:
+        return float('-inf')
+    return heuristic(features)
+
+
+def feature_score(heuristic, extract=extract_features):
+    """Create a score function from a heuristic over `Features`.
+
+    Parameters
+    ----------
+    heuristic : callable
+        A function that returns the heuristic value of the `Features` of a
+        position that is not the end of the game.
+    extract : callable (optional)
+        The function that computes the features of a position. Score functions
+        that share e.g. an `evaluation_cache.EvaluationCache(extract_features)`
+        compute the features of a position only once.
+
+    Returns
+    -------
+    callable
+        A score function with the usual arguments `(game, player)`
+    """
+    def score(game, player):
+        return evaluate_features(extract(game, player), heuristic)
+    score.__name__ = heuristic.__name__
+    return score
+
+
+def custom_heuristic(features):
+    """The heuristic of `custom_score`."""
+    common_square_factor = 0.5 if features.attacker else -0.5
+    return (features.own_reach - features.opp_reach
+            + common_square_factor * features.common_reach)
+
+def custom_heuristic_2(features):
+    """The heuristic of `custom_score_2`."""
+    score = float(features.own_moves - features.opp_moves)
+    if features.common_moves:
+        if features.attacker:
+            return score + 3.
+        return score - 3.
+    return score
+
+def custom_heuristic_3(features):
+    """The heuristic of `custom_score_3`."""
+    return float(features.own_reach - features.opp_reach)
+
+def open_move_heuristic(features):
+    """The heuristic of `sample_players.open_move_score`."""
+    return float(features.own_moves)
+
+def improved_heuristic(features):
+    """The heuristic of `sample_players.improved_score`."""
+    return float(features.own_moves - features.opp_moves)
+
+def center_heuristic(features):
+    """The heuristic of `sample_players.center_score`."""
+    return features.centre_distance
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -28,58 +413,20 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    if game.is_winner(player):
-        return float('inf')
-    if game.is_loser(player):
-        return float('-inf')
-    
-    player_square = game.get_player_location(player)
-    player_squares = squares_2_moves(game, player_square)
-    
-    opp_square = game.get_player_location(game.get_opponent(player))
-    opp_squares = squares_2_moves(game, opp_square)
-    
-    common_square_factor = 0.5 if is_attacker(game, player) else -0.5
-    
-    return len(player_squares) - len(opp_squares) + common_square_factor * len(player_squares & opp_squares)
+    return evaluate_features(extract_features(game, player), custom_heuristic)
 
 def custom_score_2(game, player):
     """This score function is similar to improved_score. If the current player
     can make a move that will prevent his opponent from making the same move,
     a constant value of 3 is added to the score.
     """
-    if game.is_winner(player):
-        return float('inf')
-    if game.is_loser(player):
-        return float('-inf')
-
-    player_moves = game.get_legal_moves(player)
-    opponent_moves = game.get_legal_moves(game.get_opponent(player))
-    score = float(len(player_moves) - len(opponent_moves))
-    
-    if bool(set(player_moves) & set(opponent_moves)):
-        if is_attacker(game, player):
-            return score + 3.
-        return score - 3.
-    
-    return score
+    return evaluate_features(extract_features(game, player), custom_heuristic_2)
 
 def custom_score_3(game, player):
     """This score function compares the number of squares that can be reached
     by each player in the next two moves.
     """
-    if game.is_winner(player):
-        return float('inf')
-    if game.is_loser(player):
-        return float('-inf')
-    
-    player_square = game.get_player_location(player)
-    player_squares = squares_2_moves(game, player_square)
-    
-    opp_square = game.get_player_location(game.get_opponent(player))
-    opp_squares = squares_2_moves(game, opp_square)
-    
-    return float(len(player_squares) - len(opp_squares))
+    return evaluate_features(extract_features(game, player), custom_heuristic_3)
 
 def is_attacker(board, player):
     """Whether player is the player who has the better winning chances because
@@ -96,16 +443,58 @@ def is_attacker(board, player):
     bool
         True if `player` is the player who has the advantage, False otherwise
     """
-    player_1_location = board._board_state[-1]
-    player_2_location = board._board_state[-2]
-    initiative = board._board_state[-3]
+    r1, c1 = board.get_player_location(board._player_1)
+    r2, c2 = board.get_player_location(board._player_2)
+    player_1_location = r1 + c1 * board.height
+    player_2_location = r2 + c2 * board.height
+    initiative = int(board.active_player == board._player_2)
     
     return bool((player_1_location + player_2_location + initiative) % 2) == (player == board._player_2)
 
-MOVE_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+def reach_2_moves(board, square, blank=None):
+    """Returns the squares that can be reached from `square` in one or two
+    moves as a bitmask in the cell indexing of `isolation.BitBoard` (bit
+    `row + column * height`).
+
+    The neighbourhoods of every square are precomputed per board size by
+    `isolation.bitboard.BoardGeometry`. If all squares one move away are
+    blank, the result is the precomputed two-move neighbourhood masked with
+    the blank squares; otherwise the one-move neighbourhoods of the blank
+    squares one move away are combined.
+
+    Parameters
+    ----------
+    board: `isolation.Board`
+        a game position
+    square: (int, int)
+        a square
+    blank: int (optional)
+        the blank squares of `board` as returned by `blank_mask(board)`;
+        pass it to avoid computing it again for the other player
+    Returns
+    -------
+    int
+        the squares that can be reached from `square` in one or two moves
+    """
+    geometry = BoardGeometry.get(board.width, board.height)
+    if blank is None:
+        blank = blank_mask(board)
+    idx = geometry.index(square)
+    knight_masks = geometry.knight_masks
+    
+    moves1 = knight_masks[idx] & blank
+    if moves1 == knight_masks[idx]:
+        return geometry.two_move_masks[idx] & blank
+    
+    reach = moves1
+    while moves1:
+        low_bit = moves1 & -moves1
+        reach |= knight_masks[low_bit.bit_length() - 1]
+        moves1 ^= low_bit
+    return reach & blank
 
 def squares_2_moves(board, square):
-    """Returns the set of squares that can be reached from ˙square˙ṡquare˙ in
+    """Returns the set of squares that can be reached from `square` in
     one or two moves
     
     Parameters
@@ -119,14 +508,118 @@ def squares_2_moves(board, square):
     set
         the squares that can be reached from `square` in one or two moves
     """
-    r, c = square
-    
-    moves1 = set((r + dr, c + dc) for dr, dc in MOVE_DIRECTIONS if board.move_is_legal((r + dr, c + dc)))
-    
-    moves2 = set((r1 + dr, c1 + dc) for dr, dc in MOVE_DIRECTIONS for (r1, c1) in moves1
-                   if board.move_is_legal((r1 + dr, c1 + dc)))
+    geometry = BoardGeometry.get(board.width, board.height)
+    return set(geometry.squares_of(reach_2_moves(board, square)))
+
+
+def blank_grid(game):
+    """Returns the blank squares of a board as a boolean NumPy array of shape
+    (height, width), i.e. indexed by (row, column).
+    """
+    size = game.width * game.height
+    mask = blank_mask(game).to_bytes((size + 7) // 8, 'little')
+    bits = np.unpackbits(np.frombuffer(mask, dtype=np.uint8), bitorder='little')[:size]
+    # cell indices run down the columns
+    return bits.reshape(game.width, game.height).T.astype(bool)
+
+def knight_degree_map(blank):
+    """Returns the number of blank squares one knight move away from every
+    square, computed as the sum of the blank grid shifted in the eight move
+    directions.
+
+    Parameters
+    ----------
+    blank: numpy.ndarray
+        a boolean array of shape (..., height, width) marking the blank
+        squares of one board (e.g. from `blank_grid`) or of a batch of boards
+    Returns
+    -------
+    numpy.ndarray
+        an integer array of the same shape with the degree of every square;
+        the degree of a player's square is the number of legal moves of the
+        player
+    """
+    height, width = blank.shape[-2:]
+    padding = [(0, 0)] * (blank.ndim - 2) + [(2, 2), (2, 2)]
+    padded = np.pad(blank.astype(np.int8), padding)
+    degrees = np.zeros(blank.shape, dtype=np.int8)
+    for dr, dc in BoardGeometry.DIRECTIONS:
+        degrees += padded[..., 2 + dr:2 + dr + height, 2 + dc:2 + dc + width]
+    return degrees
+
+def weighted_mobility_score(game, player):
+    """This score function weights every legal move of a player with the
+    number of moves that are possible from the target square (its knight
+    degree), and compares the sums of both players. Moves into squares with
+    few exits count less than moves into open areas.
+    """
+    if game.is_winner(player):
+        return float('inf')
+    if game.is_loser(player):
+        return float('-inf')
     
-    return moves1 | moves2
+    degrees = knight_degree_map(blank_grid(game))
+    opponent = game.get_opponent(player)
+    player_sum = sum(int(degrees[move]) for move in game.get_legal_moves(player))
+    opp_sum = sum(int(degrees[move]) for move in game.get_legal_moves(opponent))
+    return float(player_sum - opp_sum)
+
+def region_sizes(game, player):
+    """Returns the number of blank squares that the player and its opponent
+    can reach by any sequence of moves, and the number of squares that both
+    can reach. An `isolation.RegionBoard` keeps the regions up to date as
+    moves are applied and taken back; on other boards they are flood filled.
+    """
+    # checked by attribute, as game_agent.py is also used without the
+    # isolation.regions module
+    if hasattr(game, 'reachable_masks'):
+        own_region, opp_region = game.reachable_masks()
+        if player != game._player_1:
+            own_region, opp_region = opp_region, own_region
+    else:
+        geometry = BoardGeometry.get(game.width, game.height)
+        blank = blank_mask(game)
+        regions = []
+        for p in (player, game.get_opponent(player)):
+            square = game.get_player_location(p)
+            regions.append(blank if square is None else
+                           geometry.flood_fill(geometry.index(square), blank))
+        own_region, opp_region = regions
+    return popcount(own_region), popcount(opp_region), popcount(own_region & opp_region)
+
+def region_score(game, player):
+    """This score function adds the difference of the region sizes (see
+    `region_sizes`) to the difference of the legal moves. While the players
+    share a region this is `improved_score`; once they are separated, the
+    player with the larger region is preferred.
+    """
+    if game.is_winner(player):
+        return float('inf')
+    if game.is_loser(player):
+        return float('-inf')
+
+    own_region, opp_region, _ = region_sizes(game, player)
+    own_moves = len(game.get_legal_moves(player))
+    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    return float(own_moves - opp_moves + own_region - opp_region)
+
+def contested_region_score(game, player):
+    """This score function counts the squares that only one player can reach
+    as that player's territory and the contested squares as half for the
+    player to move, who gets there first. It compares the territories and,
+    to break ties, the legal moves of both players.
+    """
+    if game.is_winner(player):
+        return float('inf')
+    if game.is_loser(player):
+        return float('-inf')
+
+    own_region, opp_region, contested = region_sizes(game, player)
+    own_moves = len(game.get_legal_moves(player))
+    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    share = 0.5 if player == game.active_player else -0.5
+    territory = (own_region - contested) - (opp_region - contested) + share * contested
+    return territory + 0.1 * (own_moves - opp_moves)
 
 
 class IsolationPlayer:
@@ -162,6 +655,10 @@ class MinimaxPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search.
     """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.):
+        super(MinimaxPlayer, self).__init__(search_depth, score_fn, timeout)
+        self.clock = SearchClock()
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -224,10 +721,11 @@ class MinimaxPlayer(IsolationPlayer):
             The board coordinates of the best move found in the current search;
             (-1, -1) if there are no legal moves
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.start(self.time_left, self.TIMER_THRESHOLD)
 
-        score, move = self.max_value(game, depth)
+        # the search applies and takes back moves on a single copy of the
+        # board, so the position passed by the caller is never modified
+        score, move = self.max_value(game.copy(), depth)
         return move
 
     def max_value(self, game, depth):
@@ -236,7 +734,7 @@ class MinimaxPlayer(IsolationPlayer):
         Parameters
         ----------
         game : isolation.Board
-            a game position
+            a game position; moves are applied to it and taken back again
         depth : int
             Depth is an integer representing the maximum number of plies to
             search in the game tree before aborting
@@ -247,8 +745,7 @@ class MinimaxPlayer(IsolationPlayer):
             of the max player) found in the current search and this move, or
             (-1, -1) if there are no legal moves or the parameter `depth` is 0
         """        
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.check()
         
         player = game.active_player
         if depth == 0 or game.is_loser(player):
@@ -258,8 +755,9 @@ class MinimaxPlayer(IsolationPlayer):
         best_score = float("-inf")
         best_move = moves[0] if moves else None
         for move in moves:
-            after_move = game.forecast_move(move)
-            (score, min_move) = self.min_value(after_move, depth - 1)
+            child = make_move(game, move)
+            (score, min_move) = self.min_value(child, depth - 1)
+            take_back(game, child)
             if score > best_score:
                 best_score = score
                 best_move = move
@@ -272,7 +770,7 @@ class MinimaxPlayer(IsolationPlayer):
         Parameters
         ----------
         game : isolation.Board
-            a game position
+            a game position; moves are applied to it and taken back again
         depth : int
             Depth is an integer representing the maximum number of plies to
             search in the game tree before aborting
@@ -283,8 +781,7 @@ class MinimaxPlayer(IsolationPlayer):
             of the min player) found in the current search and this move, or
             (-1, -1) if there are no legal moves or the parameter `depth` is 0
         """           
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.check()
             
         player = game.inactive_player
         if depth == 0 or game.is_winner(player):
@@ -294,8 +791,9 @@ class MinimaxPlayer(IsolationPlayer):
         best_score = float("inf")
         best_move = (-1, -1)
         for move in moves:
-            after_move = game.forecast_move(move)
-            score, max_move = self.max_value(after_move, depth - 1)
+            child = make_move(game, move)
+            score, max_move = self.max_value(child, depth - 1)
+            take_back(game, child)
             if score < best_score:
                 best_score = score
                 best_move = move
@@ -308,7 +806,60 @@ class MinimaxPlayer(IsolationPlayer):
 class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning.
+
+    Parameters
+    ----------
+    search_depth, score_fn, timeout
+        See `IsolationPlayer`.
+
+    transposition_table : `transposition_table.TranspositionTable` (optional)
+        A table used to store the results of searched positions. Entries are
+        probed for cutoffs and to search the best move of an earlier search
+        first. The table is cleared whenever a new game starts, so a table
+        must not be shared between players.
+
+    move_ordering : `move_ordering.MoveOrdering` (optional)
+        A strategy used to order the moves of each node before they are
+        searched, e.g. killer moves or the history heuristic. Strategies keep
+        state, so an instance must not be shared between players.
+
+    endgame_solver : `partition.PartitionSolver` or `endgame.EndgameSolver` (optional)
+        A solver that returns the exact result of positions it can decide,
+        e.g. once the players are separated or few blank cells are left.
+        Such positions are scored without searching them, and the solver
+        chooses the move at the root if it decides the position within
+        `ENDGAME_TIME_SHARE` of the time for the move.
+
+    opening_book : `opening_book.OpeningBook` (optional)
+        A book of deeply searched early positions. The book move is played
+        without a search whenever the position is in the book.
+
+    Attributes
+    ----------
+    depth_reached : int or float
+        The depth of the deepest iteration completed by the last call of
+        `get_move`; float("inf") if the move was taken from the opening book
+        or the endgame solver
     """
+    # The largest fraction of the time for a move that the endgame solver may
+    # use at the root before the move is searched heuristically.
+    ENDGAME_TIME_SHARE = 0.5
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 transposition_table=None, move_ordering=None, endgame_solver=None,
+                 opening_book=None):
+        super(AlphaBetaPlayer, self).__init__(search_depth, score_fn, timeout)
+        self.transposition_table = transposition_table
+        self.move_ordering = move_ordering
+        self.endgame_solver = endgame_solver
+        self.opening_book = opening_book
+        self.root_score = None
+        self.root_move_count = -1
+        self.last_move_count = -1
+        self.clock = SearchClock()
+        self.iteration_times = []
+        self.depth_reached = 0
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -331,23 +882,63 @@ class AlphaBetaPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """        
         self.time_left = time_left
+        self.start_search(game)
+        self.iteration_times = []
+        # moves of the opening book and the endgame solver count as deeper
+        # than any search, so that no search result replaces them
+        self.depth_reached = float("inf")
+
+        book_move = self.book_move(game)
+        if book_move is not None:
+            return book_move
+
+        solved_move = self.endgame_move(game)
+        if solved_move is not None:
+            return solved_move
+        self.depth_reached = 0
         
         best_move = (-1, -1)
-        max_depth = len(game.get_blank_spaces())
+        max_depth = count_blank_spaces(game)
 
+        # skip iterations that are predicted to time out, the remaining time
+        # is returned to the caller
         try:
             for depth in range(1, max_depth):
+                start = time_left()
+                if predict_iteration_time(self.iteration_times) > start - self.TIMER_THRESHOLD:
+                    break
                 better_move = self.alphabeta(game, depth)
+                self.iteration_times.append(start - time_left())
+                self.depth_reached = depth
                 if better_move != (-1, -1):
                     best_move = better_move
                 else:
                     break
+                if abs(self.root_score) == float("inf"):
+                    # a forced result is proven, deeper searches cannot change it
+                    break
 
         except SearchTimeout:
             pass
 
         return best_move
 
+    def start_search(self, game):
+        """Prepare the transposition table and the move ordering strategy for
+        searching a move in the position `game`.
+        """
+        table = self.transposition_table
+        if table is not None:
+            # scores are stored from the point of view of this player, which
+            # may play the other side in a new game
+            if game.move_count <= self.last_move_count:
+                table.clear()
+            self.last_move_count = game.move_count
+            table.new_search()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        self.root_move_count = game.move_count
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implements depth-limited minimax search algorithm with alpha-beta
         pruning as described in the lectures.
@@ -366,10 +957,12 @@ class AlphaBetaPlayer(IsolationPlayer):
             The board coordinates of the best move found in the current search;
             (-1, -1) if there are no legal moves
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.start(self.time_left, self.TIMER_THRESHOLD)
+        self.root_move_count = game.move_count
 
-        _, move = self.max_value(game, depth, alpha, beta)
+        # the search applies and takes back moves on a single copy of the
+        # board, so the position passed by the caller is never modified
+        self.root_score, move = self.max_value(game.copy(), depth, alpha, beta)
         return move
         
     def max_value(self, game, depth, alpha, beta):
@@ -378,7 +971,7 @@ class AlphaBetaPlayer(IsolationPlayer):
         Parameters
         ----------
         game : isolation.Board
-            a game position
+            a game position; moves are applied to it and taken back again
         depth : int
             Depth is an integer representing the maximum number of plies to
             search in the game tree before aborting
@@ -389,27 +982,38 @@ class AlphaBetaPlayer(IsolationPlayer):
             of the max player) found in the current search and this move, or
             (-1, -1) if there are no legal moves or the parameter `depth` is 0
         """         
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.check()
         
         player = game.active_player
         if depth == 0 or game.is_loser(player):
             return self.score(game, player), (-1, -1)
+
+        solved = self.solve_endgame(game, player)
+        if solved is not None:
+            return solved, (-1, -1)
         
-        moves = game.get_legal_moves()
+        cached, tt_move = self.probe_table(game, depth, alpha, beta)
+        if cached is not None:
+            return cached
+        
+        alpha_orig = alpha
         best_score = float("-inf")
         best_move = (-1, -1)
-        for move in moves:
-            after_move = game.forecast_move(move)
-            score, _ = self.min_value(after_move, depth - 1, alpha, beta)
+        for move in self.ordered_moves(game, tt_move):
+            child = make_move(game, move)
+            score, _ = self.min_value(child, depth - 1, alpha, beta)
+            take_back(game, child)
             if score > best_score:
                 best_score = score
                 best_move = move
                 if best_score >= beta:
-                    return best_score, best_move
+                    if self.move_ordering is not None:
+                        self.move_ordering.cutoff(game, move, depth)
+                    break
                 
                 alpha = max(alpha, best_score)
         
+        self.store_table(game, depth, best_score, best_move, alpha_orig, beta)
         return best_score, best_move
 
     def min_value(self, game, depth, alpha, beta):
@@ -418,7 +1022,7 @@ class AlphaBetaPlayer(IsolationPlayer):
         Parameters
         ----------
         game : isolation.Board
-            a game position
+            a game position; moves are applied to it and taken back again
         depth : int
             Depth is an integer representing the maximum number of plies to
             search in the game tree before aborting
@@ -429,29 +1033,372 @@ class AlphaBetaPlayer(IsolationPlayer):
             of the min player) found in the current search and this move, or
             (-1, -1) if there are no legal moves or the parameter `depth` is 0
         """         
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self.clock.check()
         
         player = game.inactive_player
         if depth == 0 or game.is_winner(player):
             return self.score(game, player), (-1, -1)
+
+        solved = self.solve_endgame(game, player)
+        if solved is not None:
+            return solved, (-1, -1)
         
-        moves = game.get_legal_moves()
+        cached, tt_move = self.probe_table(game, depth, alpha, beta)
+        if cached is not None:
+            return cached
+        
+        beta_orig = beta
         best_score = float("inf")
         best_move = (-1, -1)
-        for move in moves:
-            after_move = game.forecast_move(move)
-            score, _ = self.max_value(after_move, depth - 1, alpha, beta)
+        for move in self.ordered_moves(game, tt_move):
+            child = make_move(game, move)
+            score, _ = self.max_value(child, depth - 1, alpha, beta)
+            take_back(game, child)
             if score < best_score:
                 best_score = score
                 best_move = move
                 if best_score <= alpha:
-                    return best_score, best_move
+                    if self.move_ordering is not None:
+                        self.move_ordering.cutoff(game, move, depth)
+                    break
                 
                 beta = min(beta, best_score)
         
+        self.store_table(game, depth, best_score, best_move, alpha, beta_orig)
         return best_score, best_move   
+
+    def book_move(self, game):
+        """Return the move of the opening book, or None if there is no book
+        or the position is not in it.
+        """
+        if self.opening_book is None:
+            return None
+        return self.opening_book.get_move(game)
+
+    def endgame_move(self, game):
+        """Return the move chosen by the endgame solver, or None if there is
+        no solver, it cannot decide the position or it runs out of its share
+        of the time (see `ENDGAME_TIME_SHARE`), so that the heuristic search
+        chooses the move instead.
+        """
+        if self.endgame_solver is None:
+            return None
+        # abort the solver once its share of the time before the threshold
+        # is used up
+        search_time = self.time_left() - self.TIMER_THRESHOLD
+        threshold = self.TIMER_THRESHOLD + (1. - self.ENDGAME_TIME_SHARE) * max(search_time, 0.)
+        try:
+            self.clock.start(self.time_left, threshold)
+            return self.endgame_solver.best_move(game, self.clock)
+        except SearchTimeout:
+            return None
+
+    def solve_endgame(self, game, player):
+        """Return the exact score of the position from the point of view of
+        `player`, or None if there is no endgame solver, it cannot decide the
+        position or the position is the root of the search. The root is
+        always searched, so that the search returns a move; the solver has
+        already had its chance to choose it in `endgame_move`.
+        """
+        if self.endgame_solver is None or game.move_count == self.root_move_count:
+            return None
+        return self.endgame_solver.solve(game, player, self.clock)
+
+    def probe_table(self, game, depth, alpha, beta):
+        """Look up the position in the transposition table.
+
+        Returns
+        -------
+        ((float, (int, int)) or None, (int, int) or None)
+            The stored score and move if the stored result is deep enough and
+            its bound decides the current window (None otherwise), and the
+            stored best move to search first (None if the position was not
+            found)
+        """
+        if self.transposition_table is None:
+            return None, None
+        entry = self.transposition_table.probe(game.hash())
+        if entry is None:
+            return None, None
+        if entry.depth >= depth and (entry.flag == EXACT or
+                (entry.flag == LOWER_BOUND and entry.score >= beta) or
+                (entry.flag == UPPER_BOUND and entry.score <= alpha)):
+            return (entry.score, entry.move), entry.move
+        return None, entry.move
+
+    def store_table(self, game, depth, score, move, alpha, beta):
+        """Store the result of searching the position with the window
+        (alpha, beta) in the transposition table.
+        """
+        if self.transposition_table is None:
+            return
+        if score >= beta:
+            flag = LOWER_BOUND
+        elif score <= alpha:
+            flag = UPPER_BOUND
+        else:
+            flag = EXACT
+        self.transposition_table.store(game.hash(), depth, score, flag, move)
+
+    def ordered_moves(self, game, tt_move=None):
+        """Return the legal moves of the active player in the order in which
+        they should be searched: the move from the transposition table first,
+        the others as arranged by the move ordering strategy.
+        """
+        moves = game.get_legal_moves()
+        if self.move_ordering is not None:
+            moves = self.move_ordering.order_moves(game, moves)
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
     
     def __str__(self):
         return type(self).__name__ + '|' + str(self.score.__name__)
 
+
+
+class PVSPlayer(AlphaBetaPlayer):
+    """Game-playing agent that chooses a move using iterative deepening
+    principal variation search (PVS, also known as NegaScout).
+
+    The first move of each node is searched with the full (alpha, beta)
+    window. The other moves are only tested with a null window whether they
+    are better than the first one, and searched again with the full window if
+    they are. This pays off when the first move is usually the best one, so
+    it should be combined with a transposition table or a move ordering
+    strategy.
+
+    Each iteration of iterative deepening starts with an aspiration window
+    centered on the score of the previous iteration; if the score falls
+    outside this window, the iteration is searched again with the failing
+    side of the window opened.
+
+    Parameters
+    ----------
+    search_depth, score_fn, timeout, transposition_table, move_ordering, endgame_solver, opening_book
+        See `AlphaBetaPlayer`.
+
+    aspiration_window : float (optional)
+        Half the width of the aspiration window. Use float("inf") to search
+        every iteration with the full window.
+    """
+    # The width of the null window. Scores of different positions are
+    # assumed to differ by more than this value.
+    NULL_WINDOW = 1e-6
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 transposition_table=None, move_ordering=None, aspiration_window=2.,
+                 endgame_solver=None, opening_book=None):
+        super(PVSPlayer, self).__init__(search_depth, score_fn, timeout,
+                                        transposition_table, move_ordering, endgame_solver,
+                                        opening_book)
+        self.aspiration_window = aspiration_window
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        self.time_left = time_left
+        self.start_search(game)
+        self.iteration_times = []
+        # moves of the opening book and the endgame solver count as deeper
+        # than any search, so that no search result replaces them
+        self.depth_reached = float("inf")
+
+        book_move = self.book_move(game)
+        if book_move is not None:
+            return book_move
+
+        solved_move = self.endgame_move(game)
+        if solved_move is not None:
+            return solved_move
+        self.depth_reached = 0
+
+        best_move = (-1, -1)
+        score = None
+        max_depth = count_blank_spaces(game)
+
+        try:
+            for depth in range(1, max_depth):
+                start = time_left()
+                if predict_iteration_time(self.iteration_times) > start - self.TIMER_THRESHOLD:
+                    break
+                score, better_move = self.aspiration_search(game, depth, score)
+                self.iteration_times.append(start - time_left())
+                self.depth_reached = depth
+                if better_move != (-1, -1):
+                    best_move = better_move
+                else:
+                    break
+                if abs(score) == float("inf"):
+                    break
+
+        except SearchTimeout:
+            pass
+
+        return best_move
+
+    def aspiration_search(self, game, depth, guess=None):
+        """Search the position to the given depth with a window centered on
+        the expected score.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            the current game position
+        depth : int
+            the number of plies to search
+        guess : float (optional)
+            the expected score, usually the score of the previous iteration;
+            if None or infinite, the full window is used
+        Returns
+        -------
+        (float, (int, int))
+            The exact score of the position and the best move
+        """
+        self.clock.start(self.time_left, self.TIMER_THRESHOLD)
+        self.root_move_count = game.move_count
+
+        alpha, beta = float("-inf"), float("inf")
+        if guess is not None and abs(guess) != float("inf"):
+            alpha, beta = guess - self.aspiration_window, guess + self.aspiration_window
+
+        board = game.copy()
+        score, move = self.max_value(board, depth, alpha, beta)
+        if score <= alpha:
+            score, move = self.max_value(board, depth, float("-inf"), beta)
+        elif score >= beta:
+            score, move = self.max_value(board, depth, alpha, float("inf"))
+        return score, move
+
+    def max_value(self, game, depth, alpha, beta):
+        """The max function of principal variation search.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            a game position; moves are applied to it and taken back again
+        depth : int
+            Depth is an integer representing the maximum number of plies to
+            search in the game tree before aborting
+        Returns
+        -------
+        (float, (int, int))
+            A tuple containing the score of the best move (from the perspective
+            of the max player) found in the current search and this move, or
+            (-1, -1) if there are no legal moves or the parameter `depth` is 0
+        """
+        self.clock.check()
+
+        player = game.active_player
+        if depth == 0 or game.is_loser(player):
+            return self.score(game, player), (-1, -1)
+
+        solved = self.solve_endgame(game, player)
+        if solved is not None:
+            return solved, (-1, -1)
+
+        cached, tt_move = self.probe_table(game, depth, alpha, beta)
+        if cached is not None:
+            return cached
+
+        alpha_orig = alpha
+        best_score = float("-inf")
+        best_move = (-1, -1)
+        for move in self.ordered_moves(game, tt_move):
+            child = make_move(game, move)
+            if best_move == (-1, -1) or alpha == float("-inf"):
+                score, _ = self.min_value(child, depth - 1, alpha, beta)
+            else:
+                # test whether the move is better than alpha
+                score, _ = self.min_value(child, depth - 1, alpha, alpha + self.NULL_WINDOW)
+                if alpha < score < beta:
+                    score, _ = self.min_value(child, depth - 1, alpha, beta)
+            take_back(game, child)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if best_score >= beta:
+                    if self.move_ordering is not None:
+                        self.move_ordering.cutoff(game, move, depth)
+                    break
+
+                alpha = max(alpha, best_score)
+
+        self.store_table(game, depth, best_score, best_move, alpha_orig, beta)
+        return best_score, best_move
+
+    def min_value(self, game, depth, alpha, beta):
+        """The min function of principal variation search.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            a game position; moves are applied to it and taken back again
+        depth : int
+            Depth is an integer representing the maximum number of plies to
+            search in the game tree before aborting
+        Returns
+        -------
+        (float, (int, int))
+            A tuple containing the score of the best move (from the perspective
+            of the min player) found in the current search and this move, or
+            (-1, -1) if there are no legal moves or the parameter `depth` is 0
+        """
+        self.clock.check()
+
+        player = game.inactive_player
+        if depth == 0 or game.is_winner(player):
+            return self.score(game, player), (-1, -1)
+
+        solved = self.solve_endgame(game, player)
+        if solved is not None:
+            return solved, (-1, -1)
+
+        cached, tt_move = self.probe_table(game, depth, alpha, beta)
+        if cached is not None:
+            return cached
+
+        beta_orig = beta
+        best_score = float("inf")
+        best_move = (-1, -1)
+        for move in self.ordered_moves(game, tt_move):
+            child = make_move(game, move)
+            if best_move == (-1, -1) or beta == float("inf"):
+                score, _ = self.max_value(child, depth - 1, alpha, beta)
+            else:
+                # test whether the move is better than beta
+                score, _ = self.max_value(child, depth - 1, beta - self.NULL_WINDOW, beta)
+                if alpha < score < beta:
+                    score, _ = self.max_value(child, depth - 1, alpha, beta)
+            take_back(game, child)
+            if score < best_score:
+                best_score = score
+                best_move = move
+                if best_score <= alpha:
+                    if self.move_ordering is not None:
+                        self.move_ordering.cutoff(game, move, depth)
+                    break
+
+                beta = min(beta, best_score)
+
+        self.store_table(game, depth, best_score, best_move, alpha, beta_orig)
+        return best_score, best_move
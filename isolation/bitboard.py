@@ -0,0 +1,512 @@
+"""
+This file contains the `BitBoard` class, an alternative engine for the game
+Isolation that keeps the same public API as `isolation.Board`.
+
+Blocked cells are packed into the bits of a single integer (bit `idx` is set
+when the cell at index `idx = row + column * height` is blocked, using the same
+indexing as `Board._board_state`). The knight moves from every cell are
+precomputed once per board size, so legal move generation reduces to a few
+bit operations instead of eight `move_is_legal` calls.
+"""
+import random
+
+from .isolation import Board
+from .zobrist import ZobristKeys
+
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(mask):
+        """Return the number of set bits in the non-negative integer `mask`."""
+        return bin(mask).count('1')
+
+
+class BoardGeometry(object):
+    """Precomputed move tables for a board of the given size. Use `get()` to
+    obtain an instance; the tables are built once per board size and shared
+    by all boards of that size.
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+    """
+    DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                  (1, -2), (1, 2), (2, -1), (2, 1)]
+
+    _instances = {}
+
+    @classmethod
+    def get(cls, width, height):
+        """Return the shared geometry for a board of the given size."""
+        key = (width, height)
+        geometry = cls._instances.get(key)
+        if geometry is None:
+            geometry = cls(width, height)
+            cls._instances[key] = geometry
+        return geometry
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.full_mask = (1 << self.size) - 1
+
+        # squares[idx] is the (row, column) pair of the cell with index idx
+        self.squares = [(idx % height, idx // height) for idx in range(self.size)]
+
+        # knight_targets[idx] lists the indices reachable from idx by one
+        # knight move, knight_masks[idx] contains the same cells as bits
+        self.knight_targets = []
+        self.knight_masks = []
+        for r, c in self.squares:
+            targets = [(r + dr) + (c + dc) * height for dr, dc in self.DIRECTIONS
+                       if 0 <= r + dr < height and 0 <= c + dc < width]
+            mask = 0
+            for target in targets:
+                mask |= 1 << target
+            self.knight_targets.append(targets)
+            self.knight_masks.append(mask)
+
+        # two_move_masks[idx] contains the cells reachable from idx by one or
+        # two knight moves on an empty board
+        self.two_move_masks = []
+        for idx in range(self.size):
+            mask = self.knight_masks[idx]
+            for target in self.knight_targets[idx]:
+                mask |= self.knight_masks[target]
+            self.two_move_masks.append(mask & ~(1 << idx))
+
+        # knight_shifts lists for every direction the cells from which the
+        # move stays on the board and the index offset of the move, so that
+        # the targets of all cells of a mask are found with 8 shifts
+        self.knight_shifts = []
+        for dr, dc in self.DIRECTIONS:
+            sources = 0
+            for idx, (r, c) in enumerate(self.squares):
+                if 0 <= r + dr < height and 0 <= c + dc < width:
+                    sources |= 1 << idx
+            self.knight_shifts.append((sources, dr + dc * height))
+
+    def knight_step(self, mask):
+        """Return the cells reachable by one knight move from any cell of
+        `mask`.
+        """
+        targets = 0
+        for sources, shift in self.knight_shifts:
+            if shift > 0:
+                targets |= (mask & sources) << shift
+            else:
+                targets |= (mask & sources) >> -shift
+        return targets
+
+    def flood_fill(self, start, blank, stop=0):
+        """Return the cells of `blank` that can be reached from the cell with
+        index `start` by a sequence of knight moves through cells of `blank`.
+        The start cell is not included. If `stop` is given, the fill ends
+        early and returns None as soon as one of its cells is reached.
+        """
+        knight_masks = self.knight_masks
+        region = 0
+        frontier = knight_masks[start] & blank
+        while frontier:
+            if frontier & stop:
+                return None
+            region |= frontier
+            reached = 0
+            while frontier:
+                low_bit = frontier & -frontier
+                reached |= knight_masks[low_bit.bit_length() - 1]
+                frontier ^= low_bit
+            frontier = reached & blank & ~region
+        return region
+
+    def index(self, move):
+        """Return the cell index of a (row, column) pair."""
+        return move[0] + move[1] * self.height
+
+    def squares_of(self, mask):
+        """Return the list of (row, column) pairs of the cells set in `mask`."""
+        squares = self.squares
+        result = []
+        while mask:
+            low_bit = mask & -mask
+            result.append(squares[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return result
+
+
+class BitBoard(Board):
+    """Implement a model for the game Isolation assuming each player moves like
+    a knight in chess, storing the blocked cells in an integer bitmask.
+
+    This class can be used wherever an `isolation.Board` is expected; pass it
+    instead of `Board` to select this engine for a game.
+
+    Internally the players are referred to by their index: 0 for player 1 and
+    1 for player 2. The active player is the index stored as the initiative,
+    and the player locations are a list indexed by player. The player objects
+    are only compared at the boundary of the public methods that take a
+    player argument.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+
+    shuffle_moves : bool (optional)
+        Whether `get_legal_moves()` returns the moves in random order. Pass
+        False to always get the moves in the same order, so that searches
+        and benchmarks can be reproduced exactly.
+    """
+
+    __slots__ = ('_geometry', '_blocked', '_initiative', '_locations')
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle_moves=True):
+        self.width = width
+        self.height = height
+        self.shuffle_moves = shuffle_moves
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+
+        self._geometry = BoardGeometry.get(width, height)
+        self._zobrist = ZobristKeys.get(width, height)
+        self._hash = 0
+        self._blocked = 0
+        self._blank_count = self._geometry.size
+        # the index of the active player
+        self._initiative = 0
+        # the cell indices of player 1 and player 2
+        self._locations = [Board.NOT_MOVED, Board.NOT_MOVED]
+        self._undo_stack = []
+
+    def _player_index(self, player):
+        """Return 0 for player 1, 1 for player 2 and None for an object that
+        is not a player of this game.
+        """
+        if player is self._player_1:
+            return 0
+        if player is self._player_2:
+            return 1
+        if player == self._player_1:
+            return 0
+        if player == self._player_2:
+            return 1
+        return None
+
+    @property
+    def _active_player(self):
+        return self._player_2 if self._initiative else self._player_1
+
+    @_active_player.setter
+    def _active_player(self, player):
+        self._set_initiative(self._player_index(player))
+
+    @property
+    def _inactive_player(self):
+        return self._player_1 if self._initiative else self._player_2
+
+    @_inactive_player.setter
+    def _inactive_player(self, player):
+        self._set_initiative(1 - self._player_index(player))
+
+    def _set_initiative(self, initiative):
+        """Give the initiative to the player with the given index, keeping the
+        hash up to date.
+        """
+        if initiative != self._initiative:
+            self._hash ^= self._zobrist.initiative
+            self._initiative = initiative
+
+    @property
+    def _board_state(self):
+        """The game state in the list format used by `isolation.Board`. This
+        is built on request and only provided for compatibility.
+        """
+        state = [(self._blocked >> idx) & 1 for idx in range(self._geometry.size)]
+        state.extend([self._initiative, self._locations[1], self._locations[0]])
+        return state
+
+    @_board_state.setter
+    def _board_state(self, state):
+        blocked = 0
+        for idx in range(self._geometry.size):
+            if state[idx] != Board.BLANK:
+                blocked |= 1 << idx
+        self._blocked = blocked
+        self._blank_count = self._geometry.size - popcount(blocked)
+        self._initiative = state[-3]
+        self._locations = [state[-1], state[-2]]
+        self._hash = self._zobrist.hash_state(state)
+
+    def get_opponent(self, player):
+        """Return the opponent of the supplied player.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game. Raises an
+            error if the supplied object is not registered as a player in
+            this game.
+
+        Returns
+        -------
+        object
+            The opponent of the input player object.
+        """
+        index = self._player_index(player)
+        if index is None:
+            raise RuntimeError("`player` must be an object registered as a player in the current game.")
+        return self._player_1 if index else self._player_2
+
+    def hash(self):
+        """Return the 64-bit Zobrist hash of the current state. The hash is
+        equal to the hash of the same position on an `isolation.Board`.
+        """
+        return self._hash
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        new_board = type(self)(self._player_1, self._player_2, width=self.width,
+                               height=self.height, shuffle_moves=self.shuffle_moves)
+        new_board.move_count = self.move_count
+        new_board._hash = self._hash
+        new_board._blocked = self._blocked
+        new_board._blank_count = self._blank_count
+        new_board._initiative = self._initiative
+        new_board._locations = list(self._locations)
+        new_board._undo_stack = list(self._undo_stack)
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                not (self._blocked >> (move[0] + move[1] * self.height)) & 1)
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        return self._geometry.squares_of(self._geometry.full_mask & ~self._blocked)
+
+    def blank_mask(self):
+        """Return the blank cells as an integer bitmask (bit `idx` is set when
+        the cell at index `idx = row + column * height` is blank).
+        """
+        return self._geometry.full_mask & ~self._blocked
+
+    def _location_index(self, player):
+        """Return the cell index of the player, or None if it has not moved."""
+        index = self._player_index(player)
+        if index is None:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        return self._locations[index]
+
+    def get_player_location(self, player):
+        """Find the current location of the specified player on the board.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (int, int) or None
+            The coordinate pair (row, column) of the input player, or None
+            if the player has not moved.
+        """
+        idx = self._location_index(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._geometry.squares[idx]
+
+    def get_legal_moves(self, player=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            idx = self._locations[self._initiative]
+        else:
+            idx = self._location_index(player)
+        if idx == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        blocked = self._blocked
+        squares = self._geometry.squares
+        moves = [squares[target] for target in self._geometry.knight_targets[idx]
+                 if not (blocked >> target) & 1]
+        if self.shuffle_moves:
+            random.shuffle(moves)
+        return moves
+
+    def count_legal_moves(self, player=None):
+        """Return the number of legal moves for the specified player without
+        building the list of moves.
+        """
+        if player is None:
+            idx = self._locations[self._initiative]
+        else:
+            idx = self._location_index(player)
+        if idx == Board.NOT_MOVED:
+            return popcount(self._geometry.full_mask & ~self._blocked)
+        return popcount(self._geometry.knight_masks[idx] & ~self._blocked)
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        keys = self._zobrist
+        active = self._initiative
+        previous_idx = self._locations[active]
+        self._locations[active] = idx
+        player_keys = keys.player_2 if active else keys.player_1
+        self._undo_stack.append(previous_idx)
+        self._hash ^= keys.blocked[idx] ^ player_keys[idx] ^ keys.initiative
+        if previous_idx is not Board.NOT_MOVED:
+            self._hash ^= player_keys[previous_idx]
+        self._blocked |= 1 << idx
+        self._blank_count -= 1
+        self._initiative = active ^ 1
+        self.move_count += 1
+
+    def undo_move(self):
+        """Take back the last move applied with apply_move() and restore the
+        previous game state in-place.
+
+        Raises an IndexError if there is no move to take back.
+        """
+        previous_idx = self._undo_stack.pop()
+        keys = self._zobrist
+        active = self._initiative ^ 1
+        idx = self._locations[active]
+        self._locations[active] = previous_idx
+        player_keys = keys.player_2 if active else keys.player_1
+        self._hash ^= keys.blocked[idx] ^ player_keys[idx] ^ keys.initiative
+        if previous_idx is not Board.NOT_MOVED:
+            self._hash ^= player_keys[previous_idx]
+        self._blocked ^= 1 << idx
+        self._blank_count += 1
+        self._initiative = active
+        self.move_count -= 1
+
+    def _has_no_moves(self):
+        """Whether the active player has no legal moves left."""
+        idx = self._locations[self._initiative]
+        if idx == Board.NOT_MOVED:
+            return not self._geometry.full_mask & ~self._blocked
+        return not self._geometry.knight_masks[idx] & ~self._blocked
+
+    def is_winner(self, player):
+        """ Test whether the specified player has won the game. """
+        return self._player_index(player) == self._initiative ^ 1 and self._has_no_moves()
+
+    def is_loser(self, player):
+        """ Test whether the specified player has lost the game. """
+        return self._player_index(player) == self._initiative and self._has_no_moves()
+
+    def utility(self, player):
+        """Returns the utility of the current game state from the perspective
+        of the specified player.
+
+                    /  +infinity,   "player" wins
+        utility =  |   -infinity,   "player" loses
+                    \          0,    otherwise
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the utility for the active player on the board.
+
+        Returns
+        ----------
+        float
+            The utility value of the current game state for the specified
+            player. The game has a utility of +inf if the player has won,
+            a value of -inf if the player has lost, and a value of 0
+            otherwise.
+        """
+        if self._has_no_moves():
+            index = self._player_index(player)
+
+            if index == self._initiative ^ 1:
+                return float("inf")
+
+            if index == self._initiative:
+                return float("-inf")
+
+        return 0.
+
+    def to_string(self, symbols=['1', '2']):
+        """Generate a string representation of the current game state, marking
+        the location of each player and indicating which cells have been
+        blocked, and which remain open.
+        """
+        p1_loc, p2_loc = self._locations
+
+        col_margin = len(str(self.height - 1)) + 1
+        prefix = "{:<" + "{}".format(col_margin) + "}"
+        offset = " " * (col_margin + 3)
+        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        for i in range(self.height):
+            out += prefix.format(i) + ' | '
+            for j in range(self.width):
+                idx = i + j * self.height
+                if not (self._blocked >> idx) & 1:
+                    out += ' '
+                elif p1_loc == idx:
+                    out += symbols[0]
+                elif p2_loc == idx:
+                    out += symbols[1]
+                else:
+                    out += '-'
+                out += ' | '
+            out += '\n\r'
+
+        return out
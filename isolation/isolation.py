@@ -11,6 +11,8 @@ import random
 import timeit
 from copy import copy
 
+from .zobrist import ZobristKeys
+
 TIME_LIMIT_MILLIS = 150
 
 
@@ -33,13 +35,25 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle_moves : bool (optional)
+        Whether `get_legal_moves()` returns the moves in random order. Pass
+        False to always get the moves in the same order, so that searches
+        and benchmarks can be reproduced exactly.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    # boards are created for every node of a search and kept alive in the
+    # trees of Monte Carlo search, so they have no instance dictionary
+    __slots__ = ('width', 'height', 'shuffle_moves', 'move_count',
+                 '_player_1', '_player_2', '_active_player', '_inactive_player',
+                 '_state', '_blank_count', '_zobrist', '_hash', '_undo_stack', '_moves')
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle_moves=True):
         self.width = width
         self.height = height
+        self.shuffle_moves = shuffle_moves
         self.move_count = 0
         self._player_1 = player_1
         self._player_2 = player_2
@@ -48,12 +62,119 @@ class Board(object):
 
         # The last 3 entries of the board state includes initiative (0 for
         # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        self._state = [Board.BLANK] * (width * height + 3)
+        self._state[-1] = Board.NOT_MOVED
+        self._state[-2] = Board.NOT_MOVED
+        self._blank_count = width * height
+
+        # The Zobrist hash of the board state, updated by apply_move() and
+        # undo_move(); the hash of the empty board is 0
+        self._zobrist = ZobristKeys.get(width, height)
+        self._hash = 0
+
+        # The previous locations of the players that made the moves applied
+        # so far, most recent last; used by undo_move()
+        self._undo_stack = []
+
+        # The legal moves of player 1 and player 2 in the current state,
+        # generated on request and discarded whenever the state changes.
+        # The lists are never modified, so copies of the board share them.
+        self._moves = [None, None]
+
+    @property
+    def _board_state(self):
+        """The list of cells followed by initiative, player 2 last move and
+        player 1 last move. Assigning a new list recomputes the hash.
+        """
+        return self._state
+
+    @_board_state.setter
+    def _board_state(self, state):
+        self._state = state
+        self._blank_count = state[:self.width * self.height].count(Board.BLANK)
+        self._hash = self._zobrist.hash_state(state)
+        self._moves = [None, None]
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the 64-bit Zobrist hash of the current state. The hash covers
+        the blocked cells, the locations of both players and the initiative,
+        and is maintained incrementally, so this method takes constant time.
+        """
+        return self._hash
+
+    def _packed_layout(self):
+        """Return the number of cells and the number of bits of a location in
+        the packed form of the game state.
+        """
+        size = self.width * self.height
+        # locations are stored + 1, so that 0 means NOT_MOVED
+        return size, size.bit_length()
+
+    def to_packed(self):
+        """Return the game state packed into a non-negative integer.
+
+        From the least significant bit, the integer holds one bit per cell
+        (set if the cell is blocked, in the cell order of `_board_state`),
+        the initiative bit, the locations of player 1 and player 2 and the
+        move count. The players and the board size are not included; pass
+        them to `from_packed()`. The integer is a compact key for
+        dictionaries or databases of positions of the same board size.
+        """
+        size, bits = self._packed_layout()
+        blocked = ((1 << size) - 1) & ~self.blank_mask()
+        initiative = int(self.active_player == self._player_2)
+        value = self.move_count
+        for player in (self._player_2, self._player_1):
+            location = self.get_player_location(player)
+            index = 0 if location is None else 1 + location[0] + location[1] * self.height
+            value = (value << bits) | index
+        return (((value << 1) | initiative) << size) | blocked
+
+    @classmethod
+    def from_packed(cls, value, player_1, player_2, width=7, height=7):
+        """Create a board from a game state packed by `to_packed()`.
+
+        Parameters
+        ----------
+        value : int
+            The packed game state of a board with the given size
+        player_1, player_2 : object
+            The players of the new board
+        width, height : int (optional)
+            The size of the board that packed the game state
+        """
+        board = cls(player_1, player_2, width, height)
+        size, bits = board._packed_layout()
+        location_mask = (1 << bits) - 1
+        cells = format(value & ((1 << size) - 1), '0{}b'.format(size))
+        state = list(map(int, reversed(cells)))
+        value >>= size
+        initiative = value & 1
+        value >>= 1
+        player_1_index = value & location_mask
+        value >>= bits
+        player_2_index = value & location_mask
+        state.extend([initiative,
+                      player_2_index - 1 if player_2_index else Board.NOT_MOVED,
+                      player_1_index - 1 if player_1_index else Board.NOT_MOVED])
+        board._board_state = state
+        board.move_count = value >> bits
+        if initiative:
+            board._active_player, board._inactive_player = player_2, player_1
+        return board
+
+    def to_bytes(self):
+        """Return the packed game state (see `to_packed()`) as a little-endian
+        byte string, e.g. 9 bytes for a 7x7 board.
+        """
+        size, bits = self._packed_layout()
+        length = (size + 1 + 2 * bits + size.bit_length() + 7) // 8
+        return self.to_packed().to_bytes(length, 'little')
+
+    @classmethod
+    def from_bytes(cls, data, player_1, player_2, width=7, height=7):
+        """Create a board from a byte string returned by `to_bytes()`."""
+        return cls.from_packed(int.from_bytes(data, 'little'), player_1, player_2, width, height)
 
     @property
     def active_player(self):
@@ -92,11 +213,16 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height,
+                          shuffle_moves=self.shuffle_moves)
         new_board.move_count = self.move_count
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board._state = copy(self._state)
+        new_board._blank_count = self._blank_count
+        new_board._hash = self._hash
+        new_board._undo_stack = copy(self._undo_stack)
+        new_board._moves = copy(self._moves)
         return new_board
 
     def forecast_move(self, move):
@@ -134,13 +260,27 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                self._state[idx] == Board.BLANK)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
         return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+                if self._state[i + j * self.height] == Board.BLANK]
+
+    def count_blank_spaces(self):
+        """Return the number of blank squares. The count is maintained by
+        apply_move() and undo_move(), so this method takes constant time.
+        """
+        return self._blank_count
+
+    def blank_mask(self):
+        """Return the blank cells as an integer bitmask (bit `idx` is set when
+        the cell at index `idx = row + column * height` is blank).
+        """
+        size = self.width * self.height
+        blocked = int(''.join(['1' if cell else '0' for cell in self._state[size - 1::-1]]), 2)
+        return ((1 << size) - 1) & ~blocked
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -157,13 +297,13 @@ class Board(object):
             if the player has not moved.
         """
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
+            if self._state[-1] == Board.NOT_MOVED:
                 return Board.NOT_MOVED
-            idx = self._board_state[-1]
+            idx = self._state[-1]
         elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
+            if self._state[-2] == Board.NOT_MOVED:
                 return Board.NOT_MOVED
-            idx = self._board_state[-2]
+            idx = self._state[-2]
         else:
             raise RuntimeError(
                 "Invalid player in get_player_location: {}".format(player))
@@ -188,7 +328,24 @@ class Board(object):
         """
         if player is None:
             player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+        return list(self._cached_moves(player))
+
+    def _cached_moves(self, player):
+        """Return the legal moves of `player` in the current state, generating
+        them only on the first request. The returned list must not be modified.
+        """
+        if player == self._player_1:
+            slot = 0
+        elif player == self._player_2:
+            slot = 1
+        else:
+            raise RuntimeError(
+                "Invalid player in get_legal_moves: {}".format(player))
+        moves = self._moves[slot]
+        if moves is None:
+            moves = self.__get_moves(self.get_player_location(player))
+            self._moves[slot] = moves
+        return moves
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -201,19 +358,54 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        self._update_hash(idx, self._state[-last_move_idx], last_move_idx)
+        self._undo_stack.append(self._state[-last_move_idx])
+        self._state[-last_move_idx] = idx
+        self._state[idx] = 1
+        self._state[-3] ^= 1
+        self._blank_count -= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
+        self._moves = [None, None]
+
+    def undo_move(self):
+        """Take back the last move applied with apply_move() and restore the
+        previous game state in-place. Together with apply_move() this allows
+        searching the game tree with a single board instead of creating a copy
+        for each node with forecast_move().
+
+        Raises an IndexError if there is no move to take back.
+        """
+        previous_idx = self._undo_stack.pop()
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        last_move_idx = int(self._active_player == self._player_2) + 1
+        idx = self._state[-last_move_idx]
+        self._update_hash(idx, previous_idx, last_move_idx)
+        self._state[idx] = Board.BLANK
+        self._state[-last_move_idx] = previous_idx
+        self._state[-3] ^= 1
+        self._blank_count += 1
+        self.move_count -= 1
+        self._moves = [None, None]
+
+    def _update_hash(self, idx, previous_idx, last_move_idx):
+        """Toggle the hash terms of a player moving from `previous_idx` to
+        `idx` (or back), including the initiative.
+        """
+        keys = self._zobrist
+        player_keys = keys.player_2 if last_move_idx == 2 else keys.player_1
+        value = self._hash ^ keys.blocked[idx] ^ player_keys[idx] ^ keys.initiative
+        if previous_idx is not Board.NOT_MOVED:
+            value ^= player_keys[previous_idx]
+        self._hash = value
 
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self._cached_moves(self._active_player)
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self._cached_moves(self._active_player)
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +429,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self._cached_moves(self._active_player):
 
             if player == self._inactive_player:
                 return float("inf")
@@ -259,7 +451,8 @@ class Board(object):
                       (1, -2), (1, 2), (2, -1), (2, 1)]
         valid_moves = [(r + dr, c + dc) for dr, dc in directions
                        if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        if self.shuffle_moves:
+            random.shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -271,8 +464,8 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        p1_loc = self._state[-1]
+        p2_loc = self._state[-2]
 
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
@@ -282,7 +475,7 @@ class Board(object):
             out += prefix.format(i) + ' | '
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
+                if not self._state[idx]:
                     out += ' '
                 elif p1_loc == idx:
                     out += symbols[0]
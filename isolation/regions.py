@@ -0,0 +1,301 @@
+"""
+This file contains the `RegionBoard` class, a `BitBoard` that keeps track of
+the cells each player can still reach.
+
+The region of a player is the set of blank cells that the player can reach
+by a sequence of knight moves through blank cells. It is needed by
+heuristics that look beyond the next two moves, e.g. to compare the space
+left to each player once they are separated, and a flood fill at every leaf
+of a search is expensive.
+"""
+from .isolation import Board
+from .bitboard import BitBoard, BoardGeometry, popcount
+
+
+class RegionTables(object):
+    """The tables shared by the `RegionBoard` instances of one board size.
+
+    Deciding whether a move splits a component only looks at the cells
+    around the move, and a search meets the same neighbourhoods over and
+    over, so the groups found for a neighbourhood are kept in a dict keyed
+    by the move and the blank cells around it. A dict is cleared when it
+    holds `MEMO_SIZE` entries. Use `RegionTables.get()` to share the tables.
+
+    Attributes
+    ----------
+    key_shift : int
+        The shift of the cells in a memo key, above the index of the move
+    components : tuple of int
+        The connected components of the cells of the empty board
+    link_masks : list of int
+        link_masks[idx] contains the neighbours of the cell with index idx
+        and the cells next to two of them
+    near_groups : dict
+        The groups of the blank neighbours of a cell, keyed by the cell and
+        the blank cells of its link mask
+    splits : dict
+        The components that a component splits into, keyed by the blocked
+        cell and the other cells of the component
+    """
+    MEMO_SIZE = 2**16
+
+    _instances = {}
+
+    @classmethod
+    def get(cls, width, height):
+        """Return the shared tables for a board of the given size."""
+        key = (width, height)
+        tables = cls._instances.get(key)
+        if tables is None:
+            tables = cls(width, height)
+            cls._instances[key] = tables
+        return tables
+
+    def __init__(self, width, height):
+        geometry = BoardGeometry.get(width, height)
+        self.key_shift = geometry.size.bit_length()
+        self.components = find_components(geometry, geometry.full_mask)
+        self.link_masks = []
+        for idx, targets in enumerate(geometry.knight_targets):
+            links = 0
+            for position, target in enumerate(targets):
+                for other in targets[position + 1:]:
+                    links |= geometry.knight_masks[target] & geometry.knight_masks[other]
+            self.link_masks.append((links | geometry.knight_masks[idx]) & ~(1 << idx))
+        self.near_groups = {}
+        self.splits = {}
+
+    def remember(self, memo, key, groups):
+        """Store `groups` under `key` in one of the dicts and return them."""
+        if len(memo) >= self.MEMO_SIZE:
+            memo.clear()
+        memo[key] = groups
+        return groups
+
+
+def find_components(geometry, cells):
+    """Return the connected components of the cells as a tuple of bitmasks."""
+    components = []
+    while cells:
+        low_bit = cells & -cells
+        component = low_bit | geometry.flood_fill(low_bit.bit_length() - 1, cells)
+        components.append(component)
+        cells &= ~component
+    return tuple(components)
+
+
+class RegionBoard(BitBoard):
+    """A `BitBoard` that maintains the regions of both players across
+    `apply_move()` and `undo_move()`.
+
+    The board keeps the connected components of the blank cells that a
+    player can still reach; the region of a player is the union of the
+    components next to it. A move blocks one cell, which can only split the
+    component it belongs to. Most moves cannot split it, because the blank
+    neighbours of the cell are still connected through the cells around it;
+    this is looked up in the `RegionTables` of the board size, and only the
+    other moves flood fill the component. The components of earlier
+    positions are kept on a stack, so `undo_move()` restores them without
+    any search.
+
+    Use it like a `BitBoard`; the score functions of `game_agent` that need
+    the region sizes (e.g. `game_agent.region_score`) read them from the
+    board instead of flood filling every leaf.
+
+    Parameters
+    ----------
+    player_1, player_2, width, height, shuffle_moves
+        See `isolation.BitBoard`.
+    """
+
+    __slots__ = ('_tables', '_components', '_component_stack')
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle_moves=True):
+        super(RegionBoard, self).__init__(player_1, player_2, width, height, shuffle_moves)
+        self._tables = RegionTables.get(width, height)
+        self._components = self._tables.components
+        self._component_stack = []
+
+    @BitBoard._board_state.setter
+    def _board_state(self, state):
+        BitBoard._board_state.fset(self, state)
+        self._components = self._live_components(
+            find_components(self._geometry, self.blank_mask()))
+        self._component_stack = []
+
+    def _live_components(self, components):
+        """Return the components that a player can still reach. Before both
+        players have moved, every component is kept. Components that become
+        unreachable when a player moves away are harmless, they are only
+        dropped here when a component splits.
+        """
+        locations = self._locations
+        if Board.NOT_MOVED in locations:
+            return components
+        knight_masks = self._geometry.knight_masks
+        neighbours = knight_masks[locations[0]] | knight_masks[locations[1]]
+        return tuple(component for component in components if component & neighbours)
+
+    def _split(self, idx, cells):
+        """Return the components that the other cells `cells` of the
+        component of cell `idx` form once `idx` is blocked.
+
+        The component only splits if the blank neighbours of `idx` are no
+        longer connected. They are grouped by their common neighbours, which
+        is looked up in the tables first; usually a single group is left
+        and the component stays whole. Otherwise the split is looked up, or
+        the cells connected to the smallest group are flood filled until
+        they reach another group. With more groups, all of them are grown,
+        always the smallest one, until they meet or all but one have
+        stopped growing, so splitting off a small part costs only a few
+        steps.
+        """
+        geometry = self._geometry
+        tables = self._tables
+        near = cells & tables.link_masks[idx]
+        key = near << tables.key_shift | idx
+        parts = tables.near_groups.get(key)
+        if parts is None:
+            parts = tables.remember(tables.near_groups, key, self._near_groups(idx, near))
+        if len(parts) < 2:
+            return (cells,) if cells else ()
+
+        key = cells << tables.key_shift | idx
+        components = tables.splits.get(key)
+        if components is not None:
+            return components
+        if len(parts) == 2:
+            part, other = parts
+            if popcount(part) > popcount(other):
+                part, other = other, part
+            low_bit = part & -part
+            region = geometry.flood_fill(low_bit.bit_length() - 1, cells, other)
+            if region is None:
+                components = (cells,)
+            else:
+                region |= low_bit
+                components = (region, cells & ~region)
+            return tables.remember(tables.splits, key, components)
+
+        components = []
+        groups = [[part, part] for part in parts]
+        while len(groups) > 1:
+            group = min(groups, key=lambda group: popcount(group[0]))
+            frontier = geometry.knight_step(group[1]) & cells & ~group[0]
+            if not frontier:
+                groups.remove(group)
+                components.append(group[0])
+                cells &= ~group[0]
+                continue
+            group[0] |= frontier
+            group[1] = frontier
+            for other in groups:
+                if other is not group and other[0] & frontier:
+                    other[0] |= group[0]
+                    other[1] |= frontier
+                    groups.remove(group)
+                    break
+        if cells:
+            components.append(cells)
+        return tables.remember(tables.splits, key, tuple(components))
+
+    def _near_groups(self, idx, near):
+        """Return the blank neighbours of cell `idx` grouped by common blank
+        neighbours in `near`, as a tuple with a bitmask of the neighbours and
+        their blank neighbours for each group.
+        """
+        knight_masks = self._geometry.knight_masks
+        groups = []
+        for target in self._geometry.knight_targets[idx]:
+            if near >> target & 1:
+                group = 1 << target | knight_masks[target] & near
+                for other in groups[:]:
+                    if other & group:
+                        group |= other
+                        groups.remove(other)
+                groups.append(group)
+        return tuple(groups)
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        new_board = super(RegionBoard, self).copy()
+        new_board._components = self._components
+        new_board._component_stack = list(self._component_stack)
+        return new_board
+
+    def apply_move(self, move):
+        """Move the active player to a specified location and update the
+        components of the blank cells.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        BitBoard.apply_move(self, move)
+        components = self._components
+        self._component_stack.append(components)
+
+        idx = move[0] + move[1] * self.height
+        bit = 1 << idx
+        position = 0
+        for component in components:
+            if component & bit:
+                break
+            position += 1
+        else:
+            return
+        parts = self._split(idx, component ^ bit)
+        if len(components) > 1:
+            parts = components[:position] + parts + components[position + 1:]
+        if len(parts) > len(components):
+            parts = self._live_components(parts)
+        self._components = parts
+
+    def undo_move(self):
+        """Take back the last move applied with apply_move() and restore the
+        previous game state and components in-place.
+
+        Raises an IndexError if there is no move to take back.
+        """
+        BitBoard.undo_move(self)
+        self._components = self._component_stack.pop()
+
+    def reachable_masks(self):
+        """Return the bitmasks of the blank cells that player 1 and player 2
+        can reach.
+        """
+        return self._region(self._locations[0]), self._region(self._locations[1])
+
+    def _region(self, location):
+        """Return the union of the components next to a location."""
+        region = 0
+        if location == Board.NOT_MOVED:
+            for component in self._components:
+                region |= component
+            return region
+        neighbours = self._geometry.knight_masks[location]
+        for component in self._components:
+            if component & neighbours:
+                region |= component
+        return region
+
+    def reachable_mask(self, player):
+        """Return the bitmask of the blank cells the player can reach."""
+        index = self._player_index(player)
+        if index is None:
+            raise RuntimeError(
+                "Invalid player in reachable_mask: {}".format(player))
+        return self._region(self._locations[index])
+
+    def reachable_count(self, player):
+        """Return the number of blank cells the player can reach."""
+        return popcount(self.reachable_mask(player))
+
+    def contested_count(self):
+        """Return the number of blank cells that both players can reach; 0
+        once the players are separated.
+        """
+        region_1, region_2 = self.reachable_masks()
+        return popcount(region_1 & region_2)
@@ -0,0 +1,182 @@
+"""
+This file contains the symmetries of the Isolation board, used to map
+equivalent positions to one canonical key.
+
+Reflecting or rotating a position gives a position with the same game
+value, in which every move is reflected or rotated the same way. A square
+board has 8 such symmetries (the rotations and reflections of a square), a
+rectangular board 4 (identity, the two reflections and the rotation by 180
+degrees). Storing positions under their canonical key lets transposition
+tables, evaluation caches and opening books share one entry between all
+equivalent positions.
+"""
+
+
+class Symmetries(object):
+    """The symmetries of a board of the given size, with precomputed
+    permutation tables. Use `get()` to obtain an instance; the tables are
+    built once per board size and shared.
+
+    A symmetry is identified by its index in `permutations`; index 0 is the
+    identity. `permutations[t][idx]` is the cell that cell `idx` is mapped to
+    by symmetry `t`, using the cell indexing of `isolation.Board`
+    (`row + column * height`).
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+    """
+    _instances = {}
+
+    @classmethod
+    def get(cls, width, height):
+        """Return the shared symmetries of a board of the given size."""
+        key = (width, height)
+        symmetries = cls._instances.get(key)
+        if symmetries is None:
+            symmetries = cls(width, height)
+            cls._instances[key] = symmetries
+        return symmetries
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.location_bits = self.size.bit_length()
+
+        last_row, last_column = height - 1, width - 1
+        transforms = [
+            lambda r, c: (r, c),
+            lambda r, c: (last_row - r, c),
+            lambda r, c: (r, last_column - c),
+            lambda r, c: (last_row - r, last_column - c),
+        ]
+        if width == height:
+            transforms += [
+                lambda r, c: (c, r),
+                lambda r, c: (last_column - c, r),
+                lambda r, c: (c, last_row - r),
+                lambda r, c: (last_column - c, last_row - r),
+            ]
+
+        self.permutations = []
+        self.inverse_permutations = []
+        for transform in transforms:
+            permutation = [0] * self.size
+            for idx in range(self.size):
+                r, c = transform(idx % height, idx // height)
+                permutation[idx] = r + c * height
+            inverse = [0] * self.size
+            for idx, target in enumerate(permutation):
+                inverse[target] = idx
+            self.permutations.append(permutation)
+            self.inverse_permutations.append(inverse)
+
+        # byte_tables[t][k][b] is the image under symmetry t of the cells
+        # set in byte b at bit offset 8 * k of a cell bitmask
+        self.byte_tables = []
+        for permutation in self.permutations:
+            tables = []
+            for offset in range(0, self.size, 8):
+                table = [0] * 256
+                for bit in range(min(8, self.size - offset)):
+                    image = 1 << permutation[offset + bit]
+                    step = 1 << bit
+                    for value in range(step, 256, 2 * step):
+                        for b in range(value, value + step):
+                            table[b] |= image
+                tables.append(table)
+            self.byte_tables.append(tables)
+
+    def transform_mask(self, mask, transform):
+        """Return the image of a cell bitmask under the given symmetry."""
+        result = 0
+        for table in self.byte_tables[transform]:
+            result |= table[mask & 0xff]
+            mask >>= 8
+        return result
+
+    def transform_packed(self, value, transform):
+        """Return the image of a packed game state (see
+        `isolation.Board.to_packed()`) under the given symmetry.
+        """
+        if transform == 0:
+            return value
+        size, bits = self.size, self.location_bits
+        location_mask = (1 << bits) - 1
+        permutation = self.permutations[transform]
+        blocked = self.transform_mask(value & ((1 << size) - 1), transform)
+        value >>= size
+        initiative = value & 1
+        value >>= 1
+        player_1 = value & location_mask
+        value >>= bits
+        player_2 = value & location_mask
+        move_count = value >> bits
+        if player_1:
+            player_1 = permutation[player_1 - 1] + 1
+        if player_2:
+            player_2 = permutation[player_2 - 1] + 1
+        high = (((move_count << bits | player_2) << bits | player_1) << 1) | initiative
+        return (high << size) | blocked
+
+    def canonical(self, board):
+        """Return the canonical key of a position and the symmetry that maps
+        the position to the canonical position.
+
+        The key is the smallest packed game state of all symmetric images of
+        the position, so two positions have the same key if and only if one
+        is a reflection or rotation of the other.
+
+        Parameters
+        ----------
+        board : `isolation.Board`
+            a game position of the size of these symmetries
+
+        Returns
+        -------
+        (int, int)
+            The canonical key and the index of the symmetry; use
+            `transform_move()` to map a move of `board` into the canonical
+            position and `inverse_move()` to map a move of the canonical
+            position back to `board`
+        """
+        packed = board.to_packed()
+        best_key, best_transform = packed, 0
+        for transform in range(1, len(self.permutations)):
+            key = self.transform_packed(packed, transform)
+            if key < best_key:
+                best_key, best_transform = key, transform
+        return best_key, best_transform
+
+    def transform_move(self, move, transform):
+        """Return the image of a (row, column) move under the given symmetry."""
+        idx = self.permutations[transform][move[0] + move[1] * self.height]
+        return (idx % self.height, idx // self.height)
+
+    def inverse_move(self, move, transform):
+        """Return the move that the given symmetry maps to `move`, e.g. to
+        map a move found for the canonical position back to the original
+        position.
+        """
+        idx = self.inverse_permutations[transform][move[0] + move[1] * self.height]
+        return (idx % self.height, idx // self.height)
+
+    def transform_board(self, board, transform):
+        """Return a new board with the image of `board` under the given
+        symmetry, of the same class and with the same players.
+        """
+        value = self.transform_packed(board.to_packed(), transform)
+        return type(board).from_packed(value, board._player_1, board._player_2,
+                                       self.width, self.height)
+
+
+def canonical(board):
+    """Return the canonical key of a position and the symmetry that maps the
+    position to the canonical position; see `Symmetries.canonical()`.
+    """
+    return Symmetries.get(board.width, board.height).canonical(board)
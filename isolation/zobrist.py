@@ -0,0 +1,73 @@
+"""
+This file contains the random keys used for Zobrist hashing of Isolation
+positions (https://en.wikipedia.org/wiki/Zobrist_hashing).
+
+The hash of a position is the XOR of one key for every blocked cell, one key
+for the location of each player and one key if player 2 holds the initiative.
+Applying or taking back a move changes only a few of these terms, so the
+boards update their hash incrementally in O(1).
+"""
+import random
+
+
+class ZobristKeys(object):
+    """The 64-bit Zobrist keys for a board of the given size. Use `get()` to
+    obtain an instance; the keys are generated once per board size and shared
+    by all boards of that size.
+
+    The keys are drawn from a random generator seeded with the board size, so
+    the hash of a position is the same in every process (e.g., for parallel
+    search workers or position files written by another process).
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+    """
+    _instances = {}
+
+    @classmethod
+    def get(cls, width, height):
+        """Return the shared keys for a board of the given size."""
+        key = (width, height)
+        keys = cls._instances.get(key)
+        if keys is None:
+            keys = cls(width, height)
+            cls._instances[key] = keys
+        return keys
+
+    def __init__(self, width, height):
+        size = width * height
+        rng = random.Random('zobrist-{}x{}'.format(width, height))
+        self.blocked = [rng.getrandbits(64) for _ in range(size)]
+        self.player_1 = [rng.getrandbits(64) for _ in range(size)]
+        self.player_2 = [rng.getrandbits(64) for _ in range(size)]
+        self.initiative = rng.getrandbits(64)
+
+    def hash_state(self, board_state):
+        """Compute the hash of a game state from scratch.
+
+        Parameters
+        ----------
+        board_state : list
+            A game state in the list format of `isolation.Board._board_state`
+
+        Returns
+        -------
+        int
+            The 64-bit Zobrist hash of the game state
+        """
+        value = 0
+        for idx, key in enumerate(self.blocked):
+            if board_state[idx]:
+                value ^= key
+        if board_state[-3]:
+            value ^= self.initiative
+        if board_state[-2] is not None:
+            value ^= self.player_2[board_state[-2]]
+        if board_state[-1] is not None:
+            value ^= self.player_1[board_state[-1]]
+        return value
@@ -0,0 +1,66 @@
+"""Measure how the cost of a search node grows with the size of the board.
+
+For every board size, the benchmark builds the shared move tables, plays a
+few random moves and runs a fixed-depth alpha-beta search with `Board` and
+with `BitBoard`. It reports the time needed to build the tables of the
+board size and the average time per search node.
+
+Usage:
+
+    python large_board_benchmark.py
+"""
+import random
+import timeit
+
+from isolation import Board, BitBoard
+from isolation.bitboard import BoardGeometry
+from game_agent import AlphaBetaPlayer, custom_score
+
+BOARD_SIZES = [7, 15, 21, 31]
+NUM_POSITIONS = 5
+SEARCH_DEPTH = 4
+
+
+def random_states(size, count, seed=0):
+    """Return the game states of random games after ten moves."""
+    rng = random.Random(seed)
+    states = []
+    while len(states) < count:
+        board = Board("Player1", "Player2", size, size, shuffle_moves=False)
+        for _ in range(10):
+            board.apply_move(rng.choice(board.get_legal_moves()))
+        if board.get_legal_moves():
+            states.append(list(board._board_state))
+    return states
+
+
+def micros_per_node(board_class, size, states):
+    agent = AlphaBetaPlayer(score_fn=custom_score)
+    agent.time_left = lambda: 1e9
+    total_time = 0.
+    nodes = agent.clock.nodes
+    for state in states:
+        board = board_class(agent, "Opponent", size, size, shuffle_moves=False)
+        board._board_state = list(state)
+        board.move_count = 10
+        start = timeit.default_timer()
+        agent.alphabeta(board, SEARCH_DEPTH)
+        total_time += timeit.default_timer() - start
+    return 1e6 * total_time / (agent.clock.nodes - nodes)
+
+
+def main():
+    print("{:<10}{:>12}{:>14}{:>14}".format("Size", "tables ms", "Board us", "BitBoard us"))
+    for size in BOARD_SIZES:
+        start = timeit.default_timer()
+        BoardGeometry.get(size, size)
+        tables = 1000 * (timeit.default_timer() - start)
+        states = random_states(size, NUM_POSITIONS)
+        board_time = micros_per_node(Board, size, states)
+        bitboard_time = micros_per_node(BitBoard, size, states)
+        print("{:<10}{:>12.1f}{:>14.1f}{:>14.1f}".format(
+            "{0}x{0}".format(size), tables, board_time, bitboard_time))
+
+
+if __name__ == "__main__":
+    main()
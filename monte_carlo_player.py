@@ -1,5 +1,5 @@
 
-from random import randint
+import random
 import timeit
 import math
 import game_agent
@@ -31,23 +31,21 @@ def tentative_score(game, player):
     return score
 
 class GreedyPlayer():
-    def __init__(self, score_fn=improved_score):
+    def __init__(self, score_fn=improved_score, seed=None):
         self.score = score_fn
+        self.rng = random.Random(seed)
 
     def get_move(self, game, time_left):
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return (-1, -1)
         
-        if not randint(0, 7):
-            return legal_moves[randint(0, len(legal_moves) - 1)]
+        if not self.rng.randint(0, 7):
+            return self.rng.choice(sorted(legal_moves))
         
         _, move = max([(improved_score(game.forecast_move(m), self), m) for m in legal_moves])
         return move
 
-class SearchTimeout(Exception):
-    pass
-
 class MonteCarloPlayer(game_agent.IsolationPlayer):
     """An agent that implements a Monte Carlo tree search (as described in the
     Wikipedia article: https://en.wikipedia.org/wiki/Monte_Carlo_tree_search).
@@ -56,14 +54,24 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
     could certainly be improved.
     """
     PLAYOUT_MOVE_COUNT = 6
-    playout_player_1 = GreedyPlayer()
-    playout_player_2 = GreedyPlayer()
+    # the largest fraction of the time for a move used by the endgame solver
+    ENDGAME_TIME_SHARE = 0.5
     
-    def __init__(self, EXPLORATION_PARAM = 5):
+    def __init__(self, EXPLORATION_PARAM = 5, seed=None, endgame_solver=None):
+        # the playouts are reproducible if a seed is given
+        self.playout_player_1 = GreedyPlayer(seed=seed)
+        self.playout_player_2 = GreedyPlayer(seed=None if seed is None else seed + 1)
         self.root = None
         self.frontier = []
         self.TIMER_THRESHOLD = 40.
         self.EXPLORATION_PARAM = EXPLORATION_PARAM
+        self.clock = game_agent.SearchClock()
+        # the root solver has its own clock, as its nodes are much cheaper
+        # than the playouts that calibrate the clock of the tree search
+        self.solver_clock = game_agent.SearchClock()
+        # e.g. a partition.PartitionSolver: positions it can decide are not
+        # played out, and it chooses the move once it can decide the game
+        self.endgame_solver = endgame_solver
         super(MonteCarloPlayer, self).__init__()
     
     def update_root(self, new_root):
@@ -91,6 +99,18 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
         if not board.get_legal_moves():
             return None
         
+        if self.endgame_solver is not None:
+            # the solver may use part of the time, the tree search the rest
+            search_time = time_left() - self.TIMER_THRESHOLD
+            threshold = self.TIMER_THRESHOLD + (1. - self.ENDGAME_TIME_SHARE) * max(search_time, 0.)
+            try:
+                self.solver_clock.start(time_left, threshold)
+                move = self.endgame_solver.best_move(board, clock=self.solver_clock)
+                if move is not None:
+                    return move
+            except game_agent.SearchTimeout:
+                pass
+        
         if board.move_count <= 3:
             # a new game has started
             self.root = MonteCarloNode(board, None)
@@ -105,6 +125,7 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
                 self.frontier = [self.root]
                 
         try:
+            self.clock.start(time_left, self.TIMER_THRESHOLD)
             while True:
                 self.check_time()
                 
@@ -122,7 +143,7 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
                     self.check_time()
                     self.propagate_back(new_node, score)
                     
-        except SearchTimeout:
+        except game_agent.SearchTimeout:
             pass
         
         best_child = self.find_best_child_node()
@@ -137,8 +158,8 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
         return move
      
     def check_time(self):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        # only polls the clock every few calls, see game_agent.SearchClock
+        self.clock.check()
     
     def find_best_child_node(self):
         best_child = self.root.children[0] if self.root.children else None
@@ -201,6 +222,12 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
         return new_nodes
         
     def simulate(self, node):
+        if self.endgame_solver is not None:
+            solved = self.endgame_solver.solve(node.board, node.board.inactive_player,
+                                               clock=self.clock)
+            if solved is not None:
+                return 1 if solved > 0 else 0
+        
         playout_board = self.create_playout_board(node.board, self.playout_player_1, self.playout_player_2)
         inactive_player = playout_board.inactive_player
         
@@ -220,7 +247,7 @@ class MonteCarloPlayer(game_agent.IsolationPlayer):
             score = 1. - score
             
     def create_playout_board(self, board, player_1, player_2):
-        playout_board = PlayoutBoard(player_1, player_2)
+        playout_board = PlayoutBoard(player_1, player_2, shuffle_moves=board.shuffle_moves)
         playout_board.move_count = board.move_count
         playout_board._board_state = copy(board._board_state)
         
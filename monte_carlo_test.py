@@ -144,5 +144,21 @@ class MonteCarloTest(unittest.TestCase):
         best_move = player.get_move(self.board, self.create_clock())
         self.assertTrue(best_move in [(2, 3), (5, 2), (3, 2), (3, 6), (5, 2), (5, 6), (6, 3)], 'best move: ' + str(best_move))
 
+    def test_slow_endgame_solver(self):
+        class SlowSolver():
+            """A solver that never decides a position at the root."""
+            def best_move(self, game, clock=None):
+                while True:
+                    clock.check()
+
+            def solve(self, game, player, clock=None):
+                return None
+
+        player = MonteCarloPlayer(endgame_solver=SlowSolver())
+        best_move = player.get_move(self.board, self.create_clock())
+        self.assertIn(best_move, self.board.get_legal_moves())
+        # the tree search ran after the solver gave up
+        self.assertGreater(player.root.simulations, 0)
+
 if __name__ == '__main__':
     unittest.main()
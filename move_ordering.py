@@ -0,0 +1,132 @@
+"""Move ordering strategies for alpha-beta search.
+
+Alpha-beta search prunes the most when the best move of a position is
+searched first. A strategy reorders the legal moves of each node before they
+are searched and learns from the moves that caused a beta cutoff. Strategies
+keep state between nodes, so each player needs its own instance, e.g.
+
+    AlphaBetaPlayer(move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic()))
+"""
+
+MOVE_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+
+
+class MoveOrdering():
+    """Base class of the move ordering strategies. This strategy keeps the
+    order in which the board generates the moves.
+    """
+    def new_search(self):
+        """Called by the player before it starts searching for a new move."""
+        pass
+
+    def order_moves(self, game, moves):
+        """Return the list of moves in the order in which they should be
+        searched.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The position in which the moves can be played.
+        moves : list<(int, int)>
+            The legal moves of the active player.
+        Returns
+        -------
+        list<(int, int)>
+            The reordered moves
+        """
+        return moves
+
+    def cutoff(self, game, move, depth):
+        """Called when `move` caused a beta cutoff in the position `game`,
+        which was searched with the remaining depth `depth`.
+        """
+        pass
+
+
+class KillerMoves(MoveOrdering):
+    """Search the moves that recently caused cutoffs at the same ply first.
+    Sibling positions are often refuted by the same move.
+
+    Parameters
+    ----------
+    slots : int (optional)
+        The number of killer moves remembered per ply.
+    """
+    def __init__(self, slots=2):
+        self.slots = slots
+        self.killers = {}
+
+    def new_search(self):
+        self.killers = {}
+
+    def order_moves(self, game, moves):
+        killers = self.killers.get(game.move_count)
+        if not killers:
+            return moves
+        front = [move for move in killers if move in moves]
+        return front + [move for move in moves if move not in front]
+
+    def cutoff(self, game, move, depth):
+        killers = self.killers.setdefault(game.move_count, [])
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.slots:]
+
+
+class HistoryHeuristic(MoveOrdering):
+    """Search the moves first that caused the most cutoffs so far, indexed by
+    the square the player moves from and the square it moves to. Deep cutoffs
+    count more than shallow ones.
+    """
+    def __init__(self):
+        self.history = {}
+
+    def new_search(self):
+        # age the table so that cutoffs of the current search dominate
+        self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
+
+    def order_moves(self, game, moves):
+        if not self.history:
+            return moves
+        history = self.history
+        origin = game.get_player_location(game.active_player)
+        return sorted(moves, key=lambda move: -history.get((origin, move), 0))
+
+    def cutoff(self, game, move, depth):
+        key = (game.get_player_location(game.active_player), move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+class MobilityOrdering(MoveOrdering):
+    """Search the moves first that leave the moving player with the most
+    legal moves in the next turn (one-ply lookahead without applying moves).
+    """
+    def order_moves(self, game, moves):
+        def mobility(move):
+            r, c = move
+            return sum(1 for dr, dc in MOVE_DIRECTIONS if game.move_is_legal((r + dr, c + dc)))
+        return sorted(moves, key=mobility, reverse=True)
+
+
+class CombinedOrdering(MoveOrdering):
+    """Combine several strategies. The first strategy has the highest priority:
+    e.g., `CombinedOrdering(KillerMoves(), HistoryHeuristic())` searches the
+    killer moves first and the remaining moves by their history score.
+    """
+    def __init__(self, *orderings):
+        self.orderings = orderings
+
+    def new_search(self):
+        for ordering in self.orderings:
+            ordering.new_search()
+
+    def order_moves(self, game, moves):
+        # the strategies sort stably, so the last applied strategy wins
+        for ordering in reversed(self.orderings):
+            moves = ordering.order_moves(game, moves)
+        return moves
+
+    def cutoff(self, game, move, depth):
+        for ordering in self.orderings:
+            ordering.cutoff(game, move, depth)
@@ -0,0 +1,91 @@
+"""Unit tests for the move ordering strategies."""
+
+import unittest
+import timeit
+
+import isolation
+import game_agent
+from move_ordering import (MoveOrdering, KillerMoves, HistoryHeuristic,
+                           MobilityOrdering, CombinedOrdering)
+
+
+class MoveOrderingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+        self.board = isolation.Board(self.player1, self.player2)
+        self.board.apply_move((4, 4))
+        self.board.apply_move((0, 2))
+        self.moves = sorted(self.board.get_legal_moves())
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def test_killer_moves(self):
+        ordering = KillerMoves(slots=2)
+        self.assertEqual(self.moves, ordering.order_moves(self.board, self.moves))
+        ordering.cutoff(self.board, (6, 5), 3)
+        ordering.cutoff(self.board, (3, 2), 3)
+        ordering.cutoff(self.board, (5, 6), 3)
+        ordered = ordering.order_moves(self.board, self.moves)
+        self.assertEqual([(5, 6), (3, 2)], ordered[:2])
+        self.assertEqual(sorted(self.moves), sorted(ordered))
+
+        # killers are remembered per ply
+        after_move = self.board.forecast_move((5, 6))
+        self.assertEqual(self.moves, ordering.order_moves(after_move, self.moves))
+
+        ordering.new_search()
+        self.assertEqual(self.moves, ordering.order_moves(self.board, self.moves))
+
+    def test_history_heuristic(self):
+        ordering = HistoryHeuristic()
+        ordering.cutoff(self.board, (6, 5), 1)
+        ordering.cutoff(self.board, (3, 2), 3)
+        ordered = ordering.order_moves(self.board, self.moves)
+        self.assertEqual([(3, 2), (6, 5)], ordered[:2])
+
+        ordering.new_search()
+        self.assertEqual({((4, 4), (3, 2)): 4}, ordering.history)
+
+    def test_mobility_ordering(self):
+        ordered = MobilityOrdering().order_moves(self.board, self.moves)
+        mobility = [len(self.board.forecast_move(move).forecast_move((1, 4)).get_legal_moves())
+                    for move in ordered]
+        self.assertEqual(sorted(mobility, reverse=True), mobility)
+
+    def test_combined_ordering(self):
+        killers = KillerMoves()
+        history = HistoryHeuristic()
+        ordering = CombinedOrdering(killers, history)
+        ordering.cutoff(self.board, (6, 5), 1)
+        history.cutoff(self.board, (3, 2), 3)
+        self.assertEqual([(6, 5), (3, 2)], ordering.order_moves(self.board, self.moves)[:2])
+
+    def test_same_score_as_plain_search(self):
+        board = self.board
+        plain = game_agent.AlphaBetaPlayer(move_ordering=MoveOrdering())
+        ordered = game_agent.AlphaBetaPlayer(
+            move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic(), MobilityOrdering()))
+        for player in [plain, ordered]:
+            player.clock.start(self.create_clock(10000), player.TIMER_THRESHOLD)
+        for depth in range(1, 6):
+            plain_score, _ = plain.max_value(board.copy(), depth, float("-inf"), float("inf"))
+            ordered_score, _ = ordered.max_value(board.copy(), depth, float("-inf"), float("inf"))
+            self.assertEqual(plain_score, ordered_score)
+
+    def test_get_move(self):
+        player = game_agent.AlphaBetaPlayer(move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic()))
+        board = isolation.Board(player, self.player2)
+        board.apply_move((4, 4))
+        board.apply_move((0, 2))
+        move = player.get_move(board, self.create_clock())
+        self.assertTrue(move in board.get_legal_moves(), 'best move: ' + str(move))
+        self.assertTrue(player.move_ordering.orderings[1].history)
+
+
+if __name__ == '__main__':
+    unittest.main()
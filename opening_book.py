@@ -0,0 +1,250 @@
+"""An opening book of deeply searched early positions, stored in a memory-mapped
+file.
+
+The first plies of a game are searched from scratch in every game, although
+the search is shallowest there. The book builder searches all early positions
+offline, to a fixed depth and in parallel, and stores the best move of each
+one. Positions are stored under their symmetry-canonical key (see
+`isolation.symmetry`), so the 8 reflections and rotations of a position share
+one entry, and the move is mapped back to the orientation of the game when
+it is looked up.
+
+The book file is a header followed by fixed-size records sorted by key. The
+key of a position is its canonical packed game state without the move count
+(see `isolation.Board.to_packed()`), which identifies the position exactly and
+fits in 64 bits for boards of up to 7x7 cells. `OpeningBook` maps the file
+into memory and finds a position with a binary search over the records, so
+opening a book takes no parsing and the pages of the file are shared by all
+processes that use it:
+
+    player = AlphaBetaPlayer(opening_book=OpeningBook('opening_book.bin'))
+
+Build a book with:
+
+    python opening_book.py [path]
+"""
+import mmap
+import multiprocessing
+import struct
+import sys
+
+from isolation import BitBoard
+from isolation.symmetry import Symmetries
+import game_agent
+from transposition_table import TranspositionTable
+from move_ordering import CombinedOrdering, KillerMoves, HistoryHeuristic
+
+MAGIC = b'ISOBOOK1'
+# magic, width, height, number of plies covered, number of records
+HEADER = struct.Struct('<8sBBBxI')
+# key, cell index of the move in the canonical position, depth, score
+RECORD = struct.Struct('<QBBxxf')
+KEY = struct.Struct('<Q')
+
+PLIES = 4
+DEPTH = 9
+
+
+def key_bits(width, height):
+    """Return the number of bits of the key of a position of the given size."""
+    size = width * height
+    return size + 1 + 2 * size.bit_length()
+
+
+def position_key(symmetries, board):
+    """Return the book key of a position and the symmetry that maps the
+    position to its canonical position.
+    """
+    key, transform = symmetries.canonical(board)
+    # the move count is the same in all images and is implied by the position
+    return key & ((1 << key_bits(board.width, board.height)) - 1), transform
+
+
+class OpeningBook():
+    """A read-only opening book file mapped into memory.
+
+    Parameters
+    ----------
+    path : str
+        The path of a book file written by `write_book()`
+
+    Attributes
+    ----------
+    width, height : int
+        The board size of the positions in the book
+    plies : int
+        The book covers the positions with a move count below this number
+    hits, misses : int
+        The number of lookups that found or did not find a position
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.height, self.plies, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError("Not an opening book file: {}".format(path))
+        self.symmetries = Symmetries.get(self.width, self.height)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Unmap the book file."""
+        self.data.close()
+
+    def find(self, key):
+        """Return the offset of the record with the given key, or None."""
+        data = self.data
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = KEY.unpack_from(data, HEADER.size + middle * RECORD.size)[0]
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return HEADER.size + middle * RECORD.size
+        return None
+
+    def lookup(self, game):
+        """Return the book entry of a position as a tuple (move, depth,
+        score), where the score is from the point of view of the player to
+        move, or None if the position is not in the book.
+        """
+        if (game.move_count >= self.plies or game.width != self.width
+                or game.height != self.height):
+            return None
+        key, transform = position_key(self.symmetries, game)
+        offset = self.find(key)
+        if offset is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        _, idx, depth, score = RECORD.unpack_from(self.data, offset)
+        move = self.symmetries.inverse_move((idx % self.height, idx // self.height), transform)
+        return move, depth, score
+
+    def get_move(self, game):
+        """Return the book move of the position, or None if the position is
+        not in the book.
+        """
+        entry = self.lookup(game)
+        if entry is None or not game.move_is_legal(entry[0]):
+            return None
+        return entry[0]
+
+
+def write_book(path, entries, width=7, height=7, plies=PLIES):
+    """Write a book file.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file
+    entries : iterable of (int, int, int, float)
+        The key of a position (see `position_key()`), the cell index
+        (`row + column * height`) of the best move in the canonical position,
+        the search depth and the score from the point of view of the player
+        to move
+    width, height : int (optional)
+        The board size of the positions
+    plies : int (optional)
+        The book covers the positions with a move count below this number
+    """
+    if key_bits(width, height) > 64:
+        raise ValueError("Board too large for a book: {}x{}".format(width, height))
+    entries = sorted(entries)
+    with open(path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, width, height, plies, len(entries)))
+        for key, idx, depth, score in entries:
+            book_file.write(RECORD.pack(key, idx, depth, score))
+
+
+def canonical_positions(plies=PLIES, width=7, height=7):
+    """Return the packed game states of the canonical positions with a move
+    count below `plies` in which the player to move has a legal move.
+    """
+    symmetries = Symmetries.get(width, height)
+    positions = {}
+    frontier = [BitBoard("Player1", "Player2", width, height, shuffle_moves=False)]
+    for _ in range(plies):
+        successors = {}
+        for game in frontier:
+            key, transform = position_key(symmetries, game)
+            if key in positions:
+                continue
+            canonical_game = symmetries.transform_board(game, transform)
+            moves = canonical_game.get_legal_moves()
+            if not moves:
+                continue
+            positions[key] = canonical_game.to_packed()
+            for move in moves:
+                successor = canonical_game.forecast_move(move)
+                successors[position_key(symmetries, successor)[0]] = successor
+        frontier = list(successors.values())
+    return sorted(positions.values())
+
+
+def search_position(task):
+    """Search a canonical position to a fixed depth and return its book
+    entry (key, cell index of the best move, depth, score), or None if the
+    player to move has no legal move.
+    """
+    packed, depth, width, height = task
+    agent = game_agent.AlphaBetaPlayer(
+        score_fn=game_agent.custom_score, transposition_table=TranspositionTable(),
+        move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic()))
+    game = BitBoard.from_packed(packed, "Player1", "Player2", width, height)
+    players = (agent, "Opponent") if game.active_player == "Player1" else ("Opponent", agent)
+    game = BitBoard.from_packed(packed, players[0], players[1], width, height)
+    legal_moves = game.get_legal_moves()
+    if not legal_moves:
+        return None
+
+    agent.time_left = lambda: float("inf")
+    agent.start_search(game)
+    # a proven loss returns (-1, -1); keep the move of the last iteration
+    # that found one, or any legal move if none did
+    best_move = legal_moves[0]
+    for iteration in range(1, depth + 1):
+        move = agent.alphabeta(game, iteration)
+        if move != (-1, -1):
+            best_move = move
+        if abs(agent.root_score) == float("inf"):
+            break
+    key, _ = position_key(Symmetries.get(width, height), game)
+    return key, best_move[0] + best_move[1] * height, iteration, agent.root_score
+
+
+def build_book(path, plies=PLIES, depth=DEPTH, width=7, height=7, workers=None):
+    """Search the canonical positions with a move count below `plies` to
+    `depth` plies in `workers` processes (default: one per CPU) and write
+    the book to `path`. Returns the number of positions in the book.
+    """
+    if key_bits(width, height) > 64:
+        raise ValueError("Board too large for a book: {}x{}".format(width, height))
+    tasks = [(packed, depth, width, height)
+             for packed in canonical_positions(plies, width, height)]
+    pool = multiprocessing.Pool(workers or multiprocessing.cpu_count())
+    try:
+        entries = pool.map(search_position, tasks, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    entries = [entry for entry in entries if entry is not None]
+    write_book(path, entries, width, height, plies)
+    return len(entries)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'opening_book.bin'
+    count = build_book(path)
+    print("Wrote {} positions to {}".format(count, path))
+
+
+if __name__ == '__main__':
+    main()
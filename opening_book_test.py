@@ -0,0 +1,102 @@
+"""Unit tests for the opening book builder and the memory-mapped book of
+`opening_book`.
+"""
+
+import unittest
+import os
+import random
+import shutil
+import tempfile
+
+import isolation
+from isolation.symmetry import Symmetries
+import game_agent
+from opening_book import (OpeningBook, build_book, canonical_positions, search_position,
+                          write_book)
+
+
+class OpeningBookTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, 'book.bin')
+        cls.count = build_book(cls.path, plies=3, depth=2, workers=2)
+        cls.book = OpeningBook(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.book.close()
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def random_position(self, rng, plies):
+        board = isolation.Board(self.player1, self.player2)
+        for _ in range(plies):
+            board.apply_move(rng.choice(board.get_legal_moves()))
+        return board
+
+    def test_book_covers_canonical_positions(self):
+        self.assertEqual(len(canonical_positions(3)), self.count)
+        self.assertEqual(self.count, len(self.book))
+        # the empty board, 10 distinct first placements and their replies
+        self.assertEqual(1 + 10, len(canonical_positions(2)))
+
+    def test_symmetric_positions_share_entry(self):
+        rng = random.Random(7)
+        symmetries = Symmetries.get(7, 7)
+        for plies in range(3):
+            board = self.random_position(rng, plies)
+            move, depth, _ = self.book.lookup(board)
+            self.assertIn(move, board.get_legal_moves())
+            self.assertEqual(2, depth)
+            for transform in range(len(symmetries.permutations)):
+                image = symmetries.transform_board(board, transform)
+                self.assertEqual(symmetries.transform_move(move, transform),
+                                 self.book.get_move(image))
+
+    def test_positions_outside_book(self):
+        rng = random.Random(9)
+        self.assertIsNone(self.book.lookup(self.random_position(rng, 3)))
+        self.assertIsNone(self.book.lookup(isolation.Board(self.player1, self.player2, 5, 5)))
+
+    def test_players_play_book_moves(self):
+        rng = random.Random(11)
+        for player_class in (game_agent.AlphaBetaPlayer, game_agent.PVSPlayer):
+            agent = player_class(opening_book=self.book)
+            board = isolation.Board(self.player1, agent)
+            board.apply_move(rng.choice(board.get_legal_moves()))
+            move = agent.get_move(board, lambda: 1e9)
+            self.assertEqual(self.book.get_move(board), move)
+            self.assertEqual(0, agent.clock.nodes)
+
+    def test_lost_root_keeps_legal_move(self):
+        # a 5x5 position in which the player to move is lost within 4 plies
+        packed = 653341662528
+        board = isolation.BitBoard.from_packed(packed, self.player1, self.player2, 5, 5)
+        key, idx, _, score = search_position((packed, 4, 5, 5))
+        self.assertEqual(float("-inf"), score)
+        self.assertIn((idx % 5, idx // 5), board.get_legal_moves())
+        path = os.path.join(self.directory, 'lost.bin')
+        write_book(path, [(key, idx, 4, score)], 5, 5)
+        book = OpeningBook(path)
+        self.assertEqual(1, len(book))
+        book.close()
+
+        while board.get_legal_moves():
+            board.apply_move(board.get_legal_moves()[0])
+        self.assertIsNone(search_position((board.to_packed(), 4, 5, 5)))
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.directory, 'other.bin')
+        with open(path, 'wb') as other_file:
+            other_file.write(b'\0' * 64)
+        self.assertRaises(ValueError, OpeningBook, path)
+        self.assertRaises(ValueError, write_book, path, [], 8, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Measure how deep the parallel player searches within the time limit for
+different numbers of worker processes.
+
+Every configuration searches the same set of random positions with a time
+limit of 150 ms per move and reports the average depth of the deepest
+completed iteration. The single process `AlphaBetaPlayer` is the baseline.
+
+The depths only show how the search scales with the workers if the machine
+has at least as many CPUs as workers. With fewer CPUs the workers share
+them, and the numbers show the overhead of the parallel search instead; no
+scaling has been measured on a machine with a single CPU.
+
+Usage:
+
+    python parallel_benchmark.py
+"""
+import multiprocessing
+import timeit
+
+from isolation import Board
+from game_agent import AlphaBetaPlayer, custom_score
+from parallel_player import ParallelPlayer
+from search_benchmark import random_positions
+from transposition_table import TranspositionTable
+from move_ordering import CombinedOrdering, KillerMoves, HistoryHeuristic
+
+NUM_POSITIONS = 10
+TIME_LIMIT = 150
+
+
+def create_player():
+    return AlphaBetaPlayer(
+        score_fn=custom_score, transposition_table=TranspositionTable(),
+        move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic()))
+
+
+def create_clock(time_limit):
+    time_millis = lambda: 1000 * timeit.default_timer()
+    start = time_millis()
+    return lambda: start + time_limit - time_millis()
+
+
+def average_depth(agent, positions, depth_reached):
+    total = 0
+    for game in positions:
+        # the agent takes the place of the player to move
+        players = [agent, "Opponent"]
+        if game.active_player != game._player_1:
+            players.reverse()
+        position = Board.from_packed(game.to_packed(), *players,
+                                     width=game.width, height=game.height)
+        agent.get_move(position, create_clock(TIME_LIMIT))
+        total += depth_reached(agent)
+    return total / len(positions)
+
+
+def main():
+    positions = random_positions(NUM_POSITIONS)
+    cpus = multiprocessing.cpu_count()
+    print("CPUs: {}, time limit: {} ms".format(cpus, TIME_LIMIT))
+    print("{:<22}{:>10}".format("Workers", "Depth"))
+
+    baseline = create_player()
+    print("{:<22}{:>10.2f}".format("AlphaBeta",
+                                    average_depth(baseline, positions, lambda a: len(a.iteration_times))))
+
+    worker_counts = sorted(set([1, 2, 4, cpus]))
+    if cpus < worker_counts[-1]:
+        print("Fewer CPUs than workers: the depths do not show scaling")
+    for workers in worker_counts:
+        agent = ParallelPlayer(create_player(), workers=workers)
+        try:
+            # start the workers before the clock runs
+            agent.start_workers()
+            depth = average_depth(agent, positions, lambda a: a.depth_reached)
+        finally:
+            agent.close()
+        print("{:<22}{:>10.2f}".format("Parallel({})".format(workers), depth))
+
+
+if __name__ == '__main__':
+    main()
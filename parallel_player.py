@@ -0,0 +1,228 @@
+"""A player that splits the search of the root moves across several
+processes.
+
+Each iteration of iterative deepening first searches the best move of the
+previous iteration in one worker (young brothers wait), which establishes a
+lower bound for the root. The other root moves are then searched in parallel
+by all workers. The best score found so far is shared with the workers, which
+use it as the alpha bound of the root moves they start.
+
+The workers are started once and keep their own transposition table and
+move ordering state between searches. The positions are transferred as the
+compact list of `Board._board_state` values rather than pickled boards.
+"""
+import multiprocessing
+from copy import copy
+from queue import Empty
+
+import game_agent
+from pondering_player import PONDER_TIME_MILLIS, restore_board
+
+
+def search_root_moves(player, tasks, results, current_job, alpha):
+    """The main function of a worker process.
+
+    Parameters
+    ----------
+    player : `game_agent.AlphaBetaPlayer`
+        The player used to search.
+    tasks : `multiprocessing.Queue`
+        Root moves to search as tuples (job id, depth, board class, board
+        state, move count, width, height, move); None stops the worker.
+    results : `multiprocessing.Queue`
+        Receives a tuple (job id, move, score, exact) for every completed
+        search; `exact` is False if the score is only an upper bound because
+        the move failed low against the shared alpha.
+    current_job : `multiprocessing.Value`
+        The id of the current job; a search stops as soon as this value
+        changes.
+    alpha : `multiprocessing.Value`
+        The best score of the root moves of the current job found so far.
+    """
+    position = None
+    position_id = None
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        job_id, depth, board_class, board_state, move_count, width, height, move = task
+        if current_job.value != job_id:
+            continue
+        if position_id != (board_state, move_count):
+            position = restore_board(board_class, board_state, move_count, width, height)
+            position_id = (board_state, move_count)
+            player.start_search(position)
+
+        player.time_left = lambda: PONDER_TIME_MILLIS if current_job.value == job_id else 0.
+        try:
+            player.clock.start(player.time_left, 1.)
+            board = position.forecast_move(move)
+            move_alpha = alpha.value
+            score, _ = player.min_value(board, depth - 1, move_alpha, float("inf"))
+        except game_agent.SearchTimeout:
+            continue
+
+        with alpha.get_lock():
+            if score > alpha.value:
+                alpha.value = score
+        exact = move_alpha == float("-inf") or score > move_alpha
+        results.put((job_id, move, score, exact))
+
+
+class ParallelPlayer():
+    """Game-playing agent that chooses a move using iterative deepening
+    alpha-beta search with the root moves distributed across worker
+    processes.
+
+    Parameters
+    ----------
+    player : `game_agent.AlphaBetaPlayer` (optional)
+        The player used by the workers to search the root moves, e.g. an
+        `AlphaBetaPlayer` with a transposition table. Each worker searches
+        with its own copy.
+
+    workers : int (optional)
+        The number of worker processes; defaults to the number of CPUs.
+
+    timeout : float (optional)
+        Time remaining (in milliseconds) when search is aborted.
+    """
+    def __init__(self, player=None, workers=None, timeout=10.):
+        self.player = player if player is not None else game_agent.AlphaBetaPlayer()
+        self.workers = workers or multiprocessing.cpu_count()
+        self.TIMER_THRESHOLD = timeout
+        self.processes = []
+        self.job_id = 0
+        self.depth_reached = 0
+
+    def start_workers(self):
+        self.tasks = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.current_job = multiprocessing.Value('i', -1)
+        self.alpha = multiprocessing.Value('d', float("-inf"))
+        # the copies must not refer to the clock function of this process
+        template = copy(self.player)
+        template.time_left = None
+        for _ in range(self.workers):
+            process = multiprocessing.Process(
+                target=search_root_moves,
+                args=(template, self.tasks, self.results, self.current_job, self.alpha))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        self.depth_reached = 0
+        moves = game.get_legal_moves()
+        if not moves:
+            return (-1, -1)
+        if not self.processes:
+            self.start_workers()
+
+        board_data = (type(game), list(game._board_state), game.move_count, game.width, game.height)
+        best_move = moves[0]
+        try:
+            for depth in range(1, game.count_blank_spaces()):
+                scores = self.search_depth(depth, board_data, moves, time_left)
+                best_move = self.select_best_move(moves, scores)
+                # search the best move first in the next iteration, the other
+                # moves ordered by their (mostly upper bound) scores
+                moves = [best_move] + sorted(
+                    [move for move in moves if move != best_move],
+                    key=lambda move: -scores[move][0])
+                self.depth_reached = depth
+                if abs(scores[best_move][0]) == float("inf"):
+                    break
+        except game_agent.SearchTimeout:
+            pass
+        finally:
+            self.current_job.value = -1
+
+        return best_move
+
+    def search_depth(self, depth, board_data, moves, time_left):
+        """Search all root moves to the given depth with the workers, the first
+        move before all others.
+
+        Returns
+        -------
+        dict
+            The score and a flag that is False if the score is only an upper
+            bound, for every root move
+        """
+        self.job_id += 1
+        with self.alpha.get_lock():
+            self.current_job.value = self.job_id
+            self.alpha.value = float("-inf")
+
+        scores = {}
+        self.tasks.put((self.job_id, depth) + board_data + (moves[0],))
+        self.wait_for_results(scores, 1, time_left)
+        for move in moves[1:]:
+            self.tasks.put((self.job_id, depth) + board_data + (move,))
+        self.wait_for_results(scores, len(moves), time_left)
+        return scores
+
+    def select_best_move(self, moves, scores):
+        """Return the move with the best exact score. The first move, the best
+        move of the previous iteration, is searched with a full window and
+        wins ties; a move that failed low only has an upper bound and cannot
+        be better.
+        """
+        best_move = moves[0]
+        best_score = scores[best_move][0]
+        for move in moves[1:]:
+            score, exact = scores[move]
+            if exact and score > best_score:
+                best_move, best_score = move, score
+        return best_move
+
+    def wait_for_results(self, scores, count, time_left):
+        """Collect the results of the current job until there are `count`
+        scores. Raises `SearchTimeout` if the time runs out.
+        """
+        while len(scores) < count:
+            remaining = time_left() - self.TIMER_THRESHOLD
+            if remaining <= 0:
+                raise game_agent.SearchTimeout()
+            try:
+                job_id, move, score, exact = self.results.get(timeout=remaining / 1000.)
+            except Empty:
+                raise game_agent.SearchTimeout()
+            if job_id == self.job_id:
+                scores[move] = (score, exact)
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.processes:
+            self.current_job.value = -1
+            for _ in self.processes:
+                self.tasks.put(None)
+            for process in self.processes:
+                process.join(1.)
+                if process.is_alive():
+                    process.terminate()
+            self.processes = []
+
+    def __str__(self):
+        return type(self).__name__ + '|' + str(self.player)
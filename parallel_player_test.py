@@ -0,0 +1,69 @@
+"""Unit tests for the parallel player."""
+
+import unittest
+import timeit
+
+import isolation
+import game_agent
+from parallel_player import ParallelPlayer
+
+
+class ParallelPlayerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = ParallelPlayer(game_agent.AlphaBetaPlayer(), workers=2)
+        self.opponent = "Player2"
+        self.board = isolation.Board(self.agent, self.opponent)
+        self.board.apply_move((4, 4))
+        self.board.apply_move((0, 2))
+
+    def tearDown(self):
+        self.agent.close()
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def test_get_move(self):
+        clock = self.create_clock(500)
+        move = self.agent.get_move(self.board, clock)
+        self.assertGreater(clock(), 0)
+        self.assertTrue(move in self.board.get_legal_moves(), 'best move: ' + str(move))
+        self.assertGreater(self.agent.depth_reached, 0)
+
+    def test_same_move_as_alphabeta(self):
+        self.agent.start_workers()
+        board_data = (type(self.board), list(self.board._board_state), self.board.move_count,
+                      self.board.width, self.board.height)
+        moves = self.board.get_legal_moves()
+        player = game_agent.AlphaBetaPlayer()
+        player.time_left = self.create_clock(10000)
+        player.clock.start(player.time_left, player.TIMER_THRESHOLD)
+        for depth in range(1, 5):
+            scores = self.agent.search_depth(depth, board_data, moves, self.create_clock(10000))
+            score, _ = player.max_value(self.board.copy(), depth, float("-inf"), float("inf"))
+            self.assertEqual(score, max(score for score, _ in scores.values()))
+            best_move = self.agent.select_best_move(moves, scores)
+            self.assertEqual((score, True), scores[best_move])
+
+    def test_select_best_move(self):
+        moves = [(0, 0), (1, 1), (2, 2)]
+        # fail-low upper bounds equal to or above the exact score never win
+        scores = {(0, 0): (1., True), (1, 1): (1., False), (2, 2): (3., False)}
+        self.assertEqual((0, 0), self.agent.select_best_move(moves, scores))
+        # ties with the first move keep the move of the previous iteration
+        scores[(1, 1)] = (1., True)
+        self.assertEqual((0, 0), self.agent.select_best_move(moves, scores))
+        scores[(2, 2)] = (3., True)
+        self.assertEqual((2, 2), self.agent.select_best_move(moves, scores))
+
+    def test_no_legal_moves(self):
+        board = isolation.Board(self.agent, self.opponent, 2, 2)
+        board.apply_move((0, 0))
+        board.apply_move((1, 1))
+        self.assertEqual((-1, -1), self.agent.get_move(board, self.create_clock()))
+
+
+if __name__ == '__main__':
+    unittest.main()
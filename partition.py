@@ -0,0 +1,209 @@
+"""Partition detection and an exact longest-path solver for the endgame.
+
+Once no blank cell can be reached by both players, the players can no longer
+block each other: each one moves in its own region of the board and the game
+is decided by who can make more moves. The player to move wins if and only if
+its longest knight's path is strictly longer than the opponent's.
+
+`PartitionSolver` detects this separation with a flood fill on the blank
+cell bitmask (see `isolation.bitboard.BoardGeometry.flood_fill()`) and
+computes the longest path in each region with a depth-first search memoized
+on the location and the reachable cells. The search players use it to return exact results as
+soon as a position is partitioned instead of searching it to the end.
+"""
+from isolation.bitboard import BoardGeometry, popcount
+
+
+class PartitionSolver():
+    """Solves positions in which the players are in separate regions of the
+    board by comparing the lengths of their longest knight's paths.
+
+    The longest paths are memoized on (location, reachable cells), so the
+    results are shared between the many positions of a search that contain
+    the same region. Pass an instance as `endgame_solver` to the search
+    players; it may be shared between players.
+
+    Parameters
+    ----------
+    max_region : int (optional)
+        The largest region (in cells) whose longest path is computed; the
+        cost of the exact search grows exponentially with the region size.
+        Positions with a larger region are not solved.
+
+    memo_size : int (optional)
+        The number of longest paths kept; the memo is cleared when it grows
+        beyond this size.
+
+    max_blank : int (optional)
+        Positions with more blank cells are not checked for a partition.
+        Open positions are rarely partitioned, and the check costs a flood
+        fill at every node of a search.
+    """
+    def __init__(self, max_region=24, memo_size=2**18, max_blank=36):
+        self.max_region = max_region
+        self.memo_size = memo_size
+        self.max_blank = max_blank
+        self.memo = {}
+        self.solved = 0
+
+    def regions(self, game):
+        """Return the regions of the active and the inactive player if the
+        players are separated.
+
+        Returns
+        -------
+        (int, int, int, int) or None
+            The cell index and the region bitmask of the active player and
+            of the inactive player; None if a player has not moved yet, the
+            players can still reach a common cell or the position has more
+            than `max_blank` blank cells
+        """
+        if game.count_blank_spaces() > self.max_blank:
+            return None
+        geometry = BoardGeometry.get(game.width, game.height)
+        own_location = game.get_player_location(game.active_player)
+        opp_location = game.get_player_location(game.inactive_player)
+        if own_location is None or opp_location is None:
+            return None
+        own_index = geometry.index(own_location)
+        opp_index = geometry.index(opp_location)
+        blank = game.blank_mask()
+        opp_moves = geometry.knight_masks[opp_index] & blank
+        own_region = geometry.flood_fill(own_index, blank, stop=opp_moves)
+        if own_region is None:
+            return None
+        opp_region = geometry.flood_fill(opp_index, blank & ~own_region)
+        return own_index, own_region, opp_index, opp_region
+
+    def longest_path(self, geometry, location, region, clock=None):
+        """Return the number of moves of the longest knight's path from a cell
+        through the cells of `region` that are reachable from it. The search
+        checks `clock` (a `game_agent.SearchClock`) at every node if given.
+        """
+        if clock is not None:
+            clock.check()
+        region = geometry.flood_fill(location, region)
+        key = (location, region)
+        length = self.memo.get(key)
+        if length is not None:
+            return length
+
+        # a path cannot be longer than the number of reachable cells
+        upper_bound = popcount(region)
+        length = 0
+        moves = geometry.knight_masks[location] & region
+        while moves and length < upper_bound:
+            low_bit = moves & -moves
+            moves ^= low_bit
+            length = max(length, 1 + self.longest_path(
+                geometry, low_bit.bit_length() - 1, region ^ low_bit, clock))
+
+        if len(self.memo) >= self.memo_size:
+            self.memo.clear()
+        self.memo[key] = length
+        return length
+
+    def path_bounds(self, geometry, location, region, exact, clock=None):
+        """Return a lower and an upper bound of the longest path length from a
+        cell through `region`; both are the exact length if `exact` is True.
+        """
+        if exact:
+            length = self.longest_path(geometry, location, region, clock)
+            return length, length
+        has_move = bool(geometry.knight_masks[location] & region)
+        return int(has_move), popcount(region)
+
+    def active_player_wins(self, game, clock=None):
+        """Decide a partitioned position.
+
+        The longest path of the smaller region is always computed exactly;
+        the larger region is only searched if the bounds given by its size
+        do not decide the game.
+
+        Returns
+        -------
+        bool or None
+            True if the active player wins, False if it loses, None if the
+            position is not partitioned or cannot be decided without
+            searching a region larger than `max_region`
+        """
+        regions = self.regions(game)
+        if regions is None:
+            return None
+        own_index, own_region, opp_index, opp_region = regions
+        geometry = BoardGeometry.get(game.width, game.height)
+        own_size, opp_size = popcount(own_region), popcount(opp_region)
+        if min(own_size, opp_size) > self.max_region:
+            return None
+
+        own_exact = own_size <= opp_size
+        own_low, own_high = self.path_bounds(geometry, own_index, own_region, own_exact, clock)
+        opp_low, opp_high = self.path_bounds(geometry, opp_index, opp_region, not own_exact, clock)
+        # the player to move runs out of moves first unless its path is longer
+        if own_low > opp_high:
+            return True
+        if own_high <= opp_low:
+            return False
+        if max(own_size, opp_size) > self.max_region:
+            return None
+        if own_exact:
+            opp_low, _ = self.path_bounds(geometry, opp_index, opp_region, True, clock)
+        else:
+            own_low, _ = self.path_bounds(geometry, own_index, own_region, True, clock)
+        return own_low > opp_low
+
+    def solve(self, game, player, clock=None):
+        """Return the exact utility of a partitioned position.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            the position to solve
+        player : object
+            the player from whose point of view the position is scored
+        clock : `game_agent.SearchClock` (optional)
+            checked at every node of the longest-path search, so that it can
+            be stopped by a `SearchTimeout`
+
+        Returns
+        -------
+        float or None
+            float("inf") if `player` wins, float("-inf") if `player` loses,
+            None if the position cannot be solved
+        """
+        active_wins = self.active_player_wins(game, clock)
+        if active_wins is None:
+            return None
+        self.solved += 1
+        if active_wins == (player == game.active_player):
+            return float("inf")
+        return float("-inf")
+
+    def best_move(self, game, clock=None):
+        """Return the best move of the active player in a partitioned
+        position: the first move of its longest path. Returns None if the
+        position cannot be solved.
+        """
+        regions = self.regions(game)
+        if regions is None:
+            return None
+        own_index, own_region, _, _ = regions
+        if not own_region:
+            return None
+        geometry = BoardGeometry.get(game.width, game.height)
+        if popcount(own_region) > self.max_region:
+            if self.active_player_wins(game, clock) is None:
+                return None
+            # decided by the region sizes alone: either the opponent cannot
+            # move at all or the game is lost anyway, so any move will do
+            moves = geometry.knight_masks[own_index] & own_region
+            return geometry.squares[(moves & -moves).bit_length() - 1]
+
+        best_length, best_index = -1, None
+        for target in geometry.knight_targets[own_index]:
+            bit = 1 << target
+            if own_region & bit:
+                length = self.longest_path(geometry, target, own_region ^ bit, clock)
+                if length > best_length:
+                    best_length, best_index = length, target
+        return geometry.squares[best_index]
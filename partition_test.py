@@ -0,0 +1,141 @@
+"""Unit tests for the partition detection and the longest-path solver of
+`partition.PartitionSolver`.
+"""
+
+import unittest
+import random
+import timeit
+
+import isolation
+import game_agent
+from isolation.bitboard import BoardGeometry
+from monte_carlo_player import MonteCarloPlayer
+from partition import PartitionSolver
+
+
+class PartitionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def active_player_wins(self, board):
+        """Solve the position by searching the whole game tree."""
+        for move in board.get_legal_moves():
+            board.apply_move(move)
+            opponent_wins = self.active_player_wins(board)
+            board.undo_move()
+            if not opponent_wins:
+                return True
+        return False
+
+    def partitioned_positions(self, count, width=5, height=5, seed=0):
+        """Play random games until `count` partitioned positions are found."""
+        rng = random.Random(seed)
+        solver = PartitionSolver()
+        positions = []
+        while len(positions) < count:
+            board = isolation.BitBoard(self.player1, self.player2, width, height)
+            while board.get_legal_moves():
+                board.apply_move(rng.choice(board.get_legal_moves()))
+                if solver.regions(board) is not None:
+                    positions.append(board)
+                    break
+        return positions
+
+    def test_flood_fill(self):
+        geometry = BoardGeometry.get(3, 3)
+        full = geometry.full_mask
+        centre = geometry.index((1, 1))
+        # the centre of a 3x3 board cannot be reached by a knight
+        self.assertEqual(full & ~(1 << centre), geometry.flood_fill(0, full & ~(1 << centre)))
+        self.assertEqual(0, geometry.flood_fill(centre, full))
+        self.assertIsNone(geometry.flood_fill(0, full, stop=1 << geometry.index((2, 2))))
+
+    def test_regions(self):
+        board = isolation.Board(self.player1, self.player2)
+        solver = PartitionSolver()
+        self.assertIsNone(solver.regions(board))
+        board.apply_move((0, 0))
+        board.apply_move((3, 3))
+        self.assertIsNone(solver.regions(board))
+
+        board = isolation.Board(self.player1, self.player2, 3, 3)
+        board.apply_move((1, 1))
+        board.apply_move((0, 0))
+        own_index, own_region, opp_index, opp_region = solver.regions(board)
+        self.assertEqual(0, own_region)
+        self.assertEqual(7, bin(opp_region).count('1'))
+        self.assertIsNone(PartitionSolver(max_blank=6).regions(board))
+
+    def test_solve_matches_full_search(self):
+        solver = PartitionSolver(max_region=8)
+        decided = 0
+        for board in self.partitioned_positions(150):
+            active_wins = solver.active_player_wins(board)
+            if active_wins is None:
+                continue
+            decided += 1
+            self.assertEqual(self.active_player_wins(board), active_wins, board.to_string())
+            expected = float("inf") if active_wins else float("-inf")
+            self.assertEqual(expected, solver.solve(board, board.active_player))
+            self.assertEqual(-expected, solver.solve(board, board.inactive_player))
+
+            move = solver.best_move(board)
+            if active_wins:
+                board.apply_move(move)
+                self.assertFalse(self.active_player_wins(board))
+        self.assertGreater(decided, 100)
+        self.assertEqual(2 * decided, solver.solved)
+
+    def test_longest_path(self):
+        geometry = BoardGeometry.get(3, 4)
+        solver = PartitionSolver()
+        # an open knight's tour exists on the 3x4 board
+        self.assertEqual(11, solver.longest_path(geometry, 0, geometry.full_mask & ~1))
+        self.assertEqual(0, solver.longest_path(geometry, 0, 0))
+
+    def test_search_players_use_solver(self):
+        for board in self.partitioned_positions(10, 7, 7, seed=1):
+            if not board.get_legal_moves():
+                continue
+            solver = PartitionSolver()
+            expected = solver.best_move(board)
+            if expected is None:
+                continue
+            players = [game_agent.AlphaBetaPlayer(endgame_solver=solver),
+                       game_agent.PVSPlayer(endgame_solver=solver),
+                       MonteCarloPlayer(seed=0, endgame_solver=solver)]
+            for player in players:
+                self.assertEqual(expected, player.get_move(board.copy(), self.create_clock()))
+
+            # the score of every node below the root is exact
+            player = players[0]
+            player.time_left = self.create_clock(10000)
+            player.clock.start(player.time_left, player.TIMER_THRESHOLD)
+            score, move = player.max_value(board.copy(), 2, float("-inf"), float("inf"))
+            self.assertEqual(solver.solve(board, board.active_player), score)
+
+    def test_search_returns_move_at_solved_root(self):
+        solver = PartitionSolver(max_region=40, max_blank=49)
+        for board in self.partitioned_positions(10, 7, 7, seed=2):
+            if not board.get_legal_moves():
+                continue
+            for player in [game_agent.AlphaBetaPlayer(endgame_solver=solver),
+                           game_agent.PVSPlayer(endgame_solver=solver)]:
+                player.time_left = self.create_clock(10000)
+                player.start_search(board)
+                if isinstance(player, game_agent.PVSPlayer):
+                    _, move = player.aspiration_search(board, 1)
+                else:
+                    move = player.alphabeta(board, 1)
+                self.assertIn(move, board.get_legal_moves())
+
+
+if __name__ == '__main__':
+    unittest.main()
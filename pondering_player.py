@@ -0,0 +1,224 @@
+"""A player that keeps searching while the opponent thinks (pondering).
+
+After returning a move, `PonderingPlayer` hands the resulting position to a
+background process. The process searches our best answer to the opponent's
+replies with iterative deepening until the opponent has moved. When the next
+`get_move` call arrives, the deepest completed result for the reply that was
+actually played is used if it is deeper than the search done within the time
+limit of that call.
+
+The background process runs on another core and only communicates through
+queues, so `get_move` itself still returns within the time limit given by
+`time_left`. On a single core machine the background search competes with
+the opponent for the CPU.
+"""
+import multiprocessing
+from copy import copy
+from queue import Empty
+
+import game_agent
+
+PLAYER_1 = "Player1"
+PLAYER_2 = "Player2"
+
+# time reported to the background search while its job is current
+PONDER_TIME_MILLIS = 1e9
+# seconds to wait for the background search to report that a job has ended
+STOP_TIMEOUT = 0.05
+
+
+def restore_board(board_class, board_state, move_count, width, height):
+    """Create a board from a transferred game state. The players of the
+    board are placeholders, which is all the search needs.
+    """
+    board = board_class(PLAYER_1, PLAYER_2, width, height)
+    board._board_state = list(board_state)
+    board.move_count = move_count
+    if board_state[-3]:
+        board._active_player, board._inactive_player = PLAYER_2, PLAYER_1
+    return board
+
+
+def ponder(player, jobs, results, current_job):
+    """The main function of the background process.
+
+    Parameters
+    ----------
+    player : `game_agent.AlphaBetaPlayer`
+        The player used to search; its search methods must not be used by
+        another process.
+    jobs : `multiprocessing.Queue`
+        Positions to ponder as tuples (job id, board class, board state,
+        move count, width, height, replies); None stops the process.
+    results : `multiprocessing.Queue`
+        Receives a tuple (job id, reply, depth, move) for every completed
+        search: `move` is the best answer to `reply` found with `depth`.
+        When a job ends, (job id, None, None, None) follows its results.
+    current_job : `multiprocessing.Value`
+        The id of the job to work on; the search of a job stops as soon as
+        this value changes.
+    """
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id = job[0]
+        if current_job.value == job_id:
+            search_replies(player, job, results, current_job)
+        results.put((job_id, None, None, None))
+
+
+def search_replies(player, job, results, current_job):
+    """Search the replies of a job until it is done or no longer current."""
+    job_id, board_class, board_state, move_count, width, height, replies = job
+    player.time_left = lambda: PONDER_TIME_MILLIS if current_job.value == job_id else 0.
+    position = restore_board(board_class, board_state, move_count, width, height)
+    try:
+        player.start_search(position)
+        for depth in range(1, position.count_blank_spaces()):
+            for reply in replies:
+                after_reply = position.forecast_move(reply)
+                move = player.alphabeta(after_reply, depth)
+                if move != (-1, -1):
+                    results.put((job_id, reply, depth, move))
+    except game_agent.SearchTimeout:
+        pass
+
+
+class PonderingPlayer():
+    """Game-playing agent that searches with an alpha-beta player and keeps
+    searching in a background process while the opponent thinks.
+
+    Parameters
+    ----------
+    player : `game_agent.AlphaBetaPlayer` (optional)
+        The player used to search, e.g. an `AlphaBetaPlayer` or a
+        `PVSPlayer`. The background process searches with a copy of it.
+
+    all_replies : bool (optional)
+        If True, ponder every reply of the opponent. Otherwise only ponder
+        the reply predicted by the transposition table of `player` (all
+        replies if the player has no table or the table has no prediction).
+    """
+    def __init__(self, player=None, all_replies=True):
+        self.player = player if player is not None else game_agent.AlphaBetaPlayer()
+        self.all_replies = all_replies
+        self.process = None
+        self.jobs = None
+        self.results = None
+        self.current_job = None
+        self.job_id = 0
+        self.pondered_position = None
+        self.pondered_depth = 0
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        pondered = self.stop_pondering(game)
+
+        move = self.player.get_move(game, time_left)
+        self.pondered_depth = 0
+        # book and solver moves have an infinite depth and are never replaced
+        if pondered is not None and pondered[0] > self.player.depth_reached:
+            self.pondered_depth, move = pondered
+
+        if move != (-1, -1):
+            self.start_pondering(game.forecast_move(move))
+        return move
+
+    def start_pondering(self, position):
+        """Let the background process search the replies of the opponent in
+        `position`, starting it if necessary.
+        """
+        replies = position.get_legal_moves()
+        if not replies:
+            return
+        if not self.all_replies and self.player.transposition_table is not None:
+            entry = self.player.transposition_table.probe(position.hash())
+            if entry is not None and entry.move in replies:
+                replies = [entry.move]
+
+        if self.process is None:
+            self.jobs = multiprocessing.Queue()
+            self.results = multiprocessing.Queue()
+            self.current_job = multiprocessing.Value('i', -1)
+            # the copy must not refer to the clock function of this process
+            template = copy(self.player)
+            template.time_left = None
+            self.process = multiprocessing.Process(
+                target=ponder, args=(template, self.jobs, self.results, self.current_job))
+            self.process.daemon = True
+            self.process.start()
+
+        self.job_id += 1
+        self.current_job.value = self.job_id
+        self.pondered_position = position
+        self.jobs.put((self.job_id, type(position), list(position._board_state),
+                       position.move_count, position.width, position.height, replies))
+
+    def stop_pondering(self, game):
+        """Stop the background search and return its deepest result for the
+        position `game`.
+
+        Returns
+        -------
+        (int, (int, int)) or None
+            The depth and the best move of the deepest search completed for
+            `game`, or None if `game` was not pondered
+        """
+        if self.process is None or self.pondered_position is None:
+            return None
+        self.current_job.value = -1
+
+        reply = game.get_player_location(game.inactive_player)
+        expected = self.pondered_position.forecast_move(reply) if reply else None
+        self.pondered_position = None
+        best = None
+        # results of a job are followed by its end marker, so draining up to
+        # the marker leaves no result behind for the next call
+        while True:
+            try:
+                job_id, result_reply, depth, move = self.results.get(timeout=STOP_TIMEOUT)
+            except Empty:
+                break
+            if job_id != self.job_id:
+                continue
+            if result_reply is None:
+                break
+            if result_reply == reply and (best is None or depth > best[0]):
+                best = (depth, move)
+
+        if expected is None or expected.hash() != game.hash():
+            return None
+        return best
+
+    def close(self):
+        """Stop the background process."""
+        if self.process is not None:
+            self.current_job.value = -1
+            self.jobs.put(None)
+            self.process.join(1.)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+
+    def __str__(self):
+        return type(self).__name__ + '|' + str(self.player)
@@ -0,0 +1,101 @@
+"""Unit tests for the pondering player."""
+
+import unittest
+import time
+import timeit
+
+import isolation
+import game_agent
+from pondering_player import PonderingPlayer, restore_board
+
+
+class PonderingPlayerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.agent = PonderingPlayer(game_agent.AlphaBetaPlayer())
+        self.opponent = "Player2"
+        self.board = isolation.Board(self.agent, self.opponent)
+        self.board.apply_move((4, 4))
+        self.board.apply_move((0, 2))
+
+    def tearDown(self):
+        self.agent.close()
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def test_restore_board(self):
+        for board_class in [isolation.Board, isolation.BitBoard]:
+            board = self.board.forecast_move((2, 3))
+            restored = restore_board(board_class, board._board_state, board.move_count,
+                                     board.width, board.height)
+            self.assertEqual(board.hash(), restored.hash())
+            self.assertEqual(sorted(board.get_legal_moves()), sorted(restored.get_legal_moves()))
+            self.assertEqual(restored._player_2, restored.active_player)
+
+    def test_ponder_reply(self):
+        move = self.agent.get_move(self.board, self.create_clock())
+        self.assertTrue(move in self.board.get_legal_moves(), 'best move: ' + str(move))
+        self.board.apply_move(move)
+        reply = self.board.get_legal_moves()[0]
+        self.board.apply_move(reply)
+
+        time.sleep(0.5)
+        depth, pondered_move = self.agent.stop_pondering(self.board)
+        self.assertGreater(depth, 0)
+        self.assertTrue(pondered_move in self.board.get_legal_moves(), 'pondered move: ' + str(pondered_move))
+
+    def test_stop_pondering_drains_results(self):
+        move = self.agent.get_move(self.board, self.create_clock())
+        self.board.apply_move(move)
+        self.board.apply_move(self.board.get_legal_moves()[0])
+        time.sleep(0.2)
+        self.agent.stop_pondering(self.board)
+        # the stopped search must not leave results for the next call
+        time.sleep(0.2)
+        self.assertTrue(self.agent.results.empty())
+
+    def test_get_move_after_pondering(self):
+        for _ in range(2):
+            move = self.agent.get_move(self.board, self.create_clock())
+            self.board.apply_move(move)
+            time.sleep(0.2)
+            self.board.apply_move(self.board.get_legal_moves()[0])
+        clock = self.create_clock()
+        move = self.agent.get_move(self.board, clock)
+        self.assertGreater(clock(), 0)
+        self.assertTrue(move in self.board.get_legal_moves(), 'best move: ' + str(move))
+
+    def test_pondering_keeps_solver_move(self):
+        moves = self.board.get_legal_moves()
+
+        class FixedSolver():
+            def best_move(self, game, clock=None):
+                return moves[0]
+
+            def solve(self, game, player, clock=None):
+                return None
+
+        self.agent.player.endgame_solver = FixedSolver()
+        # a deep pondered result must not replace the move of the solver
+        self.agent.stop_pondering = lambda game: (99, moves[-1])
+        self.assertEqual(moves[0], self.agent.get_move(self.board, self.create_clock()))
+        self.assertEqual(float("inf"), self.agent.player.depth_reached)
+        self.assertEqual(0, self.agent.pondered_depth)
+
+        self.agent.player.endgame_solver = None
+        self.assertEqual(moves[-1], self.agent.get_move(self.board, self.create_clock()))
+        self.assertEqual(99, self.agent.pondered_depth)
+
+    def test_unexpected_position(self):
+        self.agent.get_move(self.board, self.create_clock())
+        other = isolation.Board(self.agent, self.opponent)
+        other.apply_move((3, 3))
+        other.apply_move((0, 0))
+        self.assertIsNone(self.agent.stop_pondering(other))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Measure the cost of a search node with score functions that use the size
+of the players' regions.
+
+The positions of random games are searched one after the other with
+iterative deepening to a fixed depth, as the players search the positions of
+a game: once with `improved_score` as a reference, and with `region_score`
+on a `BitBoard` (a flood fill at every leaf) and on a `RegionBoard` (regions
+updated incrementally by apply_move and restored by undo_move). The tables
+that a `RegionBoard` fills during the search are cleared before each run, so
+a run starts as cold as a new game. The benchmark reports the average time
+per search node in each stage of the game, the fastest of three runs.
+
+Usage:
+
+    python region_benchmark.py
+"""
+import random
+import timeit
+
+from isolation import BitBoard, RegionBoard
+from isolation.regions import RegionTables
+from game_agent import AlphaBetaPlayer, region_score
+from sample_players import improved_score
+
+# the stages of the game, as ranges of the move count
+STAGES = [(0, 10), (10, 20), (20, 49)]
+NUM_GAMES = 8
+SEARCH_DEPTH = 5
+REPEAT = 3
+
+
+def random_games(count, seed=0):
+    """Return the moves of `count` random games."""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        board = BitBoard("Player1", "Player2", shuffle_moves=False)
+        moves = []
+        while board.get_legal_moves():
+            moves.append(rng.choice(board.get_legal_moves()))
+            board.apply_move(moves[-1])
+        games.append(moves)
+    return games
+
+
+def micros_per_node(board_class, score_fn, games):
+    """Return the time per search node in each stage of the games."""
+    RegionTables._instances.clear()
+    agent = AlphaBetaPlayer(score_fn=score_fn)
+    agent.time_left = lambda: 1e9
+    times = [0.] * len(STAGES)
+    nodes = [0] * len(STAGES)
+    for moves in games:
+        board = board_class(agent, "Opponent", shuffle_moves=False)
+        for move in moves:
+            stage = [low <= board.move_count < high for low, high in STAGES].index(True)
+            start_nodes = agent.clock.nodes
+            start = timeit.default_timer()
+            for depth in range(1, SEARCH_DEPTH + 1):
+                agent.alphabeta(board, depth)
+            times[stage] += timeit.default_timer() - start
+            nodes[stage] += agent.clock.nodes - start_nodes
+            board.apply_move(move)
+    return [1e6 * time / count for time, count in zip(times, nodes)]
+
+
+def main():
+    games = random_games(NUM_GAMES)
+    configurations = [(BitBoard, improved_score), (BitBoard, region_score),
+                      (RegionBoard, region_score)]
+    # the runs of the configurations take turns, so that a slow phase of
+    # the machine does not favour one of them
+    best = [[float("inf")] * len(STAGES) for _ in configurations]
+    for _ in range(REPEAT):
+        for column, (board_class, score_fn) in enumerate(configurations):
+            times = micros_per_node(board_class, score_fn, games)
+            best[column] = [min(old, new) for old, new in zip(best[column], times)]
+    print("{:<8}{:>18}{:>18}{:>18}".format(
+        "Moves", "improved us", "BitBoard us", "RegionBoard us"))
+    for stage, (low, high) in enumerate(STAGES):
+        print("{:<8}{:>18.1f}{:>18.1f}{:>18.1f}".format(
+            "{}-{}".format(low, high - 1), *[column[stage] for column in best]))
+
+
+if __name__ == "__main__":
+    main()
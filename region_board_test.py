@@ -0,0 +1,81 @@
+"""Unit tests for the incremental region tracking of `isolation.RegionBoard`."""
+
+import unittest
+import random
+
+import isolation
+from isolation.bitboard import BoardGeometry, popcount
+from game_agent import region_score, contested_region_score
+
+
+class RegionBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def fresh_region(self, board, player):
+        geometry = BoardGeometry.get(board.width, board.height)
+        blank = board.blank_mask()
+        square = board.get_player_location(player)
+        if square is None:
+            return blank
+        return geometry.flood_fill(geometry.index(square), blank)
+
+    def assert_regions(self, board):
+        for player in (self.player1, self.player2):
+            region = self.fresh_region(board, player)
+            self.assertEqual(region, board.reachable_mask(player))
+            self.assertEqual(popcount(region), board.reachable_count(player))
+        self.assertEqual(popcount(self.fresh_region(board, self.player1) &
+                                  self.fresh_region(board, self.player2)),
+                         board.contested_count())
+
+    def test_regions_follow_moves(self):
+        rng = random.Random(11)
+        for width, height in [(7, 7), (5, 6), (9, 9), (4, 4)]:
+            for _ in range(10):
+                board = isolation.RegionBoard(self.player1, self.player2, width, height)
+                states = []
+                while True:
+                    self.assert_regions(board)
+                    moves = board.get_legal_moves()
+                    if not moves:
+                        break
+                    states.append(board.to_packed())
+                    board.apply_move(rng.choice(moves))
+                while states:
+                    board.undo_move()
+                    self.assertEqual(states.pop(), board.to_packed())
+                    self.assert_regions(board)
+
+    def test_copy_and_packed_boards(self):
+        rng = random.Random(13)
+        board = isolation.RegionBoard(self.player1, self.player2)
+        for _ in range(20):
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            board.apply_move(rng.choice(moves))
+            copy = board.copy()
+            self.assertIsInstance(copy, isolation.RegionBoard)
+            self.assert_regions(copy)
+            restored = isolation.RegionBoard.from_packed(
+                board.to_packed(), self.player1, self.player2)
+            self.assert_regions(restored)
+
+    def test_scores_match_other_boards(self):
+        rng = random.Random(17)
+        for _ in range(5):
+            board = isolation.RegionBoard(self.player1, self.player2)
+            while board.get_legal_moves():
+                bit_board = isolation.BitBoard.from_packed(
+                    board.to_packed(), self.player1, self.player2)
+                for player in (self.player1, self.player2):
+                    for score in (region_score, contested_region_score):
+                        self.assertEqual(score(bit_board, player), score(board, player))
+                board.apply_move(rng.choice(board.get_legal_moves()))
+
+
+if __name__ == '__main__':
+    unittest.main()
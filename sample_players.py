@@ -6,7 +6,7 @@ own agent and example heuristic functions.
     ************************************************************************
 """
 
-from random import randint, choice
+import random
 from game_agent import (AlphaBetaPlayer, MinimaxPlayer, custom_score)
 from mixed_player import MixedPlayer, PlayoutException
 from monte_carlo_player import MonteCarloPlayer
@@ -137,7 +137,11 @@ def center_score(game, player):
 
 
 class RandomPlayer():
-    """Player that chooses a move randomly."""
+    """Player that chooses a move randomly. Pass a `seed` to make the
+    choices reproducible."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
 
     def get_move(self, game, time_left):
         """Randomly select a move from the available legal moves.
@@ -162,7 +166,7 @@ class RandomPlayer():
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return (-1, -1)
-        return legal_moves[randint(0, len(legal_moves) - 1)]
+        return self.rng.choice(sorted(legal_moves))
 
 
 class GreedyPlayer():
@@ -261,7 +265,8 @@ def is_same_color(square_1, square_2):
 def is_dark_square(square):
     return (square[0] + square[1]) % 2
 
-def play_match(player_1, player_2, rounds):
+def play_match(player_1, player_2, rounds, seed=None):
+    rng = random.Random(seed)
     wins = {player_1: 0, player_2: 0}
     timeouts = 0
     forfeits = 0
@@ -269,12 +274,12 @@ def play_match(player_1, player_2, rounds):
     for round in range(rounds):
         game = Board(player_1, player_2)
         
-        move_1 = choice(game.get_legal_moves())
+        move_1 = rng.choice(sorted(game.get_legal_moves()))
         game.apply_move(move_1)
-        move_2 = choice(game.get_legal_moves())
+        move_2 = rng.choice(sorted(game.get_legal_moves()))
         
         while not is_same_color(move_1, move_2):
-            move_2 = choice(game.get_legal_moves())
+            move_2 = rng.choice(sorted(game.get_legal_moves()))
             
         game.apply_move(move_2)
 #     
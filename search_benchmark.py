@@ -0,0 +1,92 @@
+"""Compare the number of nodes that different search agents need to finish
+the iterations of iterative deepening.
+
+Every agent searches the same set of random positions to each fixed depth.
+The nodes are counted by the search clock of the agent, which counts every
+call of max_value/min_value. The boards do not shuffle the legal moves, so
+two runs of the benchmark search exactly the same nodes.
+
+Usage:
+
+    python search_benchmark.py
+"""
+import random
+import timeit
+
+from isolation import Board
+from game_agent import AlphaBetaPlayer, PVSPlayer, custom_score
+from transposition_table import TranspositionTable
+from move_ordering import CombinedOrdering, KillerMoves, HistoryHeuristic
+
+NUM_POSITIONS = 10
+MAX_DEPTH = 6
+
+
+def create_agents():
+    return [
+        ("AlphaBeta", AlphaBetaPlayer(score_fn=custom_score)),
+        ("AlphaBeta+TT+Order", AlphaBetaPlayer(
+            score_fn=custom_score, transposition_table=TranspositionTable(),
+            move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic()))),
+        ("PVS", PVSPlayer(score_fn=custom_score)),
+        ("PVS+TT+Order", PVSPlayer(
+            score_fn=custom_score, transposition_table=TranspositionTable(),
+            move_ordering=CombinedOrdering(KillerMoves(), HistoryHeuristic()))),
+    ]
+
+
+def random_positions(count, plies=6, seed=0):
+    """Return random positions of games in which both players made a few
+    moves.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = Board("Player1", "Player2", shuffle_moves=False)
+        for _ in range(plies):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(moves))
+        if game.get_legal_moves():
+            positions.append(game)
+    return positions
+
+
+def count_nodes(agent, game, max_depth):
+    """Run iterative deepening to `max_depth` and return the number of nodes
+    and the time in milliseconds needed to finish each iteration.
+    """
+    start = timeit.default_timer()
+    agent.time_left = lambda: 1e9 - 1000 * (timeit.default_timer() - start)
+    agent.start_search(game)
+    start_nodes = agent.clock.nodes
+    results = []
+    score = None
+    for depth in range(1, max_depth + 1):
+        if isinstance(agent, PVSPlayer):
+            score, _ = agent.aspiration_search(game, depth, score)
+        else:
+            agent.alphabeta(game, depth)
+        results.append((agent.clock.nodes - start_nodes, 1000 * (timeit.default_timer() - start)))
+    return results
+
+
+def main():
+    positions = random_positions(NUM_POSITIONS)
+    print("{:<22}".format("Nodes to depth") + ''.join(['{:>10}'.format(d) for d in range(1, MAX_DEPTH + 1)]))
+    for name, agent in create_agents():
+        totals = [[0, 0.] for _ in range(MAX_DEPTH)]
+        for game in positions:
+            position = Board(agent, "Opponent", shuffle_moves=False)
+            position._board_state = list(game._board_state)
+            position.move_count = game.move_count
+            for idx, (nodes, millis) in enumerate(count_nodes(agent, position, MAX_DEPTH)):
+                totals[idx][0] += nodes
+                totals[idx][1] += millis
+        print("{:<22}".format(name) + ''.join(['{:>10}'.format(n // NUM_POSITIONS) for n, _ in totals]))
+        print("{:<22}".format("  ms") + ''.join(['{:>10.1f}'.format(t / NUM_POSITIONS) for _, t in totals]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare the size and the speed of the ways to transfer a position to
+another process or to store it.
+
+For `Board` and `BitBoard` positions of random games, the benchmark reports
+the average size in bytes and the number of round trips (encode and decode)
+per second of pickling the board, pickling its `_board_state` list and
+`to_bytes()`/`from_bytes()`.
+
+Usage:
+
+    python serialization_benchmark.py
+"""
+import pickle
+import random
+import timeit
+
+from isolation import Board, BitBoard
+
+NUM_POSITIONS = 200
+PLAYER_1 = "Player1"
+PLAYER_2 = "Player2"
+
+
+def random_positions(board_class, count, seed=0):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = board_class(PLAYER_1, PLAYER_2, shuffle_moves=False)
+        for _ in range(rng.randint(2, 30)):
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            board.apply_move(rng.choice(moves))
+        positions.append(board)
+    return positions
+
+
+def restore_state(board_class, state, move_count):
+    board = board_class(PLAYER_1, PLAYER_2)
+    board._board_state = state
+    board.move_count = move_count
+    if state[-3]:
+        board._active_player, board._inactive_player = PLAYER_2, PLAYER_1
+    return board
+
+
+def formats(board_class):
+    return [
+        ("pickle(board)", pickle.dumps, pickle.loads),
+        ("pickle(state)",
+         lambda board: pickle.dumps((board._board_state, board.move_count)),
+         lambda data: restore_state(board_class, *pickle.loads(data))),
+        ("to_bytes",
+         lambda board: board.to_bytes(),
+         lambda data: board_class.from_bytes(data, PLAYER_1, PLAYER_2)),
+    ]
+
+
+def main():
+    print("{:<10}{:<16}{:>10}{:>16}".format("Board", "Format", "Bytes", "Round trips/s"))
+    for board_class in [Board, BitBoard]:
+        positions = random_positions(board_class, NUM_POSITIONS)
+        for name, encode, decode in formats(board_class):
+            size = sum(len(encode(board)) for board in positions) / len(positions)
+            start = timeit.default_timer()
+            for board in positions:
+                decode(encode(board))
+            rate = len(positions) / (timeit.default_timer() - start)
+            print("{:<10}{:<16}{:>10.1f}{:>16.0f}".format(board_class.__name__, name, size, rate))
+
+
+if __name__ == "__main__":
+    main()
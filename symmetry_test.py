@@ -0,0 +1,67 @@
+"""Unit tests for the symmetry-canonical position keys of
+`isolation.symmetry`.
+"""
+
+import unittest
+import random
+
+import isolation
+from isolation.symmetry import Symmetries, canonical
+
+
+class SymmetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def play_random_moves(self, board, count, rng):
+        for _ in range(count):
+            moves = board.get_legal_moves()
+            if not moves:
+                break
+            board.apply_move(rng.choice(moves))
+        return board
+
+    def test_symmetry_count(self):
+        self.assertEqual(8, len(Symmetries.get(7, 7).permutations))
+        self.assertEqual(4, len(Symmetries.get(5, 7).permutations))
+
+    def test_equivalent_positions_share_key(self):
+        rng = random.Random(3)
+        for width, height in [(7, 7), (6, 6), (5, 8)]:
+            symmetries = Symmetries.get(width, height)
+            for count in range(12):
+                board = isolation.Board(self.player1, self.player2, width, height)
+                self.play_random_moves(board, count, rng)
+                key, transform = canonical(board)
+                for t in range(len(symmetries.permutations)):
+                    image = symmetries.transform_board(board, t)
+                    self.assertEqual(key, canonical(image)[0])
+                canonical_board = symmetries.transform_board(board, transform)
+                self.assertEqual(key, canonical_board.to_packed())
+
+    def test_moves_map_to_canonical_position(self):
+        rng = random.Random(5)
+        symmetries = Symmetries.get(7, 7)
+        for board_class in (isolation.Board, isolation.BitBoard):
+            for count in range(10):
+                board = board_class(self.player1, self.player2)
+                self.play_random_moves(board, count, rng)
+                _, transform = canonical(board)
+                canonical_board = symmetries.transform_board(board, transform)
+                self.assertIsInstance(canonical_board, board_class)
+                self.assertEqual(
+                    sorted(symmetries.transform_move(m, transform) for m in board.get_legal_moves()),
+                    sorted(canonical_board.get_legal_moves()))
+                for move in canonical_board.get_legal_moves():
+                    original = symmetries.inverse_move(move, transform)
+                    self.assertEqual(move, symmetries.transform_move(original, transform))
+                    self.assertTrue(board.move_is_legal(original))
+                    self.assertEqual(canonical_board.forecast_move(move).to_packed(),
+                                     symmetries.transform_board(board.forecast_move(original),
+                                                                transform).to_packed())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -36,24 +36,32 @@ game_agent.py.
 Agent = namedtuple("Agent", ["player", "name"])
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+def play_round(cpu_agent, test_agents, win_counts, num_matches, board_class=Board, seed=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+    The games are played on instances of `board_class` (e.g., `Board` or
+    `BitBoard`).
+
+    The starting locations are drawn from a random generator seeded with
+    `seed`, so a round can be repeated with the same openings. To repeat
+    the searches as well, use boards that do not shuffle the legal moves,
+    e.g. `board_class=functools.partial(Board, shuffle_moves=False)`.
     """
+    rng = random.Random(seed)
     timeout_count = 0
     forfeit_count = 0
     for _ in range(num_matches):
 
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
+        games = sum([[board_class(cpu_agent.player, agent.player),
+                      board_class(agent.player, cpu_agent.player)]
                     for agent in test_agents], [])
 
         # initialize all games with a random move and response
         for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
+            move = rng.choice(sorted(games[0].get_legal_moves()))
             for game in games:
                 game.apply_move(move)
 
@@ -78,8 +86,11 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, board_class=Board, seed=None):
+    """Play matches between the test agent and each cpu_agent individually.
+    The round against the i-th cpu agent is played with the seed `seed + i`
+    (see `play_round`), or with random openings if `seed` is None.
+    """
     total_wins = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
@@ -94,7 +105,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        round_seed = None if seed is None else seed + idx
+        counts = play_round(agent, test_agents, wins, num_matches, board_class, round_seed)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -0,0 +1,96 @@
+"""A fixed-size transposition table for alpha-beta search.
+
+The table stores the results of searched positions keyed by the Zobrist hash
+of the position (`isolation.Board.hash()`), so that positions reached again
+(by transposition or in the next iteration of iterative deepening) can be
+cut off or searched with the best move first.
+"""
+from collections import namedtuple
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+DEPTH_PREFERRED = 'depth-preferred'
+ALWAYS_REPLACE = 'always-replace'
+
+Entry = namedtuple('Entry', ['key', 'depth', 'score', 'flag', 'move', 'generation'])
+
+
+class TranspositionTable():
+    """A hash table with a fixed number of slots. Each position is stored in
+    the slot `key % size`; when two positions map to the same slot, the
+    replacement policy decides which one is kept.
+
+    Parameters
+    ----------
+    size : int (optional)
+        The number of slots in the table. The table never grows beyond this
+        number of entries.
+
+    policy : str (optional)
+        `DEPTH_PREFERRED` keeps the entry that was searched deeper unless it
+        was stored in an earlier search (i.e., for an earlier move), and
+        `ALWAYS_REPLACE` always overwrites the slot with the newest entry.
+    """
+    def __init__(self, size=2**16, policy=DEPTH_PREFERRED):
+        if policy not in (DEPTH_PREFERRED, ALWAYS_REPLACE):
+            raise ValueError('unknown replacement policy: {}'.format(policy))
+        self.size = size
+        self.policy = policy
+        self.slots = [None] * size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Start a new search. Entries stored by earlier searches are kept for
+        probing but can be replaced by any new entry.
+        """
+        self.generation += 1
+
+    def clear(self):
+        """Remove all entries, e.g. when a new game starts."""
+        self.slots = [None] * self.size
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key):
+        """Return the entry stored for the position with the given hash, or
+        None if the position is not in the table.
+        """
+        self.probes += 1
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        """Store the result of a search of the position with the given hash.
+
+        Parameters
+        ----------
+        key : int
+            The hash of the position
+        depth : int
+            The remaining search depth of the position
+        score : float
+            The score found by the search
+        flag : int
+            `EXACT` if `score` is the exact score, `LOWER_BOUND` if the search
+            failed high and `UPPER_BOUND` if it failed low
+        move : (int, int)
+            The best move found by the search
+        """
+        idx = key % self.size
+        if self.policy == DEPTH_PREFERRED:
+            old = self.slots[idx]
+            # a deeper result of the current search is kept, also for the
+            # same position
+            if old is not None and old.generation == self.generation and old.depth > depth:
+                return
+        self.slots[idx] = Entry(key, depth, score, flag, move, self.generation)
+
+    def __len__(self):
+        return sum(1 for entry in self.slots if entry is not None)
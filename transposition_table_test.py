@@ -0,0 +1,92 @@
+"""Unit tests for the transposition table and its use in AlphaBetaPlayer."""
+
+import unittest
+import timeit
+
+import isolation
+import game_agent
+from transposition_table import (TranspositionTable, EXACT, LOWER_BOUND,
+                                 DEPTH_PREFERRED, ALWAYS_REPLACE)
+
+
+class TranspositionTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+        self.board = isolation.Board(self.player1, self.player2)
+        self.board.apply_move((4, 4))
+        self.board.apply_move((0, 2))
+
+    def create_clock(self, time_limit = 150):
+        time_millis = lambda: 1000 * timeit.default_timer()
+        start = time_millis()
+        return lambda : start + time_limit - time_millis()
+
+    def test_probe_and_store(self):
+        table = TranspositionTable(size=16)
+        self.assertIsNone(table.probe(5))
+        table.store(5, 3, 1.5, EXACT, (2, 3))
+        entry = table.probe(5)
+        self.assertEqual((3, 1.5, EXACT, (2, 3)), (entry.depth, entry.score, entry.flag, entry.move))
+        self.assertIsNone(table.probe(21))
+        self.assertEqual(1, len(table))
+
+    def test_depth_preferred(self):
+        table = TranspositionTable(size=16, policy=DEPTH_PREFERRED)
+        table.store(5, 3, 1.5, EXACT, (2, 3))
+        table.store(21, 2, 0.5, LOWER_BOUND, (3, 2))
+        self.assertIsNotNone(table.probe(5))
+        self.assertIsNone(table.probe(21))
+
+        # entries of an earlier search are replaced regardless of depth
+        table.new_search()
+        table.store(21, 1, 0.5, LOWER_BOUND, (3, 2))
+        self.assertIsNone(table.probe(5))
+        self.assertIsNotNone(table.probe(21))
+
+    def test_depth_preferred_same_position(self):
+        table = TranspositionTable(size=16, policy=DEPTH_PREFERRED)
+        table.store(5, 3, 1.5, EXACT, (2, 3))
+        table.store(5, 2, 0.5, LOWER_BOUND, (3, 2))
+        self.assertEqual(3, table.probe(5).depth)
+        table.store(5, 3, 0.5, LOWER_BOUND, (3, 2))
+        self.assertEqual(LOWER_BOUND, table.probe(5).flag)
+
+        table.new_search()
+        table.store(5, 1, 2.5, EXACT, (2, 3))
+        self.assertEqual(1, table.probe(5).depth)
+
+    def test_always_replace(self):
+        table = TranspositionTable(size=16, policy=ALWAYS_REPLACE)
+        table.store(5, 3, 1.5, EXACT, (2, 3))
+        table.store(21, 2, 0.5, LOWER_BOUND, (3, 2))
+        self.assertIsNone(table.probe(5))
+        self.assertIsNotNone(table.probe(21))
+
+    def test_unknown_policy(self):
+        self.assertRaises(ValueError, TranspositionTable, 16, 'random')
+
+    def test_same_score_as_plain_search(self):
+        plain = game_agent.AlphaBetaPlayer()
+        cached = game_agent.AlphaBetaPlayer(transposition_table=TranspositionTable())
+        for player in [plain, cached]:
+            player.clock.start(self.create_clock(10000), player.TIMER_THRESHOLD)
+        for depth in range(1, 6):
+            plain_score, _ = plain.max_value(self.board.copy(), depth, float("-inf"), float("inf"))
+            cached_score, _ = cached.max_value(self.board.copy(), depth, float("-inf"), float("inf"))
+            self.assertEqual(plain_score, cached_score)
+        self.assertGreater(cached.transposition_table.hits, 0)
+
+    def test_get_move(self):
+        player = game_agent.AlphaBetaPlayer(transposition_table=TranspositionTable())
+        board = isolation.Board(player, self.player2)
+        board.apply_move((4, 4))
+        board.apply_move((0, 2))
+        move = player.get_move(board, self.create_clock())
+        self.assertTrue(move in board.get_legal_moves(), 'best move: ' + str(move))
+        self.assertEqual(2, player.last_move_count)
+
+
+if __name__ == '__main__':
+    unittest.main()